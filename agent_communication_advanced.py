@@ -9,7 +9,7 @@ import json
 from datetime import datetime
 from enum import Enum
 from typing import Dict, List, Optional
-import uuid
+from ids import new_id
 
 
 # ============================================================================
@@ -51,7 +51,7 @@ class AgentCommunicationHub:
         Agent sends response to user
         """
         response = {
-            "id": f"RESP-{uuid.uuid4().hex[:4]}",
+            "id": new_id("RESP"),
             "to_user": user_id,
             "from_agent": agent_name,
             "message": message,
@@ -145,7 +145,7 @@ class AgentCommunicationHub:
         Example: MessagingAgent asks CalendarAgent "When is John's next meeting?"
         """
         msg = {
-            "id": f"MSG-{uuid.uuid4().hex[:4]}",
+            "id": new_id("MSG"),
             "from": asking_agent,
             "to": asked_agent,
             "type": "question",
@@ -176,7 +176,7 @@ class AgentCommunicationHub:
         Example: TaskAgent says to MessagingAgent "Send deadline reminder to John"
         """
         delegation = {
-            "id": f"DEL-{uuid.uuid4().hex[:4]}",
+            "id": new_id("DEL"),
             "from": delegating_agent,
             "to": receiving_agent,
             "task": task,
@@ -233,7 +233,7 @@ class AgentCommunicationHub:
         Example: AlertAgent notifies MessagingAgent "Server is down, urgent escalation needed"
         """
         notif = {
-            "id": f"NOTIF-{uuid.uuid4().hex[:4]}",
+            "id": new_id("NOTIF"),
             "from": agent,
             "to": other_agent,
             "type": "notification",
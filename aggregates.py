@@ -0,0 +1,165 @@
+"""
+ContextOS — Materialized Aggregates
+Counters and time-bucketed rollups over every collection.
+
+Maintained incrementally: each read checks the collections' storage
+versions (one stat() each, or a storage daemon round trip) and, for files
+that changed, applies the per-record differences (+1 for the new state of
+a record, -1 for its old one) instead of recounting. Reads between writes cost a few stat() calls
+and a copy of the counters, however large the collections grow.
+
+Materialized:
+  counts            collection × status × priority
+  hourly / daily    the same, bucketed by created_at
+  open_tickets_by_assignee, active_alerts_by_system
+
+Records moved to the archives (archive.py) stay in counts and hourly/daily
+through the archive's counts file, re-read only when it changes.
+
+Usage:
+    from aggregates import get_aggregates
+    get_aggregates().summary()
+    get_aggregates().timeline("alerts", bucket="hour", since="2026-02-14")
+"""
+
+import threading
+from collections import Counter
+
+import storage
+
+# Tickets in any other status count as open
+CLOSED_TICKET_STATUSES = {"closed", "done", "resolved", "completed", "cancelled"}
+# Alerts in any other status count as active
+INACTIVE_ALERT_STATUSES = {"resolved", "closed", "cancelled"}
+
+BUCKETS = {"hour": 13, "day": 10}  # bucket → length of its created_at prefix
+
+
+def _norm(value) -> str:
+    return str(value).strip().lower() if value else "none"
+
+
+class Aggregates:
+    def __init__(self, collections: dict = None):
+        self._tracker = storage.SnapshotTracker(collections)
+        self._lock = threading.Lock()
+        self.counts = Counter()   # (collection, status, priority) → n
+        self.hourly = Counter()   # (collection, status, priority, "YYYY-MM-DDTHH") → n
+        self.daily = Counter()    # (collection, status, priority, "YYYY-MM-DD") → n
+        self.open_tickets_by_assignee = Counter()
+        self.active_alerts_by_system = Counter()
+        self._archived = {}       # collection → (counts file signature, rows)
+
+    # ── Maintenance ────────────────────────────
+    def refresh(self) -> None:
+        """Apply the writes made since the last call (by any process)."""
+        with self._lock:
+            for name, before, after in self._tracker.changes():
+                if before is not None:
+                    self._apply(name, before, -1)
+                if after is not None:
+                    self._apply(name, after, +1)
+            self._refresh_archived()
+
+    def _refresh_archived(self) -> None:
+        import archive  # archive.py builds on this module
+        for name in self._tracker.collections:
+            signature = archive.counts_signature(name)
+            known, rows = self._archived.get(name, (None, []))
+            if signature == known:
+                continue
+            for status, priority, hour, n in rows:
+                self._count(name, status, priority, hour, -n)
+            rows = archive.archived_counts(name) if signature else []
+            for status, priority, hour, n in rows:
+                self._count(name, status, priority, hour, n)
+            self._archived[name] = (signature, rows)
+
+    def _apply(self, name: str, record: dict, delta: int) -> None:
+        status = _norm(record.get("status"))
+        self._count(name, status, record.get("priority"), str(record.get("created_at", "")), delta)
+
+        if name == "tickets" and status not in CLOSED_TICKET_STATUSES:
+            assignee = record.get("assignee") or record.get("assigned_to") or "unassigned"
+            self._bump(self.open_tickets_by_assignee, str(assignee), delta)
+        elif name == "alerts" and status not in INACTIVE_ALERT_STATUSES:
+            self._bump(self.active_alerts_by_system, str(record.get("system") or "unknown"), delta)
+
+    def _count(self, name: str, status, priority, created_at: str, delta: int) -> None:
+        key = (name, _norm(status), _norm(priority))
+        self._bump(self.counts, key, delta)
+        if created_at:
+            self._bump(self.hourly, key + (created_at[:BUCKETS["hour"]],), delta)
+            self._bump(self.daily, key + (created_at[:BUCKETS["day"]],), delta)
+
+    @staticmethod
+    def _bump(counter: Counter, key, delta: int) -> None:
+        value = counter[key] + delta
+        if value:
+            counter[key] = value
+        else:
+            del counter[key]  # keep the rollups as small as the live data
+
+    # ── Reads ──────────────────────────────────
+    def summary(self) -> dict:
+        """Totals and breakdowns for every collection."""
+        self.refresh()
+        with self._lock:
+            totals, by_status, by_priority = Counter(), {}, {}
+            for (name, status, priority), n in self.counts.items():
+                totals[name] += n
+                by_status.setdefault(name, Counter())[status] += n
+                by_priority.setdefault(name, Counter())[priority] += n
+            return {
+                "totals": {name: totals[name] for name in self._tracker.collections},
+                "by_status": {name: dict(c) for name, c in by_status.items()},
+                "by_priority": {name: dict(c) for name, c in by_priority.items()},
+                "open_tickets": sum(self.open_tickets_by_assignee.values()),
+                "active_alerts": sum(self.active_alerts_by_system.values()),
+                "open_tickets_by_assignee": dict(self.open_tickets_by_assignee.most_common()),
+                "active_alerts_by_system": dict(self.active_alerts_by_system.most_common()),
+            }
+
+    def timeline(self, collection: str = None, bucket: str = "day", status: str = None,
+                 priority: str = None, since: str = None, until: str = None) -> dict:
+        """Record counts per hour or day of created_at, oldest bucket first.
+
+        status / priority are comma-separated filters; since (inclusive) and
+        until (exclusive) are ISO dates or datetimes.
+        """
+        if bucket not in BUCKETS:
+            raise storage.QueryError("bucket must be 'hour' or 'day'")
+        statuses = {_norm(v) for v in status.split(",")} if status else None
+        priorities = {_norm(v) for v in priority.split(",")} if priority else None
+        since = storage.parse_time(since, "since")[:BUCKETS[bucket]] if since else None
+        until = storage.parse_time(until, "until")[:BUCKETS[bucket]] if until else None
+
+        self.refresh()
+        series = Counter()
+        with self._lock:
+            for (name, s, p, slot), n in (self.hourly if bucket == "hour" else self.daily).items():
+                if collection and name != collection:
+                    continue
+                if statuses and s not in statuses or priorities and p not in priorities:
+                    continue
+                if since and slot < since or until and slot >= until:
+                    continue
+                series[slot] += n
+        return {"bucket": bucket, "collection": collection,
+                "series": [{"t": slot, "count": series[slot]} for slot in sorted(series)]}
+
+
+# ──────────────────────────────────────────────
+# Shared instance
+# ──────────────────────────────────────────────
+_aggregates = None
+_aggregates_lock = threading.Lock()
+
+
+def get_aggregates() -> Aggregates:
+    """Process-wide aggregates, built on first use."""
+    global _aggregates
+    with _aggregates_lock:
+        if _aggregates is None:
+            _aggregates = Aggregates()
+        return _aggregates
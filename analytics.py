@@ -0,0 +1,338 @@
+"""
+ContextOS — Columnar Analytics
+NumPy snapshots of each collection for trend charts over long histories.
+
+A snapshot turns a collection's list of dicts into columns:
+  created      datetime64[s] per record (from created_at)
+  categorical  status / priority / system / assignee / target as int32
+               codes into a list of categories (dictionary encoding)
+  participants events only: (meeting row, participant code) pairs
+
+Ages (age_seconds()) are computed from created at query time, so they keep
+growing while an unchanged snapshot is reused.
+
+Snapshots are rebuilt at most every ANALYTICS_REFRESH_SECONDS (default 30)
+and only when the file actually changed, so chart requests in between run
+purely on the arrays: group-bys are np.bincount, time series are bincounts
+over (time bucket × category), age distributions are np.histogram.
+
+Records moved to the archives (archive.py) stay in the charts: each
+archived month gets its own snapshot, decoded once per change of its
+partition file and combined with the hot file's.
+
+Usage:
+    from analytics import get_analytics
+    get_analytics().per_time_bucket("alerts", "system", bucket="hour")
+"""
+
+import os
+import time
+import threading
+from datetime import datetime
+from itertools import compress
+
+import numpy as np
+
+import archive
+import storage
+
+REFRESH_INTERVAL = float(os.getenv("ANALYTICS_REFRESH_SECONDS", "30"))
+
+# Categorical columns per collection
+CATEGORICAL = {
+    "events": ("status",),
+    "alerts": ("status", "priority", "system"),
+    "tickets": ("status", "priority", "assignee"),
+    "reminders": ("status", "target"),
+}
+
+BUCKET_SECONDS = {"hour": 3600, "day": 86400}
+# Longest time series a single request may ask for
+MAX_BUCKETS = 10000  # a year and a bit of hours
+
+# Default ticket-age bins, in hours: <1h, 1-4h, 4-12h, 12h-1d, 1-3d, 3-7d, 1-2w, 2w-30d, older
+AGE_BINS_HOURS = (0, 1, 4, 12, 24, 72, 168, 336, 720)
+
+
+def _timestamps(values: list) -> np.ndarray:
+    """ISO strings → datetime64[s]; anything unparseable becomes NaT."""
+    cleaned = [v if isinstance(v, str) and v else "NaT" for v in values]
+    try:
+        return np.array(cleaned, dtype="datetime64[us]").astype("datetime64[s]")
+    except ValueError:
+        out = np.empty(len(cleaned), dtype="datetime64[s]")
+        for i, v in enumerate(cleaned):
+            try:
+                out[i] = np.datetime64(v, "us")
+            except ValueError:
+                out[i] = np.datetime64("NaT")
+        return out
+
+
+def encode(values: list) -> tuple:
+    """Dictionary-encode values: (int32 codes, categories)."""
+    lookup = {}
+    codes = np.fromiter((lookup.setdefault(v, len(lookup)) for v in values),
+                        dtype=np.int32, count=len(values))
+    return codes, list(lookup)
+
+
+def _merge_codes(columns: list) -> tuple:
+    """Concatenate dictionary-encoded columns [(codes, categories)] into one."""
+    lookup, parts = {}, []
+    for codes, categories in columns:
+        remap = np.array([lookup.setdefault(c, len(lookup)) for c in categories], dtype=np.int32)
+        parts.append(remap[codes] if len(codes) else codes)
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int32), list(lookup)
+
+
+def _label(value) -> str:
+    if isinstance(value, list):
+        value = ", ".join(map(str, value))
+    return str(value).strip() if value else "none"
+
+
+# ──────────────────────────────────────────────
+# Snapshot
+# ──────────────────────────────────────────────
+class CollectionSnapshot:
+    def __init__(self, name: str, records: list, version: int):
+        self.name = name
+        self.version = version
+        self.built_at = time.time()
+        self.size = len(records)
+
+        self.ids = [r.get("id") for r in records]
+        self.created = _timestamps([r.get("created_at") for r in records])
+
+        self.categorical = {}
+        for field in CATEGORICAL.get(name, ()):
+            if field == "assignee":
+                values = [_label(r.get("assignee") or r.get("assigned_to")) for r in records]
+            else:
+                values = [_label(r.get(field)).lower() if field in ("status", "priority")
+                          else _label(r.get(field)) for r in records]
+            self.categorical[field] = encode(values)
+
+        self.participants = None
+        if name == "events":
+            rows, people = [], []
+            for i, r in enumerate(records):
+                for person in r.get("participants") or ():
+                    rows.append(i)
+                    people.append(_label(person))
+            codes, categories = encode(people)
+            self.participants = (np.array(rows, dtype=np.int64), codes, categories)
+
+    @classmethod
+    def combine(cls, name: str, parts: list, version) -> "CollectionSnapshot":
+        """One snapshot over several, e.g. the hot file's and each archived
+        month's. ``parts`` is [(snapshot, boolean mask of the rows to keep)]."""
+        combined = cls(name, [], version)
+        combined.size = int(sum(keep.sum() for _, keep in parts))
+        combined.ids = [i for snap, keep in parts for i in compress(snap.ids, keep)]
+        combined.created = np.concatenate([combined.created] + [snap.created[keep] for snap, keep in parts])
+        for field in combined.categorical:
+            combined.categorical[field] = _merge_codes(
+                [(snap.categorical[field][0][keep], snap.categorical[field][1]) for snap, keep in parts])
+        if combined.participants is not None:
+            rows, people, offset = [combined.participants[0]], [], 0
+            for snap, keep in parts:
+                part_rows, codes, categories = snap.participants
+                kept = keep[part_rows]
+                renumber = np.cumsum(keep) - 1 + offset
+                rows.append(renumber[part_rows[kept]])
+                people.append((codes[kept], categories))
+                offset += int(keep.sum())
+            combined.participants = (np.concatenate(rows), *_merge_codes(people))
+        return combined
+
+    def age_seconds(self) -> np.ndarray:
+        """Seconds since each record was created, as of now (NaN if unknown)."""
+        now = np.datetime64(datetime.now(), "s")  # created_at is naive local time
+        ages = (now - self.created).astype("timedelta64[s]").astype(np.float64)
+        ages[np.isnat(self.created)] = np.nan
+        return ages
+
+    def column(self, field: str) -> tuple:
+        """(codes, categories) of a categorical column. Raises QueryError if unknown."""
+        if field not in self.categorical:
+            raise storage.QueryError(
+                f"'{field}' is not a categorical column of {self.name}; "
+                f"use one of: {', '.join(self.categorical) or 'none'}")
+        return self.categorical[field]
+
+    def mask(self, since: str = None, until: str = None, **equals) -> np.ndarray:
+        """Rows with since <= created < until and categorical fields equal to
+        any of the given comma-separated values (case-insensitive)."""
+        keep = np.ones(self.size, dtype=bool)
+        if since:
+            keep &= self.created >= np.datetime64(storage.parse_time(since, "since"), "s")
+        if until:
+            keep &= self.created < np.datetime64(storage.parse_time(until, "until"), "s")
+        for field, wanted in equals.items():
+            if not wanted:
+                continue
+            codes, categories = self.column(field)
+            values = {v.strip().lower() for v in wanted.split(",")}
+            matching = [i for i, c in enumerate(categories) if c.lower() in values]
+            keep &= np.isin(codes, matching)
+        return keep
+
+
+# ──────────────────────────────────────────────
+# Vectorized helpers
+# ──────────────────────────────────────────────
+def count_by(codes: np.ndarray, categories: list, mask: np.ndarray = None) -> dict:
+    """Rows per category, largest first."""
+    if mask is not None:
+        codes = codes[mask]
+    counts = np.bincount(codes, minlength=len(categories))
+    order = np.argsort(-counts, kind="stable")
+    return {categories[i]: int(counts[i]) for i in order if counts[i]}
+
+
+def histogram(values: np.ndarray, edges, mask: np.ndarray = None) -> tuple:
+    """(counts, edges) of the finite values; the last bin is open-ended."""
+    if mask is not None:
+        values = values[mask]
+    values = values[np.isfinite(values)]
+    edges = np.append(np.asarray(edges, dtype=np.float64), np.inf)
+    counts, _ = np.histogram(values, bins=edges)
+    return counts, edges
+
+
+def bucket_counts(times: np.ndarray, codes: np.ndarray, n_categories: int,
+                  bucket_seconds: int) -> tuple:
+    """Counts per (time bucket, category).
+
+    Returns (bucket starts as datetime64[s], matrix of shape buckets × categories),
+    with every bucket between the first and last one present.
+    """
+    valid = ~np.isnat(times)
+    times, codes = times[valid], codes[valid]
+    if not len(times):
+        return np.array([], dtype="datetime64[s]"), np.zeros((0, n_categories), dtype=np.int64)
+    slots = times.astype(np.int64) // bucket_seconds
+    first = slots.min()
+    n_buckets = int(slots.max() - first + 1)
+    if n_buckets > MAX_BUCKETS:
+        raise storage.QueryError(
+            f"range spans {n_buckets} buckets (max {MAX_BUCKETS}): narrow since/until or use a larger bucket")
+    flat = (slots - first) * n_categories + codes
+    matrix = np.bincount(flat, minlength=n_buckets * n_categories).reshape(n_buckets, n_categories)
+    starts = ((first + np.arange(n_buckets)) * bucket_seconds).astype("datetime64[s]")
+    return starts, matrix
+
+
+# ──────────────────────────────────────────────
+# Store
+# ──────────────────────────────────────────────
+class Analytics:
+    def __init__(self, refresh_interval: float = REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._snapshots = {}
+        self._archived = {}   # partition path → snapshot of that archived month
+        self._lock = threading.Lock()
+
+    def snapshot(self, name: str) -> CollectionSnapshot:
+        """Current snapshot of a collection, archived records included.
+        Raises KeyError if unknown."""
+        filename = storage.collection_file(name)
+        with self._lock:
+            current = self._snapshots.get(name)
+            if current is not None and time.time() - current.built_at < self.refresh_interval:
+                return current
+            months = [(path, archive.signature(path)) for _, path in archive.partitions(name)]
+            version = (storage.file_version(filename), tuple(months))
+            if current is None or current.version != version:
+                current = self._build(name, storage.load_json(filename), months, version)
+            else:
+                current.built_at = time.time()  # unchanged: next check after another interval
+            self._snapshots[name] = current
+            return current
+
+    def _build(self, name: str, records: list, months: list, version) -> CollectionSnapshot:
+        hot = CollectionSnapshot(name, records, version)
+        if not months:
+            return hot
+        parts = [(hot, np.ones(hot.size, dtype=bool))]
+        hot_ids = set(hot.ids)
+        for path, signature in months:
+            part = self._archived.get(path)
+            if part is None or part.version != signature:
+                part = self._archived[path] = CollectionSnapshot(
+                    name, list(archive.iter_partition(path)), signature)
+            # A copy archived by a run that crashed before dropping it from
+            # the hot file is shadowed by the hot record
+            keep = np.fromiter((i not in hot_ids for i in part.ids), dtype=bool, count=part.size)
+            parts.append((part, keep))
+        return CollectionSnapshot.combine(name, parts, version)
+
+    def counts(self, name: str, by: str, since: str = None, until: str = None, **filters) -> dict:
+        snap = self.snapshot(name)
+        codes, categories = snap.column(by)
+        keep = snap.mask(since, until, **filters)
+        return {"collection": name, "by": by, "total": int(keep.sum()),
+                "counts": count_by(codes, categories, keep)}
+
+    def per_time_bucket(self, name: str, by: str, bucket: str = "hour", since: str = None,
+                        until: str = None, top: int = 10, **filters) -> dict:
+        """Records per time bucket for the ``top`` largest categories of ``by``
+        (the rest summed as "other")."""
+        if bucket not in BUCKET_SECONDS:
+            raise storage.QueryError("bucket must be 'hour' or 'day'")
+        snap = self.snapshot(name)
+        codes, categories = snap.column(by)
+        keep = snap.mask(since, until, **filters)
+        starts, matrix = bucket_counts(snap.created[keep], codes[keep], len(categories),
+                                       BUCKET_SECONDS[bucket])
+        totals = matrix.sum(axis=0)
+        order = [i for i in np.argsort(-totals, kind="stable") if totals[i]]
+        shown, rest = order[:top], order[top:]
+        series = {categories[i]: matrix[:, i].tolist() for i in shown}
+        if rest:
+            series["other"] = matrix[:, rest].sum(axis=1).tolist()
+        return {"collection": name, "by": by, "bucket": bucket,
+                "buckets": [str(t) for t in starts], "series": series}
+
+    def age_distribution(self, name: str, edges_hours=AGE_BINS_HOURS, since: str = None,
+                         until: str = None, **filters) -> dict:
+        """How long ago records were created, in hour bins (last bin open-ended)."""
+        snap = self.snapshot(name)
+        keep = snap.mask(since, until, **filters)
+        hours = snap.age_seconds() / 3600
+        counts, edges = histogram(hours, edges_hours, keep)
+        ages = hours[keep]
+        ages = ages[np.isfinite(ages)]
+        return {
+            "collection": name,
+            "bins": [{"from_hours": float(lo), "to_hours": None if np.isinf(hi) else float(hi),
+                      "count": int(n)} for lo, hi, n in zip(edges[:-1], edges[1:], counts)],
+            "median_hours": round(float(np.median(ages)), 2) if len(ages) else None,
+            "p90_hours": round(float(np.percentile(ages, 90)), 2) if len(ages) else None,
+        }
+
+    def participant_load(self, since: str = None, until: str = None, status: str = None) -> dict:
+        """Meetings per participant."""
+        snap = self.snapshot("events")
+        rows, codes, categories = snap.participants
+        keep = snap.mask(since, until, status=status)
+        return {"meetings": int(keep.sum()),
+                "participants": count_by(codes, categories, keep[rows])}
+
+
+# ──────────────────────────────────────────────
+# Shared instance
+# ──────────────────────────────────────────────
+_analytics = None
+_analytics_lock = threading.Lock()
+
+
+def get_analytics() -> Analytics:
+    """Process-wide analytics store, built on first use."""
+    global _analytics
+    with _analytics_lock:
+        if _analytics is None:
+            _analytics = Analytics()
+        return _analytics
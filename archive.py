@@ -0,0 +1,499 @@
+"""
+ContextOS — Archive Tiers
+Move finished records out of the hot JSON files into compressed monthly
+archives.
+
+    python archive.py                         # every collection, ARCHIVE_AFTER_DAYS
+    python archive.py tickets --days 30
+    python archive.py --dry-run
+
+A record is archived once it is in a terminal state (TERMINAL_STATES:
+cancelled events, resolved alerts, closed tickets, sent reminders) and
+its last change — updated_at, resolved_at, closed_at or else created_at —
+is more than ARCHIVE_AFTER_DAYS old. It goes to
+
+    data/archive/<collection>/<YYYY-MM of created_at>.ndjson.gz
+
+one JSON record per line, gzip-compressed (.ndjson.zst with
+ARCHIVE_COMPRESSION=zstd, which needs the zstandard package). Each run
+appends one compressed member per partition it touches, and only then
+removes the records from the hot file — a crash in between leaves a
+record in both places, and readers skip archived copies of records that
+are still hot.
+
+Reads cover both tiers: storage.query_collection() and iter_collection()
+(the dashboard's collection pages and exports) and the MCP list tools
+(RecordIndex.lookup_archived()) open only the months that since/until
+reach, and no archive at all when the status filter asks only for
+non-terminal states. get_record() falls back to find(). Each run rewrites
+a per-month counts file (archive/<collection>/counts.json) for the months
+it touched; it keeps archived records in the /api/stats counters and in
+the totals of collection pages, which decode archived months only once a
+page reaches past the hot records (query_tiers()). Search
+(search_index.py) and the analytics charts read each archived month once
+per change of its partition. Change feeds report a run as one "archive"
+event per collection rather than a delete per record (the IDs a run moved
+are kept in moved.json).
+
+The dashboard runs archive_all() every ARCHIVE_INTERVAL_HOURS.
+"""
+
+import io
+import os
+import re
+import gzip
+import json
+import heapq
+import argparse
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+
+import storage
+from aggregates import CLOSED_TICKET_STATUSES, INACTIVE_ALERT_STATUSES
+from ids import id_time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_DIR = os.path.join(storage.DATA_DIR, "archive")
+
+# Records in these states are done with and may leave the hot set
+TERMINAL_STATES = {
+    "events": {"cancelled", "completed"},
+    "alerts": set(INACTIVE_ALERT_STATUSES),
+    "tickets": set(CLOSED_TICKET_STATUSES),
+    "reminders": {"sent", "done", "cancelled"},
+}
+
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+# "gzip" or "zstd" for new partitions; both are always readable
+COMPRESSION = os.getenv("ARCHIVE_COMPRESSION", "gzip")
+# Decoded partitions kept in memory for repeated queries
+CACHE_PARTITIONS = int(os.getenv("ARCHIVE_CACHE_PARTITIONS", "24"))
+
+EXTENSIONS = {"gzip": ".ndjson.gz", "zstd": ".ndjson.zst"}
+# Per collection: {month: [[status, priority, created_at hour, n], ...]}
+COUNTS_FILE = "counts.json"
+# Per collection: IDs the latest run moved out of the hot file
+MOVED_FILE = "moved.json"
+# Timestamps that record a change after creation, newest wins
+CHANGE_FIELDS = ("updated_at", "resolved_at", "closed_at", "created_at")
+
+_MONTH_RE = re.compile(r"^(\d{4}-\d{2})\.ndjson\.(gz|zst)$")
+
+_cache = OrderedDict()  # path → (signature, records)
+_counts_cache = {}      # collection → (counts file signature, counts)
+_cache_lock = threading.Lock()
+
+
+# ──────────────────────────────────────────────
+# Partitions
+# ──────────────────────────────────────────────
+def _month(record: dict):
+    """Partition of a record: the YYYY-MM of its created_at, or None."""
+    created = str(record.get("created_at", ""))
+    return created[:7] if re.match(r"\d{4}-\d{2}-", created) else None
+
+
+def _next_month(month: str) -> str:
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+
+def partitions(name: str) -> list:
+    """[(month, path)] of a collection's archives, oldest first."""
+    storage.collection_file(name)  # KeyError for unknown collections
+    folder = os.path.join(ARCHIVE_DIR, name)
+    if not os.path.isdir(folder):
+        return []
+    found = []
+    for entry in os.listdir(folder):
+        match = _MONTH_RE.match(entry)
+        if match:
+            found.append((match.group(1), os.path.join(folder, entry)))
+    return sorted(found)
+
+
+def _line(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _compressor(f, compression: str):
+    """Writable stream that compresses into the open binary file ``f``."""
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("ARCHIVE_COMPRESSION=zstd needs the zstandard package")
+        return zstandard.ZstdCompressor().stream_writer(f, closefd=False)
+    return gzip.GzipFile(fileobj=f, mode="wb", mtime=0)
+
+
+def _open_partition(path: str):
+    """Text stream over a partition, decompressed as it is read (every
+    appended member/frame)."""
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{path}: reading zstd archives needs the zstandard package")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+
+def signature(path: str) -> tuple:
+    """Changes whenever a partition file does (appends and rewrites alike)."""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def iter_partition(path: str):
+    """Stream the records of one partition, a line at a time, uncached."""
+    with _open_partition(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _append_partition(name: str, month: str, records: list) -> None:
+    folder = os.path.join(ARCHIVE_DIR, name)
+    os.makedirs(folder, exist_ok=True)
+    # Keep appending to a month's existing partition, whatever its format
+    existing = [path for m, path in partitions(name) if m == month]
+    path = existing[0] if existing else os.path.join(folder, month + EXTENSIONS[COMPRESSION])
+    compression = "zstd" if path.endswith(".zst") else "gzip"
+
+    # A record archived by a run that crashed before dropping it from the
+    # hot file is archived again: rewrite the month without the old copy,
+    # so that no partition holds an ID twice and readers can stream them
+    ids = {r["id"] for r in records}
+    if existing and any(r.get("id") in ids for r in iter_partition(path)):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            with _compressor(f, compression) as out:
+                for r in iter_partition(path):
+                    if r.get("id") not in ids:
+                        out.write(_line(r))
+                for r in records:
+                    out.write(_line(r))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return
+
+    with open(path, "ab") as f:
+        with _compressor(f, compression) as out:
+            for r in records:
+                out.write(_line(r))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _read_partition(path: str) -> list:
+    """Records of one partition, kept in a small LRU for repeated lookups."""
+    current = signature(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == current:
+            _cache.move_to_end(path)
+            return cached[1]
+    records = list(iter_partition(path))
+    with _cache_lock:
+        _cache[path] = (current, records)
+        _cache.move_to_end(path)
+        while len(_cache) > CACHE_PARTITIONS:
+            _cache.popitem(last=False)
+    return records
+
+
+# ──────────────────────────────────────────────
+# Counts
+# ──────────────────────────────────────────────
+def _counts_path(name: str) -> str:
+    return os.path.join(ARCHIVE_DIR, name, COUNTS_FILE)
+
+
+def _load_counts(name: str) -> dict:
+    """{month: rows} of a collection's counts file (a copy; callers may change it)."""
+    current = counts_signature(name)
+    if current is None:
+        return {}
+    with _cache_lock:
+        cached = _counts_cache.get(name)
+    if not cached or cached[0] != current:
+        try:
+            with open(_counts_path(name), "r", encoding="utf-8") as f:
+                cached = (current, json.load(f))
+        except FileNotFoundError:
+            return {}
+        with _cache_lock:
+            _counts_cache[name] = cached
+    return dict(cached[1])
+
+
+def _write_counts(name: str, months, hot: set) -> None:
+    """Recount ``months`` from their partitions, leaving out records still hot."""
+    counts = _load_counts(name)
+    for month in months:
+        rows = Counter()
+        for m, path in partitions(name):
+            if m != month:
+                continue
+            for r in iter_partition(path):
+                if r.get("id") not in hot:
+                    rows[(str(r.get("status") or ""), str(r.get("priority") or ""),
+                          str(r.get("created_at", ""))[:13])] += 1
+        counts[month] = [[*key, n] for key, n in sorted(rows.items())]
+    _write_json(_counts_path(name), counts)
+
+
+def _write_json(path: str, data) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def counts_signature(name: str):
+    """Changes whenever archived_counts(name) does; None without archives."""
+    try:
+        st = os.stat(_counts_path(name))
+    except FileNotFoundError:
+        return None
+    # Each write replaces the file: a new inode even within one mtime tick
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _moved_path(name: str) -> str:
+    return os.path.join(ARCHIVE_DIR, name, MOVED_FILE)
+
+
+def moved_ids(name: str) -> set:
+    """IDs the latest run moved out of a collection's hot file, so change
+    feeds can tell them from deleted records."""
+    try:
+        with open(_moved_path(name), "r", encoding="utf-8") as f:
+            return set(json.load(f))
+    except FileNotFoundError:
+        return set()
+
+
+def archived_counts(name: str) -> list:
+    """[(status, priority, created_at hour "YYYY-MM-DDTHH", n)] of the
+    records in a collection's archives (and not in its hot file)."""
+    return [tuple(row) for rows in _load_counts(name).values() for row in rows]
+
+
+# ──────────────────────────────────────────────
+# Archiving
+# ──────────────────────────────────────────────
+def _last_change(record: dict) -> str:
+    return max((str(record[k]) for k in CHANGE_FIELDS if record.get(k)), default="")
+
+
+def archive_collection(name: str, days: float = ARCHIVE_AFTER_DAYS, now: datetime = None,
+                       dry_run: bool = False) -> int:
+    """Move a collection's finished records older than ``days`` to its
+    archives. Returns how many records were (or, dry_run, would be) moved."""
+    filename = storage.collection_file(name)
+    terminal = TERMINAL_STATES.get(name, set())
+    cutoff = ((now or datetime.now()) - timedelta(days=days)).isoformat()
+
+    # One archiver per collection at a time, across processes
+    with storage.file_lock(f"archive-{name}"):
+        moving = {}
+        for r in storage.load_json(filename):
+            if not isinstance(r, dict) or not r.get("id") or _month(r) is None:
+                continue
+            if str(r.get("status", "")).lower() in terminal and _last_change(r) < cutoff:
+                moving[r["id"]] = r
+        if dry_run or not moving:
+            return len(moving)
+
+        by_month = {}
+        for r in moving.values():
+            by_month.setdefault(_month(r), []).append(r)
+        for month, records in sorted(by_month.items()):
+            _append_partition(name, month, records)
+
+        def drop(records):
+            # A record changed since it was copied stays hot; its archived
+            # copy is shadowed by it
+            kept = [r for r in records
+                    if not (isinstance(r, dict) and moving.get(r.get("id")) == r)]
+            removed = len(records) - len(kept)
+            hot = {r.get("id") for r in kept if isinstance(r, dict)}
+            records[:] = kept
+            # Before the hot file is saved: a crash in between overcounts
+            # until the next run recounts these months
+            _write_counts(name, by_month, hot)
+            _write_json(_moved_path(name), sorted(moving.keys() - hot))
+            return removed
+
+        return storage.modify_json(filename, drop)
+
+
+def archive_all(days: float = ARCHIVE_AFTER_DAYS, dry_run: bool = False) -> dict:
+    """archive_collection() for every collection: {name: records moved}."""
+    return {name: archive_collection(name, days, dry_run=dry_run) for name in storage.COLLECTIONS}
+
+
+# ──────────────────────────────────────────────
+# Reading
+# ──────────────────────────────────────────────
+def may_hold(name: str, status: str = None) -> bool:
+    """False when a status filter asks only for states that never get archived."""
+    if not status:
+        return True
+    wanted = {v.strip().lower() for v in status.split(",") if v.strip()}
+    return bool(wanted & TERMINAL_STATES.get(name, set()))
+
+
+def iter_archived(name: str, skip=(), status: str = None, since: str = None, until: str = None):
+    """Archived records of a collection, oldest month first, except the IDs
+    in ``skip`` (the hot ones). Only months that since/until reach are
+    opened, and each is streamed without being cached, so exports run in
+    constant memory; records are not filtered otherwise — see
+    storage.record_filter()."""
+    since = storage.parse_time(since, "since") if since else None
+    until = storage.parse_time(until, "until") if until else None
+    for month, path in _months(name, status, since, until):
+        for r in iter_partition(path):
+            if r.get("id") not in skip:
+                yield r
+
+
+def _months(name: str, status: str = None, since: str = None, until: str = None) -> list:
+    """[(month, path)] of the partitions a status/since/until filter reaches."""
+    if not may_hold(name, status):
+        return []
+    return [(month, path) for month, path in partitions(name)
+            if not ((since and _next_month(month) <= since[:7]) or (until and month > until[:7]))]
+
+
+def _archived_total(name: str, months: list, hot: set, matches, status, priority,
+                    since, until) -> int:
+    """How many archived records in ``months`` pass the filters, from the
+    counts file; only months it lacks and the hours since/until cut through
+    are decoded."""
+    counts = _load_counts(name)
+    statuses = {v.strip().lower() for v in status.split(",") if v.strip()} if status else None
+    priorities = {v.strip().lower() for v in priority.split(",") if v.strip()} if priority else None
+    edges = {bound[:13] for bound in (since, until) if bound}
+    total = 0
+    for month, path in months:
+        decode = set(edges) if month in counts else None
+        for row_status, row_priority, hour, n in counts.get(month, ()):
+            if statuses and row_status.lower() not in statuses:
+                continue
+            if priorities and row_priority.lower() not in priorities:
+                continue
+            if hour in edges or (since and hour < since[:13]) or (until and hour > until[:13]):
+                continue
+            total += n
+        if decode is None or any(hour.startswith(month) for hour in decode):
+            total += sum(1 for r in _read_partition(path)
+                         if r.get("id") not in hot and matches(r)
+                         and (decode is None or str(r.get("created_at", ""))[:13] in decode))
+    return total
+
+
+def query_tiers(name: str, hot: list, status: str = None, priority: str = None,
+                since: str = None, until: str = None, fields: str = None, cursor: str = None,
+                limit: int = storage.DEFAULT_PAGE_SIZE, order: str = "desc") -> dict:
+    """storage.query() over a collection's hot records and its archives.
+
+    The page is filled from ``hot`` first; archived months are decoded one
+    at a time, from the newest (oldest with order="asc") the cursor still
+    reaches, and only until no older (newer) month can reach into the page.
+    The total comes from the counts file (see _archived_total()).
+    """
+    matches = storage.record_filter(status=status, priority=priority, since=since, until=until)
+    since = storage.parse_time(since, "since") if since else None
+    until = storage.parse_time(until, "until") if until else None
+    months = _months(name, status, since, until)
+    if not months:
+        return storage.query(hot, status=status, priority=priority, since=since, until=until,
+                             fields=fields, cursor=cursor, limit=limit, order=order)
+    if order not in ("asc", "desc"):
+        raise storage.QueryError("order must be 'asc' or 'desc'")
+    limit = max(0, min(int(limit), storage.MAX_PAGE_SIZE))
+    after = storage.decode_cursor(cursor) if cursor else None
+    desc = order == "desc"
+
+    def beyond(r: dict) -> bool:
+        # Past the cursor, in page order
+        if after is None:
+            return True
+        key = storage.page_key(r)
+        return key < after if desc else key > after
+
+    hot_ids = {r.get("id") for r in hot if isinstance(r, dict)}
+    matched = [r for r in hot if isinstance(r, dict) and matches(r)]
+    total = len(matched) + _archived_total(name, months, hot_ids, matches, status, priority,
+                                           since, until)
+
+    found = []
+    if limit:
+        if desc:
+            months = [(m, p) for m, p in reversed(months) if after is None or m <= after[0][:7]]
+        else:
+            months = [(m, p) for m, p in months if after is None or m >= after[0][:7]]
+        pick = heapq.nlargest if desc else heapq.nsmallest
+        found = pick(limit + 1, filter(beyond, matched), key=storage.page_key)
+        for month, path in months:
+            if len(found) > limit:
+                # Every record of this month sorts after (before) the page
+                edge = found[limit].get("created_at", "")
+                if (edge >= _next_month(month)) if desc else (edge < month):
+                    break
+            found = pick(limit + 1, found + [r for r in _read_partition(path)
+                                             if r.get("id") not in hot_ids and matches(r) and beyond(r)],
+                         key=storage.page_key)
+
+    page = found[:limit]
+    next_cursor = storage.encode_cursor(page[-1]) if page and len(found) > limit else None
+    return {"items": storage.project(page, fields), "total": total, "next_cursor": next_cursor}
+
+
+def find(record_id: str) -> tuple:
+    """(collection, record) of an archived record, or (None, None).
+
+    A time-sortable ID's month (and the next, for created_at a moment
+    later) is searched first, then the other months, newest first.
+    """
+    allocated = id_time(record_id)
+    likely = set()
+    if allocated is not None:
+        month = allocated.strftime("%Y-%m")
+        likely = {month, _next_month(month)}
+    for name in storage.COLLECTIONS:
+        months = partitions(name)[::-1]
+        months.sort(key=lambda part: part[0] not in likely)
+        for _, path in months:
+            for r in _read_partition(path):
+                if r.get("id") == record_id:
+                    return name, r
+    return None, None
+
+
+# ──────────────────────────────────────────────
+# Entry Point
+# ──────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Move finished ContextOS records to compressed archives")
+    parser.add_argument("collections", nargs="*", help=f"default: all ({', '.join(storage.COLLECTIONS)})")
+    parser.add_argument("--days", type=float, default=ARCHIVE_AFTER_DAYS,
+                        help="archive records finished longer ago than this")
+    parser.add_argument("--dry-run", action="store_true", help="only count what would move")
+    args = parser.parse_args()
+    for name in args.collections or storage.COLLECTIONS:
+        if name not in storage.COLLECTIONS:
+            raise SystemExit(f"❌ Unknown collection '{name}'")
+        moved = archive_collection(name, args.days, dry_run=args.dry_run)
+        verb = "would move" if args.dry_run else "moved"
+        print(f"🗄️  {name}: {verb} {moved} records older than {args.days:g} days")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+ContextOS — Chat Jobs
+Run dashboard chat commands in the background, a bounded number at a time.
+
+A chat command can take a long time (Slack broadcasts, phone calls), so
+instead of holding the request open the dashboard can submit it as a job
+and hand back its id. Jobs wait for one of ``max_concurrency`` slots, run
+the orchestrator's event stream and keep every event, so clients can poll
+the job, follow its events from the start, or cancel it.
+
+Usage:
+    jobs = JobManager(stream_chat, max_concurrency=4)
+    job = jobs.submit("Schedule a standup for Monday 10am")
+    job.to_dict()                        # {"id": ..., "status": "queued", ...}
+    async for event in jobs.follow(job): ...
+    jobs.cancel(job.id)
+"""
+
+import os
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+
+MAX_CONCURRENT_JOBS = int(os.getenv("DASHBOARD_MAX_CHAT_JOBS", "4"))
+# Jobs allowed to wait for a slot before submit() refuses new ones
+MAX_QUEUED_JOBS = int(os.getenv("DASHBOARD_MAX_QUEUED_JOBS", "100"))
+
+# Finished jobs stay available for this long (seconds), up to MAX_KEPT_JOBS
+JOB_TTL = 3600
+MAX_KEPT_JOBS = 500
+
+FINAL_STATES = ("succeeded", "failed", "cancelled")
+
+
+class JobQueueFull(Exception):
+    """Raised by submit() when MAX_QUEUED_JOBS jobs are already waiting."""
+
+
+class Job:
+    def __init__(self, text: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.text = text
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        self.result = None
+        self.error = None
+        self.task = None
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINAL_STATES
+
+    def publish(self, event: dict) -> None:
+        self.events.append(event)
+        self.notify()
+
+    def notify(self) -> None:
+        # Wake everyone following this job; later waiters get a fresh Event
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def to_dict(self, events: bool = False) -> dict:
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "input": self.text,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "steps": sum(1 for e in self.events if e.get("type") == "step"),
+            "result": self.result,
+            "error": self.error,
+        }
+        if events:
+            data["events"] = list(self.events)
+        return data
+
+
+class JobManager:
+    """Bounded background executor for chat jobs.
+
+    ``runner(text)`` must return an async iterator of events; a
+    {"type": "done", ...} event carries the result and a
+    {"type": "error", "error": ...} event marks the job failed.
+    """
+
+    def __init__(self, runner, max_concurrency: int = MAX_CONCURRENT_JOBS,
+                 max_queued: int = MAX_QUEUED_JOBS):
+        self.runner = runner
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self._jobs = OrderedDict()
+        self._slots = None  # created on first use, inside the running loop
+        self.running = 0
+        self.completed = 0
+
+    def submit(self, text: str) -> Job:
+        self._prune()
+        if self.queued >= self.max_queued:
+            raise JobQueueFull(f"{self.queued} chat jobs already waiting")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        job = Job(text)
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job))
+        job.task.add_done_callback(lambda _: self._cancelled_before_start(job))
+        return job
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def recent(self, limit: int = 50) -> list:
+        """Newest jobs first."""
+        return list(self._jobs.values())[::-1][:limit]
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job. False if unknown or already finished."""
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        job.task.cancel()
+        return True
+
+    async def wait(self, job: Job) -> Job:
+        # asyncio.wait neither raises for a cancelled job nor cancels the
+        # job when the waiting caller itself goes away
+        await asyncio.wait({job.task})
+        return job
+
+    async def follow(self, job: Job):
+        """Yield the job's events from the first one until it finishes."""
+        index = 0
+        while True:
+            changed = job._changed
+            while index < len(job.events):
+                yield job.events[index]
+                index += 1
+            if job.done:
+                return
+            await changed.wait()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for j in self._jobs.values() if j.status == "queued")
+
+    def metrics(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self.running,
+            "queued": self.queued,
+            "completed": self.completed,
+            "kept": len(self._jobs),
+        }
+
+    async def _run(self, job: Job) -> None:
+        try:
+            async with self._slots:
+                job.status = "running"
+                job.started_at = time.time()
+                self.running += 1
+                job.notify()
+                try:
+                    async for event in self.runner(job.text):
+                        if event.get("type") == "done":
+                            job.result = {k: v for k, v in event.items() if k != "type"}
+                        elif event.get("type") == "error":
+                            job.error = event.get("error", "Unknown error")
+                        job.publish(event)
+                finally:
+                    self.running -= 1
+            if job.result is None and not job.error:
+                job.error = "Chat ended without a result"
+            job.status = "failed" if job.error else "succeeded"
+        except asyncio.CancelledError:
+            # Work already handed to threads (Slack, calls) finishes on its own;
+            # its result is simply dropped
+            job.status = "cancelled"
+            job.publish({"type": "cancelled"})
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            job.publish({"type": "error", "error": job.error})
+        finally:
+            job.finished_at = time.time()
+            self.completed += 1
+            job.notify()
+
+    def _cancelled_before_start(self, job: Job) -> None:
+        # A task cancelled before its first step never enters _run()
+        if not job.done:
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            self.completed += 1
+            job.publish({"type": "cancelled"})
+
+    def _prune(self) -> None:
+        cutoff = time.time() - JOB_TTL
+        finished = [j for j in self._jobs.values() if j.done]
+        excess = len(self._jobs) - MAX_KEPT_JOBS
+        for job in finished:
+            if job.finished_at < cutoff or excess > 0:
+                del self._jobs[job.id]
+                excess -= 1
@@ -6,16 +6,37 @@ Type natural language → Agents assemble → Tools execute → Results appear.
 Usage:
     python dashboard.py
     Open http://localhost:5050 in your browser
+
+Served as an ASGI app (FastAPI) under uvicorn with HTTP keep-alive.
+The page is encoded and gzipped once at startup; the page and the data
+endpoints carry ETag/Last-Modified, so unchanged responses are a 304.
+/api/stream pushes record create/update/delete events (Server-Sent Events)
+so open data pages update in place, whoever wrote the record.
+/api/export/{collection} streams NDJSON or CSV straight from the file.
+/api/search runs ranked full-text queries over every collection.
+/api/stats serves incrementally maintained counters and rollups;
+/api/analytics/* computes chart data from NumPy column snapshots.
+Chat commands run as background jobs (chat_jobs.py), a bounded number at a
+time; {"async": true} returns the job id at once for /api/jobs/{id}.
 """
 
+import io
+import csv
+import gzip
 import json
 import os
 import re
-import uuid
+import zlib
+import hashlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from socketserver import ThreadingMixIn
-from urllib.parse import urlparse
+from email.utils import formatdate, parsedate_to_datetime
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 # Import semantic router and multi-agent orchestrator
 import sys
@@ -23,34 +44,33 @@ import asyncio
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from semantic_router import process_message
 from multi_agent_system import AgentOrchestrator
+from chat_jobs import JobManager, JobQueueFull
+from search_index import get_index
+from aggregates import get_aggregates, CLOSED_TICKET_STATUSES
+from analytics import get_analytics, AGE_BINS_HOURS
+from ids import new_id
+from write_buffer import get_write_buffer
+import archive
+import storage
 
 # Dashboard orchestrator instance (for step-by-step responses)
 _dashboard_orchestrator = AgentOrchestrator()
 
-PORT = 5050
+PORT = int(os.getenv("DASHBOARD_PORT", "5050"))
 
 # Data directory (same as server.py)
-DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
-os.makedirs(DATA_DIR, exist_ok=True)
+DATA_DIR = storage.DATA_DIR
 
 
 # ──────────────────────────────────────────────
 # JSON Helpers
 # ──────────────────────────────────────────────
 def _load_json(filename):
-    filepath = os.path.join(DATA_DIR, filename)
-    if os.path.exists(filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return storage.load_json(filename)
 
-def _save_json(filename, data):
-    filepath = os.path.join(DATA_DIR, filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
-def _gen_id(prefix):
-    return f"{prefix}-{uuid.uuid4().hex[:4]}"
+def _append_json(filename, entry):
+    # Locked read-modify-write: MCP server workers may be writing the same file
+    storage.modify_json(filename, lambda records: records.append(entry))
 
 
 # ──────────────────────────────────────────────
@@ -63,62 +83,81 @@ def execute_rpc(rpc):
     now = datetime.now().isoformat()
 
     if tool == "schedule_event":
-        eid = _gen_id("EVT")
+        eid = new_id("EVT")
         entry = {"id": eid, "topic": p.get("topic",""), "time": p.get("time",""),
                  "participants": p.get("participants",[]), "created_at": now, "status": "scheduled"}
-        data = _load_json("calendar.json"); data.append(entry); _save_json("calendar.json", data)
+        _append_json("calendar.json", entry)
         return {"agent": "📅 Calendar Agent", "action": "schedule_event", "id": eid,
                 "message": f"Meeting '{p.get('topic','')}' scheduled for {p.get('time','')} with {', '.join(p.get('participants',[]))}"}
 
     elif tool == "trigger_alert":
-        aid = _gen_id("ALT")
+        aid = new_id("ALT")
         entry = {"id": aid, "system": p.get("system",""), "issue": p.get("issue",""),
                  "priority": p.get("priority","medium"), "created_at": now, "status": "active"}
-        data = _load_json("alerts.json"); data.append(entry); _save_json("alerts.json", data)
+        _append_json("alerts.json", entry)
         return {"agent": "🚨 Alert Agent", "action": "trigger_alert", "id": aid,
                 "message": f"Alert sent for {p.get('system','')} — {p.get('issue','')} [{p.get('priority','').upper()}]"}
 
     elif tool == "create_ticket":
-        tid = _gen_id("TKT")
+        tid = new_id("TKT")
         entry = {"id": tid, "assignee": p.get("assignee",""), "summary": p.get("summary",""),
                  "due": p.get("due",""), "priority": p.get("priority","medium"), "created_at": now, "status": "open"}
-        data = _load_json("tickets.json"); data.append(entry); _save_json("tickets.json", data)
+        _append_json("tickets.json", entry)
         return {"agent": "🎫 Ticket Agent", "action": "create_ticket", "id": tid,
                 "message": f"Ticket assigned to {p.get('assignee','')}: '{p.get('summary','')}' — due {p.get('due','')}"}
 
     elif tool == "create_reminder":
-        rid = _gen_id("REM")
+        rid = new_id("REM")
         entry = {"id": rid, "message": p.get("message",""), "time": p.get("time",""),
                  "target": p.get("target",""), "created_at": now, "status": "pending"}
-        data = _load_json("reminders.json"); data.append(entry); _save_json("reminders.json", data)
+        _append_json("reminders.json", entry)
         return {"agent": "⏰ Reminder Agent", "action": "create_reminder", "id": rid,
                 "message": f"Reminder set for {p.get('target','')}: '{p.get('message','')}' at {p.get('time','')}"}
 
     return {"agent": "❓ Unknown", "action": tool, "id": "", "message": "Unknown tool"}
 
 
-def process_chat(text):
+async def process_chat(text):
     """Process a chat message through the multi-agent orchestrator.
-    Returns rich step-by-step response lines."""
-    # Use orchestrator for rich step-by-step responses
+    Returns rich step-by-step response lines.
+
+    Runs as a chat job, so it shares the concurrency limit with async and
+    streamed chats. Raises JobQueueFull when too many jobs are waiting."""
+    job = chat_jobs.submit(text)
+    await chat_jobs.wait(job)
+    if job.result is not None:
+        return job.result
+    return {
+        "input": text,
+        "response_lines": [f"❌ Error: {job.error or 'Cancelled'}"],
+        "tasks": [],
+        "total_tasks": 0,
+        "approved": False,
+        "executed": [],
+    }
+
+
+async def stream_chat(text):
+    """Process a chat message, yielding step events as agents produce them.
+    The last event is {"type": "done", ...} with the same payload as process_chat()."""
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(_dashboard_orchestrator.route_message(text))
-        loop.close()
+        async for event in _dashboard_orchestrator.route_message_stream(text):
+            if event["type"] == "done":
+                yield {"type": "done", **_chat_payload(text, event["result"])}
+            else:
+                yield event
     except Exception as e:
-        return {
-            "input": text,
-            "response_lines": [f"❌ Error: {str(e)}"],
-            "tasks": [],
-            "total_tasks": 0,
-            "approved": False,
-            "executed": [],
-        }
-    
-    # Also run semantic router for metadata
-    nlp = process_message(text)
-    pipeline = nlp["pipeline"]
+        yield {"type": "error", "error": str(e)}
+
+
+# Every chat command runs through here, at most DASHBOARD_MAX_CHAT_JOBS at once
+chat_jobs = JobManager(stream_chat)
+
+
+def _chat_payload(text, result):
+    """Shape an orchestrator result for the dashboard JS."""
+    # Router trace computed by route_message (older results: compute it here)
+    pipeline = result.get("pipeline") or process_message(text)["pipeline"]
     
     # Build executed array for backward compat with dashboard JS
     executed = []
@@ -476,7 +515,8 @@ function switchPage(page) {
   document.querySelectorAll('.page').forEach(p => p.classList.remove('active'));
   document.getElementById('page-' + page).classList.add('active');
   document.getElementById('header-title').innerHTML = `<span class="material-icons-round">${icons[page]}</span> ${pages[page]}`;
-  if (page !== 'chat') loadDataPage(page);
+  // With the live feed connected, a page that was already loaded is current
+  if (page !== 'chat' && !(streamOpen && loaded[page])) loadDataPage(page);
 }
 
 /* ═══════════════════════ CHAT ═══════════════════════ */
@@ -517,6 +557,53 @@ function addMsg(type, html, extra='') {
   return div;
 }
 
+// Reads /api/chat/stream (NDJSON) and shows agent steps in the thinking
+// card as they happen. Resolves with the final "done" payload.
+async function streamChat(text, thinking) {
+  const res = await fetch('/api/chat/stream', {
+    method: 'POST',
+    headers: {'Content-Type': 'application/json'},
+    body: JSON.stringify({message: text})
+  });
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buf = '', final = null, live = null;
+  while (true) {
+    const {value, done} = await reader.read();
+    if (done) break;
+    buf += decoder.decode(value, {stream: true});
+    let nl;
+    while ((nl = buf.indexOf('\n')) >= 0) {
+      const line = buf.slice(0, nl).trim();
+      buf = buf.slice(nl + 1);
+      if (!line) continue;
+      const ev = JSON.parse(line);
+      if (ev.type === 'step') {
+        if (!live) {
+          thinking.querySelector('.assembly-title').textContent = '🦸 Agents working...';
+          live = document.createElement('div');
+          live.className = 'agent-cards';
+          thinking.appendChild(live);
+        }
+        thinking.querySelector('.assembly-subtitle').textContent = ev.agent;
+        const step = document.createElement('div');
+        step.className = 'result-card';
+        step.textContent = ev.step;
+        live.appendChild(step);
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+      } else if (ev.type === 'done') {
+        final = ev;
+      } else if (ev.type === 'error') {
+        throw new Error(ev.error);
+      } else if (ev.type === 'cancelled') {
+        throw new Error('Cancelled');
+      }
+    }
+  }
+  if (!final) throw new Error('Response stream ended early');
+  return final;
+}
+
 async function sendMessage() {
   const text = chatInput.value.trim();
   if (!text) return;
@@ -540,12 +627,7 @@ async function sendMessage() {
   chatMessages.scrollTop = chatMessages.scrollHeight;
 
   try {
-    const res = await fetch('/api/chat', {
-      method: 'POST',
-      headers: {'Content-Type': 'application/json'},
-      body: JSON.stringify({message: text})
-    });
-    const data = await res.json();
+    const data = await streamChat(text, thinking);
 
     // Remove thinking
     thinking.remove();
@@ -610,18 +692,55 @@ async function sendMessage() {
 }
 
 /* ═══════════════════════ DATA PAGES ═══════════════════════ */
-async function loadDataPage(page) {
-  try {
-    const res = await fetch('/api/activity');
-    const d = await res.json();
+// Each page reads one collection, newest first, a page at a time
+const COLLECTIONS = {
+  calendar:  {name:'events',    fields:'id,topic,title,time,participants,status,created_at'},
+  alerts:    {name:'alerts',    fields:'id,system,issue,priority,status,created_at'},
+  tickets:   {name:'tickets',   fields:'id,summary,title,assignee,assigned_to,due,deadline,priority,status,created_at'},
+  reminders: {name:'reminders', fields:'id,message,target,time,status,created_at'},
+};
+const PAGE_OF = Object.fromEntries(Object.entries(COLLECTIONS).map(([page, c]) => [c.name, page]));
+const PAGE_SIZE = 50;
+const nextCursors = {};
+const loaded = {};  // page → its counters, once the first page has been shown
+
+async function fetchCollection(page, params='') {
+  const c = COLLECTIONS[page];
+  const res = await fetch(`/api/collections/${c.name}?fields=${c.fields}${params}`);
+  return res.json();
+}
 
-    if (page === 'calendar') renderCalendar(d.meetings);
-    else if (page === 'alerts') renderAlerts(d.alerts);
-    else if (page === 'tickets') renderTickets(d.tickets);
-    else if (page === 'reminders') renderReminders(d.reminders);
+async function loadDataPage(page, more=false) {
+  try {
+    const cursor = more && nextCursors[page] ? `&cursor=${encodeURIComponent(nextCursors[page])}` : '';
+    const d = await fetchCollection(page, `&limit=${PAGE_SIZE}${cursor}`);
+    nextCursors[page] = d.next_cursor;
+    const counts = {total: d.total};
+    if (page === 'alerts') counts.high = (await fetchCollection(page, '&priority=high&limit=0')).total;
+    loaded[page] = counts;
+    renderStats(page);
+    renderGrid(page, d, more);
   } catch(e) { console.error(e); }
 }
 
+function renderGrid(page, d, more) {
+  const view = VIEWS[page];
+  const grid = document.getElementById(view.grid);
+  const old = document.getElementById(page + '-more');
+  if (old) old.remove();
+  if (!more && !d.items.length) { grid.innerHTML = view.empty; return; }
+  const html = d.items.map(view.card).join('');
+  if (more) grid.insertAdjacentHTML('beforeend', html);
+  else grid.innerHTML = html;
+  if (d.next_cursor) {
+    grid.insertAdjacentHTML('afterend', `<button class="example-chip" id="${page}-more" style="margin-top:1rem;width:100%;text-align:center" onclick="loadDataPage('${page}', true)">Load more</button>`);
+  }
+}
+
+function renderStats(page) {
+  document.getElementById(VIEWS[page].stats).innerHTML = VIEWS[page].statsHtml(loaded[page]);
+}
+
 function timeAgo(iso) {
   const diff = (Date.now() - new Date(iso).getTime()) / 1000;
   if (diff < 60) return 'just now';
@@ -630,15 +749,14 @@ function timeAgo(iso) {
   return Math.floor(diff/86400) + 'd ago';
 }
 
-function renderCalendar(items) {
-  const grid = document.getElementById('calendar-grid');
-  const stats = document.getElementById('cal-stats');
-  stats.innerHTML = `<div class="stat-mini"><span class="stat-icon">📅</span><div><div class="stat-num">${items.length}</div><div class="stat-lbl">Total Events</div></div></div>`;
-  if (!items.length) { grid.innerHTML = '<div class="empty-state"><div class="empty-icon">📅</div><p>No meetings scheduled yet.<br>Try: "Schedule a standup for Monday 10am with Alice"</p></div>'; return; }
-  grid.innerHTML = items.slice().reverse().map((e,i) => `
-    <div class="data-card" style="animation-delay:${i*0.05}s">
+const VIEWS = {
+  calendar: {
+    grid: 'calendar-grid', stats: 'cal-stats',
+    statsHtml: (c) => `<div class="stat-mini"><span class="stat-icon">📅</span><div><div class="stat-num">${c.total}</div><div class="stat-lbl">Total Events</div></div></div>`,
+    card: (e) => `
+    <div class="data-card" data-id="${e.id}">
       <div class="card-header">
-        <div class="card-title">📅 ${e.topic}</div>
+        <div class="card-title">📅 ${e.topic || e.title}</div>
         <span class="status-tag scheduled">${e.status}</span>
       </div>
       <div class="card-meta">
@@ -647,19 +765,16 @@ function renderCalendar(items) {
         🕐 ${timeAgo(e.created_at)}
       </div>
       <div class="card-id">${e.id}</div>
-    </div>`).join('');
-}
-
-function renderAlerts(items) {
-  const grid = document.getElementById('alerts-grid');
-  const stats = document.getElementById('alert-stats');
-  const high = items.filter(a => (a.priority||'').toLowerCase()==='high').length;
-  stats.innerHTML = `
-    <div class="stat-mini"><span class="stat-icon">🚨</span><div><div class="stat-num">${items.length}</div><div class="stat-lbl">Total Alerts</div></div></div>
-    <div class="stat-mini"><span class="stat-icon">🔴</span><div><div class="stat-num">${high}</div><div class="stat-lbl">High Priority</div></div></div>`;
-  if (!items.length) { grid.innerHTML = '<div class="empty-state"><div class="empty-icon">🚨</div><p>No alerts yet.<br>Try: "The payment gateway is down! Alert backend-team"</p></div>'; return; }
-  grid.innerHTML = items.slice().reverse().map((e,i) => `
-    <div class="data-card" style="animation-delay:${i*0.05}s">
+    </div>`,
+    empty: '<div class="empty-state"><div class="empty-icon">📅</div><p>No meetings scheduled yet.<br>Try: "Schedule a standup for Monday 10am with Alice"</p></div>',
+  },
+  alerts: {
+    grid: 'alerts-grid', stats: 'alert-stats',
+    statsHtml: (c) => `
+    <div class="stat-mini"><span class="stat-icon">🚨</span><div><div class="stat-num">${c.total}</div><div class="stat-lbl">Total Alerts</div></div></div>
+    <div class="stat-mini"><span class="stat-icon">🔴</span><div><div class="stat-num">${c.high}</div><div class="stat-lbl">High Priority</div></div></div>`,
+    card: (e) => `
+    <div class="data-card" data-id="${e.id}">
       <div class="card-header">
         <div class="card-title">🚨 ${e.system}</div>
         <span class="priority-tag ${(e.priority||'').toLowerCase()}">${e.priority}</span>
@@ -669,36 +784,32 @@ function renderAlerts(items) {
         🕐 ${timeAgo(e.created_at)}
       </div>
       <div class="card-id">${e.id}</div>
-    </div>`).join('');
-}
-
-function renderTickets(items) {
-  const grid = document.getElementById('tickets-grid');
-  const stats = document.getElementById('ticket-stats');
-  stats.innerHTML = `<div class="stat-mini"><span class="stat-icon">🎫</span><div><div class="stat-num">${items.length}</div><div class="stat-lbl">Total Tickets</div></div></div>`;
-  if (!items.length) { grid.innerHTML = '<div class="empty-state"><div class="empty-icon">🎫</div><p>No tickets created yet.<br>Try: "Assign a task to Dana to fix the login bug by Friday"</p></div>'; return; }
-  grid.innerHTML = items.slice().reverse().map((e,i) => `
-    <div class="data-card" style="animation-delay:${i*0.05}s">
+    </div>`,
+    empty: '<div class="empty-state"><div class="empty-icon">🚨</div><p>No alerts yet.<br>Try: "The payment gateway is down! Alert backend-team"</p></div>',
+  },
+  tickets: {
+    grid: 'tickets-grid', stats: 'ticket-stats',
+    statsHtml: (c) => `<div class="stat-mini"><span class="stat-icon">🎫</span><div><div class="stat-num">${c.total}</div><div class="stat-lbl">Total Tickets</div></div></div>`,
+    card: (e) => `
+    <div class="data-card" data-id="${e.id}">
       <div class="card-header">
-        <div class="card-title">🎫 ${e.summary}</div>
+        <div class="card-title">🎫 ${e.summary || e.title}</div>
         <span class="priority-tag ${(e.priority||'').toLowerCase()}">${e.priority}</span>
       </div>
       <div class="card-meta">
-        👤 ${e.assignee}<br>
-        📆 Due: ${e.due}<br>
+        👤 ${e.assignee || e.assigned_to}<br>
+        📆 Due: ${e.due || e.deadline}<br>
         🕐 ${timeAgo(e.created_at)}
       </div>
       <div class="card-id">${e.id}</div>
-    </div>`).join('');
-}
-
-function renderReminders(items) {
-  const grid = document.getElementById('reminders-grid');
-  const stats = document.getElementById('rem-stats');
-  stats.innerHTML = `<div class="stat-mini"><span class="stat-icon">⏰</span><div><div class="stat-num">${items.length}</div><div class="stat-lbl">Total Reminders</div></div></div>`;
-  if (!items.length) { grid.innerHTML = '<div class="empty-state"><div class="empty-icon">⏰</div><p>No reminders set yet.<br>Try: "Remind the product team about design review tomorrow"</p></div>'; return; }
-  grid.innerHTML = items.slice().reverse().map((e,i) => `
-    <div class="data-card" style="animation-delay:${i*0.05}s">
+    </div>`,
+    empty: '<div class="empty-state"><div class="empty-icon">🎫</div><p>No tickets created yet.<br>Try: "Assign a task to Dana to fix the login bug by Friday"</p></div>',
+  },
+  reminders: {
+    grid: 'reminders-grid', stats: 'rem-stats',
+    statsHtml: (c) => `<div class="stat-mini"><span class="stat-icon">⏰</span><div><div class="stat-num">${c.total}</div><div class="stat-lbl">Total Reminders</div></div></div>`,
+    card: (e) => `
+    <div class="data-card" data-id="${e.id}">
       <div class="card-header">
         <div class="card-title">⏰ ${e.message}</div>
         <span class="status-tag pending">${e.status}</span>
@@ -709,98 +820,632 @@ function renderReminders(items) {
         📌 ${timeAgo(e.created_at)}
       </div>
       <div class="card-id">${e.id}</div>
-    </div>`).join('');
+    </div>`,
+    empty: '<div class="empty-state"><div class="empty-icon">⏰</div><p>No reminders set yet.<br>Try: "Remind the product team about design review tomorrow"</p></div>',
+  },
+};
+
+/* ═══════════════════════ LIVE UPDATES ═══════════════════════ */
+// Server-Sent Events from /api/stream patch pages that are already rendered;
+// pages never opened are simply fetched the first time they are shown.
+let streamOpen = false;
+
+function applyChange(op, msg) {
+  const page = PAGE_OF[msg.collection];
+  const counts = loaded[page];
+  if (!counts) return;
+  const view = VIEWS[page];
+  const grid = document.getElementById(view.grid);
+  const card = [...grid.querySelectorAll('[data-id]')].find(el => el.dataset.id === msg.record.id);
+
+  if (op === 'create' && !card) {
+    if (!grid.querySelector('[data-id]')) grid.innerHTML = '';  // drop the empty state
+    grid.insertAdjacentHTML('afterbegin', view.card(msg.record));
+    counts.total++;
+    if (page === 'alerts' && (msg.record.priority || '').toLowerCase() === 'high') counts.high++;
+  } else if (op === 'create' || op === 'update') {
+    if (card) card.outerHTML = view.card(msg.record);
+    if (page === 'alerts') return refreshHighCount();
+  } else if (op === 'delete') {
+    if (card) card.remove();
+    counts.total = Math.max(0, counts.total - 1);
+    if (!grid.querySelector('[data-id]') && !nextCursors[page]) grid.innerHTML = view.empty;
+    if (page === 'alerts') return refreshHighCount();
+  }
+  renderStats(page);
+}
+
+async function refreshHighCount() {
+  try {
+    loaded.alerts.high = (await fetchCollection('alerts', '&priority=high&limit=0')).total;
+    renderStats('alerts');
+  } catch(e) { console.error(e); }
 }
+
+function startLiveFeed() {
+  if (!window.EventSource) return;
+  const source = new EventSource('/api/stream');  // reconnects with Last-Event-ID by itself
+  source.onopen = () => { streamOpen = true; };
+  source.onerror = () => { streamOpen = false; };
+  // "archive" events need nothing: archived records are still listed and counted
+  ['create', 'update', 'delete'].forEach(op =>
+    source.addEventListener(op, e => applyChange(op, JSON.parse(e.data))));
+  // Missed events are no longer available: start over from fresh pages
+  source.addEventListener('reset', () => {
+    Object.keys(loaded).forEach(page => delete loaded[page]);
+    if (currentPage !== 'chat') loadDataPage(currentPage);
+  });
+}
+startLiveFeed();
 </script>
 </body>
 </html>"""
 
 
 # ──────────────────────────────────────────────
-# HTTP Handler
+# Live Change Feed
 # ──────────────────────────────────────────────
-class DashboardHandler(BaseHTTPRequestHandler):
-
-    def log_message(self, fmt, *args):
-        print(f"  [Dashboard] {args[0]}")
-
-    def _send(self, body_bytes, content_type, status=200):
-        self.send_response(status)
-        self.send_header("Content-Type", content_type)
-        self.send_header("Content-Length", str(len(body_bytes)))
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Connection", "close")
-        self.end_headers()
-        self.wfile.write(body_bytes)
-
-    def _json(self, data, status=200):
-        self._send(json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json", status)
-
-    def _html(self, html):
-        self._send(html.encode("utf-8"), "text/html; charset=utf-8")
-
-    def _read_body(self):
-        length = int(self.headers.get("Content-Length", 0))
-        return self.rfile.read(length) if length > 0 else b""
-
-    # GET
-    def do_GET(self):
-        path = urlparse(self.path).path
-        if path in ("/", "/calendar", "/alerts", "/tickets", "/reminders"):
-            self._html(APP_HTML)
-        elif path == "/api/activity":
-            self._json({
-                "meetings": _load_json("calendar.json"),
-                "alerts": _load_json("alerts.json"),
-                "tickets": _load_json("tickets.json"),
-                "reminders": _load_json("reminders.json"),
-            })
-        else:
-            self.send_error(404)
-
-    # POST
-    def do_POST(self):
-        path = urlparse(self.path).path
-        body = self._read_body()
-
+# Seconds between checks of the data files (a version check per collection,
+# in a worker thread)
+STREAM_POLL_INTERVAL = 0.5
+# Comment line sent on idle streams so proxies don't drop them
+STREAM_KEEPALIVE = 15
+# Browsers wait this long (ms) before reconnecting a dropped stream
+STREAM_RETRY_MS = 3000
+
+change_feed = None
+_feed_changed = None  # asyncio.Event, replaced each time new events arrive
+
+
+async def _watch_changes():
+    global _feed_changed
+    while True:
+        await asyncio.sleep(STREAM_POLL_INTERVAL)
         try:
-            if path == "/api/chat":
-                data = json.loads(body) if body else {}
-                msg = data.get("message", "").strip()
-                if not msg:
-                    self._json({"error": "No message provided"}, 400)
-                    return
-                print(f"\n  💬 Chat: \"{msg}\"")
-                result = process_chat(msg)
-                for ex in result["executed"]:
-                    print(f"  ✅ {ex['agent']}: {ex['message']}")
-                self._json(result)
-            else:
-                self.send_error(404)
+            events = await asyncio.to_thread(change_feed.poll)
         except Exception as e:
-            print(f"  ❌ Error: {e}")
-            import traceback; traceback.print_exc()
-            self._json({"error": str(e)}, 500)
+            print(f"  ⚠️  Change feed error: {e}")
+            continue
+        if events:
+            changed, _feed_changed = _feed_changed, asyncio.Event()
+            changed.set()
+
+
+# Hours between archiving runs (archive.py); 0 leaves it to the CLI
+ARCHIVE_INTERVAL_HOURS = float(os.getenv("ARCHIVE_INTERVAL_HOURS", "24"))
+
 
-    # OPTIONS
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.send_header("Connection", "close")
-        self.end_headers()
+async def _archive_periodically():
+    """Move finished records to the compressed archives, now and every ARCHIVE_INTERVAL_HOURS."""
+    while True:
+        try:
+            moved = await asyncio.to_thread(archive.archive_all)
+            if any(moved.values()):
+                print(f"🗄️  Archived {', '.join(f'{n} {name}' for name, n in moved.items() if n)}")
+        except Exception as e:
+            print(f"  ⚠️  Archiving failed: {e}")
+        await asyncio.sleep(ARCHIVE_INTERVAL_HOURS * 3600)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global change_feed, _feed_changed
+    change_feed = await asyncio.to_thread(storage.ChangeFeed)
+    _feed_changed = asyncio.Event()
+    watcher = asyncio.create_task(_watch_changes())
+    # Build the search index in the background so the first query is fast
+    warmup = asyncio.create_task(asyncio.to_thread(get_index().refresh))
+    archiver = asyncio.create_task(_archive_periodically()) if ARCHIVE_INTERVAL_HOURS > 0 else None
+    try:
+        yield
+    finally:
+        watcher.cancel()
+        warmup.cancel()
+        if archiver:
+            archiver.cancel()
+        # Agent records still in the write-behind buffer
+        await get_write_buffer().flush()
 
 
 # ──────────────────────────────────────────────
-# Entry Point
+# HTTP App (ASGI)
 # ──────────────────────────────────────────────
-class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
-    daemon_threads = True
+app = FastAPI(title="ContextOS Dashboard", docs_url=None, redoc_url=None, openapi_url=None,
+              lifespan=lifespan)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
+    allow_headers=["Content-Type"],
+)
+
+PAGE_PATHS = ("/", "/calendar", "/alerts", "/tickets", "/reminders")
+
+# Bodies smaller than this aren't worth gzipping
+GZIP_MIN_BYTES = 1024
+# Serialized API responses kept per (endpoint, query), keyed by data version
+RESPONSE_CACHE_SIZE = 256
+
+# Distinguishes this process's version counters from a previous run's
+_BOOT = format(int(datetime.now().timestamp() * 1000), "x")
+
+
+def _gzip(body: bytes):
+    return gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+
+
+def _accepts_gzip(request: Request) -> bool:
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+
+def _not_modified(request: Request, etag: str, last_modified: float = None) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _encoded_response(request: Request, body: bytes, gzipped, media_type: str,
+                      headers: dict, last_modified: float = None) -> Response:
+    """Serve pre-encoded bytes: 304 if the client's copy is current, gzip if accepted."""
+    headers = {**headers, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if last_modified:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    if _not_modified(request, headers["ETag"], last_modified):
+        return Response(status_code=304, headers=headers)
+    if gzipped is not None and _accepts_gzip(request):
+        return Response(gzipped, media_type=media_type, headers={**headers, "Content-Encoding": "gzip"})
+    return Response(body, media_type=media_type, headers=headers)
 
 
+# The page never changes while the process runs: encode and compress it once
+_HTML_BODY = APP_HTML.encode("utf-8")
+_HTML_GZIP = _gzip(_HTML_BODY)
+_HTML_ETAG = '"' + hashlib.sha256(_HTML_BODY).hexdigest()[:32] + '"'
+
+
+async def index(request: Request):
+    return _encoded_response(request, _HTML_BODY, _HTML_GZIP, "text/html; charset=utf-8",
+                             {"ETag": _HTML_ETAG})
+
+for _path in PAGE_PATHS:
+    app.add_api_route(_path, index, methods=["GET"], include_in_schema=False)
+
+
+_response_cache = OrderedDict()  # cache key → (etag, body, gzipped body); event loop only
+
+
+def _encode_json(build) -> tuple:
+    """(body, gzipped body) of build()'s result; runs in a worker thread."""
+    body = json.dumps(build(), ensure_ascii=False).encode("utf-8")
+    return body, _gzip(body)
+
+
+async def _cached_json(key: str, etag: str, build) -> tuple:
+    """Serialized (and gzipped) response for ``key``, rebuilt only when the ETag changes.
+
+    The cache is only touched here on the event loop, never from threads.
+    """
+    cached = _response_cache.get(key)
+    if cached and cached[0] == etag:
+        _response_cache.move_to_end(key)
+        return cached[1], cached[2]
+    body, gzipped = await asyncio.to_thread(_encode_json, build)
+    _response_cache[key] = (etag, body, gzipped)
+    _response_cache.move_to_end(key)
+    while len(_response_cache) > RESPONSE_CACHE_SIZE:
+        _response_cache.popitem(last=False)
+    return body, gzipped
+
+
+def _data_version(filenames) -> tuple:
+    """(ETag fragment, newest mtime) for a set of data files."""
+    states = [storage.file_state(f) for f in filenames]
+    versions = "-".join(str(version) for version, _ in states)
+    return f"{_BOOT}-{versions}", max(modified for _, modified in states)
+
+
+async def _conditional_json(request: Request, filenames, build) -> Response:
+    """JSON built from ``filenames``; 304 while none of them has changed."""
+    # A stat() per file, or a round trip per file to the storage daemon
+    version, last_modified = await storage.run_io(_data_version, filenames)
+    key = request.url.path + "?" + str(request.query_params)
+    etag = f'"{version}-{zlib.crc32(key.encode()):08x}"'
+    if _not_modified(request, etag, last_modified):
+        return _encoded_response(request, b"", None, "application/json",
+                                 {"ETag": etag}, last_modified)
+    # File reads and serialization happen off the event loop
+    body, gzipped = await _cached_json(key, etag, build)
+    return _encoded_response(request, body, gzipped, "application/json",
+                             {"ETag": etag}, last_modified)
+
+
+ACTIVITY_FILES = ("calendar.json", "alerts.json", "tickets.json", "reminders.json")
+
+
+def _activity():
+    return {
+        "meetings": _load_json("calendar.json"),
+        "alerts": _load_json("alerts.json"),
+        "tickets": _load_json("tickets.json"),
+        "reminders": _load_json("reminders.json"),
+    }
+
+
+@app.get("/api/activity")
+async def api_activity(request: Request):
+    return await _conditional_json(request, ACTIVITY_FILES, _activity)
+
+
+@app.get("/api/collections/{name}")
+async def api_collection(request: Request, name: str, status: str = None, priority: str = None,
+                         since: str = None, until: str = None, fields: str = None,
+                         cursor: str = None, limit: int = storage.DEFAULT_PAGE_SIZE,
+                         order: str = "desc"):
+    """One page of a collection, filtered, projected and sorted by created_at."""
+    if name not in storage.COLLECTIONS:
+        return JSONResponse({"error": f"Unknown collection '{name}'"}, status_code=404)
+    params = dict(status=status, priority=priority, since=since, until=until,
+                  fields=fields, cursor=cursor, limit=limit, order=order)
+    try:
+        return await _conditional_json(
+            request, (storage.collection_file(name),),
+            lambda: storage.query_collection(name, **params),
+        )
+    except storage.QueryError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+
+@app.get("/api/stats")
+async def api_stats():
+    """Totals, status/priority breakdowns, open tickets per assignee, active alerts per system."""
+    return await asyncio.to_thread(get_aggregates().summary)
+
+
+@app.get("/api/stats/timeline")
+async def api_stats_timeline(collection: str = None, bucket: str = "day", status: str = None,
+                             priority: str = None, since: str = None, until: str = None):
+    """Counts per hour or day of created_at."""
+    if collection and collection not in storage.COLLECTIONS:
+        return JSONResponse({"error": f"Unknown collection '{collection}'"}, status_code=404)
+    try:
+        return await asyncio.to_thread(
+            get_aggregates().timeline, collection, bucket=bucket, status=status,
+            priority=priority, since=since, until=until,
+        )
+    except storage.QueryError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+
+async def _analytics(call, *args, **kwargs):
+    try:
+        return await asyncio.to_thread(call, *args, **kwargs)
+    except storage.QueryError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+
+@app.get("/api/analytics/alerts-per-hour")
+async def api_analytics_alerts_per_hour(system: str = None, status: str = None, priority: str = None,
+                                        since: str = None, until: str = None, bucket: str = "hour",
+                                        top: int = 10):
+    """Alerts per hour (or day) of created_at, one series per system."""
+    return await _analytics(get_analytics().per_time_bucket, "alerts", "system", bucket=bucket,
+                            since=since, until=until, top=top, system=system, status=status,
+                            priority=priority)
+
+
+def _ticket_age(edges, status, priority, assignee):
+    analytics = get_analytics()
+    if status is None:
+        # Open tickets only, unless a status is asked for
+        categories = analytics.snapshot("tickets").column("status")[1]
+        status = ",".join(c for c in categories if c not in CLOSED_TICKET_STATUSES) or "-"
+    return analytics.age_distribution("tickets", edges, status=status, priority=priority,
+                                      assignee=assignee)
+
+
+@app.get("/api/analytics/ticket-age")
+async def api_analytics_ticket_age(status: str = None, priority: str = None, assignee: str = None,
+                                   bins: str = None):
+    """Age distribution of open tickets in hours; bins are comma-separated lower edges."""
+    try:
+        edges = sorted(float(b) for b in bins.split(",")) if bins else AGE_BINS_HOURS
+    except ValueError:
+        return JSONResponse({"error": "bins must be comma-separated hours, e.g. 0,24,168"},
+                            status_code=400)
+    return await _analytics(_ticket_age, edges, status, priority, assignee)
+
+
+@app.get("/api/analytics/meeting-load")
+async def api_analytics_meeting_load(since: str = None, until: str = None, status: str = None):
+    """Meetings per participant."""
+    return await _analytics(get_analytics().participant_load, since=since, until=until, status=status)
+
+
+@app.get("/api/analytics/{name}/counts")
+async def api_analytics_counts(name: str, by: str = "status", since: str = None, until: str = None,
+                               status: str = None):
+    """Records per value of a categorical field (status, priority, system, assignee, target)."""
+    if name not in storage.COLLECTIONS:
+        return JSONResponse({"error": f"Unknown collection '{name}'"}, status_code=404)
+    return await _analytics(get_analytics().counts, name, by, since=since, until=until,
+                            status=status)
+
+
+@app.get("/api/search")
+async def api_search(q: str = "", collections: str = None, limit: int = 20, offset: int = 0):
+    """Ranked full-text search; every word must match, as a whole word or a prefix."""
+    if not q.strip():
+        return JSONResponse({"error": "Query parameter 'q' is required"}, status_code=400)
+    names = [c.strip() for c in collections.split(",") if c.strip()] if collections else None
+    unknown = [c for c in names or () if c not in storage.COLLECTIONS]
+    if unknown:
+        return JSONResponse({"error": f"Unknown collection '{unknown[0]}'"}, status_code=400)
+    return await asyncio.to_thread(get_index().search, q, names, limit, offset)
+
+
+# Export output is flushed to the client in chunks of about this many bytes
+EXPORT_FLUSH_BYTES = 64 * 1024
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson; charset=utf-8", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+
+def _export_ndjson(records):
+    buf = []
+    size = 0
+    for r in records:
+        line = json.dumps(r, ensure_ascii=False) + "\n"
+        buf.append(line)
+        size += len(line)
+        if size >= EXPORT_FLUSH_BYTES:
+            yield "".join(buf).encode("utf-8")
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf).encode("utf-8")
+
+
+def _csv_cell(value):
+    # Lists/objects (participants, ...) are kept as JSON inside the cell
+    return json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+
+
+def _export_csv(name, filters, fields):
+    if fields:
+        columns = [f.strip() for f in fields.split(",") if f.strip()]
+    else:
+        # Columns are the union of all keys: one extra streaming pass
+        # instead of holding the records in memory
+        columns = []
+        seen = set()
+        for r in storage.iter_collection(name, **filters):
+            for key in r:
+                if key not in seen:
+                    seen.add(key)
+                    columns.append(key)
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    for r in storage.iter_collection(name, **filters):
+        writer.writerow([_csv_cell(r.get(c, "")) for c in columns])
+        if out.tell() >= EXPORT_FLUSH_BYTES:
+            yield out.getvalue().encode("utf-8")
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue().encode("utf-8")
+
+
+@app.get("/api/export/{name}")
+async def api_export(name: str, format: str = "ndjson", since: str = None, until: str = None,
+                     status: str = None, priority: str = None, fields: str = None):
+    """Every matching record of a collection, streamed as NDJSON or CSV.
+
+    Records are read from the file one at a time (archives a month at a
+    time) and sent with chunked transfer encoding, so memory use doesn't
+    grow with the collection.
+    since/until bound created_at (since inclusive, until exclusive);
+    fields picks the CSV columns (NDJSON always has whole records).
+    """
+    if name not in storage.COLLECTIONS:
+        return JSONResponse({"error": f"Unknown collection '{name}'"}, status_code=404)
+    if format not in EXPORT_FORMATS:
+        return JSONResponse({"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"},
+                            status_code=400)
+    filters = dict(since=since, until=until, status=status, priority=priority)
+    try:
+        records = storage.iter_collection(name, **filters)
+    except storage.QueryError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    media_type, ext = EXPORT_FORMATS[format]
+    # Sync generators are iterated in the threadpool: file reads stay off the loop
+    body = _export_ndjson(records) if format == "ndjson" else _export_csv(name, filters, fields)
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{ext}"
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store",
+    })
+
+
+def _resume_point(last_event_id: str):
+    """Feed position encoded in a Last-Event-ID ("<boot>:<n>"); None if unusable."""
+    boot, _, seq = (last_event_id or "").partition(":")
+    if boot != _BOOT or not seq.isdigit():
+        return None
+    return int(seq)
+
+
+def _sse(event: str, data: dict, event_id: str = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+@app.get("/api/stream")
+async def api_stream(request: Request, last_event_id: str = None):
+    """Server-Sent Events: one create/update/delete event per changed record,
+    and one "archive" event per collection an archive run moved records of.
+
+    Reconnecting clients send Last-Event-ID (or ?last_event_id=) and get
+    the events they missed. If those are gone — too old, or the dashboard
+    restarted — a "reset" event tells them to reload instead.
+    """
+    resume = request.headers.get("last-event-id") or last_event_id
+
+    async def body():
+        yield f"retry: {STREAM_RETRY_MS}\n\n".encode()
+        position = _resume_point(resume) if resume else change_feed.last_id
+        if position is None:
+            position = change_feed.last_id
+            yield _sse("reset", {}, f"{_BOOT}:{position}")
+        while not await request.is_disconnected():
+            changed = _feed_changed
+            events = change_feed.since(position)
+            if events is None:
+                position = change_feed.last_id
+                yield _sse("reset", {}, f"{_BOOT}:{position}")
+                continue
+            for e in events:
+                position = e["id"]
+                yield _sse(e["op"], {"collection": e["collection"], "record": e["record"]},
+                           f"{_BOOT}:{position}")
+            if events:
+                continue
+            try:
+                await asyncio.wait_for(changed.wait(), STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+
+    return StreamingResponse(body(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+async def _chat_message(request: Request):
+    """(message, run in background?) from a chat request body."""
+    try:
+        data = await request.json()
+    except ValueError:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    background = data.get("async") or request.query_params.get("async", "").lower() in ("1", "true")
+    return str(data.get("message", "")).strip(), bool(background)
+
+
+def _ndjson(events):
+    """Newline-delimited JSON response, one line per event."""
+    async def body():
+        async for event in events:
+            yield (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+
+    return StreamingResponse(body(), media_type="application/x-ndjson; charset=utf-8",
+                             headers={"Cache-Control": "no-cache"})
+
+
+def _queue_full(e):
+    print(f"  ⚠️  Chat rejected: {e}")
+    return JSONResponse({"error": "Too many chat commands in progress, try again shortly"},
+                        status_code=503, headers={"Retry-After": "5"})
+
+
+@app.post("/api/chat")
+async def api_chat(request: Request):
+    msg, background = await _chat_message(request)
+    if not msg:
+        return JSONResponse({"error": "No message provided"}, status_code=400)
+    print(f"\n  💬 Chat{' (job)' if background else ''}: \"{msg}\"")
+
+    if background:
+        try:
+            job = chat_jobs.submit(msg)
+        except JobQueueFull as e:
+            return _queue_full(e)
+        return JSONResponse({
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/api/jobs/{job.id}",
+            "stream_url": f"/api/jobs/{job.id}/stream",
+        }, status_code=202)
+
+    try:
+        result = await process_chat(msg)
+    except JobQueueFull as e:
+        return _queue_full(e)
+    except Exception as e:
+        print(f"  ❌ Error: {e}")
+        import traceback; traceback.print_exc()
+        return JSONResponse({"error": str(e)}, status_code=500)
+    for ex in result["executed"]:
+        print(f"  ✅ {ex['agent']}: {ex['message']}")
+    return result
+
+
+@app.post("/api/chat/stream")
+async def api_chat_stream(request: Request):
+    msg, _ = await _chat_message(request)
+    if not msg:
+        return JSONResponse({"error": "No message provided"}, status_code=400)
+    print(f"\n  💬 Chat (stream): \"{msg}\"")
+    try:
+        job = chat_jobs.submit(msg)
+    except JobQueueFull as e:
+        return _queue_full(e)
+
+    async def events():
+        yield {"type": "job", "job_id": job.id}
+        async for event in chat_jobs.follow(job):
+            yield event
+
+    return _ndjson(events())
+
+
+@app.get("/api/jobs")
+async def api_jobs():
+    """Executor load and the most recent jobs."""
+    return {**chat_jobs.metrics(), "jobs": [j.to_dict() for j in chat_jobs.recent()]}
+
+
+@app.get("/api/jobs/{job_id}")
+async def api_job(job_id: str, events: bool = False):
+    job = chat_jobs.get(job_id)
+    if job is None:
+        return JSONResponse({"error": f"Unknown job '{job_id}'"}, status_code=404)
+    return job.to_dict(events=events)
+
+
+@app.get("/api/jobs/{job_id}/stream")
+async def api_job_stream(job_id: str):
+    """The job's events from its first step, following it until it finishes."""
+    job = chat_jobs.get(job_id)
+    if job is None:
+        return JSONResponse({"error": f"Unknown job '{job_id}'"}, status_code=404)
+    return _ndjson(chat_jobs.follow(job))
+
+
+@app.delete("/api/jobs/{job_id}")
+async def api_cancel_job(job_id: str):
+    job = chat_jobs.get(job_id)
+    if job is None:
+        return JSONResponse({"error": f"Unknown job '{job_id}'"}, status_code=404)
+    if not chat_jobs.cancel(job_id):
+        return JSONResponse({"error": f"Job already {job.status}"}, status_code=409)
+    print(f"  🛑 Chat job {job_id} cancelled")
+    return {"job_id": job_id, "cancelling": True}
+
+
+# ──────────────────────────────────────────────
+# Entry Point
+# ──────────────────────────────────────────────
 if __name__ == "__main__":
-    server = ThreadingHTTPServer(("0.0.0.0", PORT), DashboardHandler)
     print()
     print("═" * 52)
     print("  ⚡ ContextOS — Agents Chat Dashboard")
@@ -812,7 +1457,8 @@ if __name__ == "__main__":
     print("  Type natural language in the chat to trigger agents!")
     print()
     try:
-        server.serve_forever()
+        uvicorn.run(app, host="0.0.0.0", port=PORT, log_level="warning", timeout_keep_alive=30,
+                    timeout_graceful_shutdown=5)
     except KeyboardInterrupt:
-        print("\n👋 Dashboard stopped.")
-        server.server_close()
+        pass
+    print("\n👋 Dashboard stopped.")
@@ -25,7 +25,7 @@ import json
 from datetime import datetime
 from typing import Dict, List, Optional
 from enum import Enum
-import uuid
+from ids import new_id
 
 
 class AgentSide(Enum):
@@ -65,7 +65,7 @@ class DistributedMessageTracker:
     async def create_message(self, from_person: str, to_person: str, 
                             content: str) -> str:
         """Create message from sender to receiver"""
-        msg_id = f"MSG-{uuid.uuid4().hex[:6]}"
+        msg_id = new_id("MSG")
         
         message = {
             "id": msg_id,
@@ -356,7 +356,7 @@ class ReceiverResponseSenderAgent:
         await self.tracker.update_status(message_id, MessageStatus.RESPONDED, self.name)
         
         response = {
-            "id": f"RESP-{uuid.uuid4().hex[:6]}",
+            "id": new_id("RESP"),
             "from": "John",
             "to": to_person,
             "content": response_content,
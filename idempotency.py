@@ -0,0 +1,157 @@
+"""
+ContextOS — Idempotent Tool Calls
+Replay the original result when a gateway retries a write tool call.
+
+A call is identified by its tool name plus either
+  - the caller's idempotency_key, remembered for IDEMPOTENCY_TTL seconds, or
+  - without a key, a hash of its arguments, remembered for the shorter
+    DEDUP_WINDOW (identical calls further apart are treated as new).
+
+A repeated call gets the first call's result without running the tool
+again; a retry that arrives while the first call is still running waits
+for it. Failed calls (an exception, or a result with "ok": False) are
+forgotten, so their retries do run.
+
+Usage:
+    @mcp.tool()
+    @idempotent("create_ticket")
+    async def create_ticket(..., idempotency_key: str = None) -> str: ...
+
+    get_idempotency().metrics()   # {"suppressed": ..., ...}
+"""
+
+import os
+import time
+import json
+import asyncio
+import hashlib
+import inspect
+import functools
+from collections import OrderedDict
+
+IDEMPOTENCY_TTL = float(os.getenv("MCP_IDEMPOTENCY_TTL", "86400"))
+# Keyless calls with identical arguments within this many seconds are duplicates (0 disables)
+DEDUP_WINDOW = float(os.getenv("MCP_DEDUP_WINDOW", "120"))
+MAX_ENTRIES = 10000
+
+KEY_PARAM = "idempotency_key"
+
+
+def content_hash(tool: str, params: dict) -> str:
+    raw = json.dumps([tool, params], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class IdempotencyCache:
+    """Bounded TTL map: call identity → future of its result."""
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL, window: float = DEDUP_WINDOW,
+                 max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.window = window
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # identity → (expires at, future)
+        self.executed = 0
+        self.suppressed_by_key = 0
+        self.suppressed_by_hash = 0
+        self.joined_in_flight = 0
+        self.evicted = 0
+        self._last_sweep = 0.0
+
+    async def run(self, tool: str, params: dict, key: str, call):
+        """Result of ``await call()``, or of the earlier identical call."""
+        if key:
+            identity, ttl = f"key:{tool}:{key}", self.ttl
+        elif self.window > 0:
+            identity, ttl = f"hash:{content_hash(tool, params)}", self.window
+        else:
+            self.executed += 1
+            return await call()
+
+        now = time.monotonic()
+        if now - self._last_sweep >= 1:
+            self._expire(now)
+        entry = self._entries.get(identity)
+        if entry is not None and (entry[0] > now or not entry[1].done()):
+            _, future = entry
+            if key:
+                self.suppressed_by_key += 1
+            else:
+                self.suppressed_by_hash += 1
+            if not future.done():
+                self.joined_in_flight += 1
+            print(f"\n[MCP LOG] ♻️  Duplicate {tool} call suppressed "
+                  f"({'key ' + key if key else 'same arguments'})")
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._entries.pop(identity, None)
+        self._entries[identity] = (now + ttl, future)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+        self.executed += 1
+        try:
+            result = await call()
+        except BaseException as e:
+            # Not remembered: a retry should run the tool again
+            self._entries.pop(identity, None)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # retrieved: no "never retrieved" warning without waiters
+            raise
+        if isinstance(result, dict) and result.get("ok") is False:
+            # Reported failure (e.g. a bulk write that was not saved): let retries run
+            self._entries.pop(identity, None)
+        future.set_result(result)
+        return result
+
+    def _expire(self, now: float) -> None:
+        self._last_sweep = now
+        expired = [identity for identity, (expires, future) in self._entries.items()
+                   if expires <= now and future.done()]
+        for identity in expired:
+            del self._entries[identity]
+
+    def metrics(self) -> dict:
+        return {
+            "executed": self.executed,
+            "suppressed": self.suppressed_by_key + self.suppressed_by_hash,
+            "suppressed_by_key": self.suppressed_by_key,
+            "suppressed_by_hash": self.suppressed_by_hash,
+            "joined_in_flight": self.joined_in_flight,
+            "remembered": len(self._entries),
+            "evicted": self.evicted,
+            "ttl_seconds": self.ttl,
+            "dedup_window_seconds": self.window,
+        }
+
+
+_cache = IdempotencyCache()
+
+
+def get_idempotency() -> IdempotencyCache:
+    return _cache
+
+
+def idempotent(tool: str):
+    """Make an async tool replay its result for repeated calls.
+
+    The tool declares an ``idempotency_key: str = None`` parameter (so it is
+    part of the tool's schema); the other arguments form the content hash.
+    """
+    def decorate(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            key = params.pop(KEY_PARAM, None)
+            return await _cache.run(tool, params, key, lambda: fn(*args, **kwargs))
+
+        return wrapper
+    return decorate
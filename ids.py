@@ -0,0 +1,111 @@
+"""
+ContextOS — Record IDs
+Short, time-sortable, collision-resistant IDs for every record type.
+
+Format: <PREFIX>-<time><random>, e.g. TKT-01KXQ8ZC4D7M3YHQ2A
+
+  time     10 Crockford base32 characters: milliseconds since the epoch
+  random   8 Crockford base32 characters: 40 random bits
+
+Like a ULID with a shorter random part: IDs of one prefix sort by creation
+time as plain strings, and two processes would have to draw the same 40
+bits in the same millisecond to collide. Within a process IDs are strictly
+increasing: a second ID in the same millisecond increments the random part
+of the previous one.
+
+Records written before this format (TKT-f1d2) are still valid IDs;
+sort_key() places them by their created_at instead.
+
+Usage:
+    from ids import new_id
+    new_id("TKT")                  # "TKT-01KXQ8ZC4D7M3YHQ2A"
+    id_time("TKT-01KXQ8ZC4D7M3YHQ2A")   # datetime (naive local time)
+"""
+
+import secrets
+import threading
+from datetime import datetime
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"  # Crockford base32
+TIME_CHARS = 10
+RANDOM_CHARS = 8
+RANDOM_BITS = 5 * RANDOM_CHARS
+
+_DECODE = {c: i for i, c in enumerate(ALPHABET)}
+_lock = threading.Lock()
+_last = (0, 0)  # (ms, random) of the previous ID
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def _decode(text: str):
+    value = 0
+    for c in text:
+        digit = _DECODE.get(c)
+        if digit is None:
+            return None
+        value = value * 32 + digit
+    return value
+
+
+def _ms(when: datetime) -> int:
+    # Naive datetimes are local time, like created_at
+    return int(when.timestamp() * 1000)
+
+
+def new_id(prefix: str) -> str:
+    """A new ID like TKT-01KXQ8ZC4D7M3YHQ2A, greater than any earlier one from this process."""
+    global _last
+    with _lock:
+        ms = _ms(datetime.now())
+        last_ms, last_random = _last
+        if ms <= last_ms:
+            # Same millisecond (or the clock went back): keep counting up
+            ms, random = last_ms, last_random + 1
+            if random >> RANDOM_BITS:
+                ms, random = ms + 1, secrets.randbits(RANDOM_BITS - 1)
+        else:
+            # Top bit clear leaves room to count up within the millisecond
+            random = secrets.randbits(RANDOM_BITS - 1)
+        _last = (ms, random)
+    return f"{prefix}-{_encode(ms, TIME_CHARS)}{_encode(random, RANDOM_CHARS)}"
+
+
+def _body(record_id: str):
+    """The time+random part of a time-sortable ID, or None for other IDs."""
+    _, _, body = str(record_id or "").rpartition("-")
+    if len(body) != TIME_CHARS + RANDOM_CHARS or _decode(body) is None:
+        return None
+    return body
+
+
+def id_time(record_id: str):
+    """When a time-sortable ID was allocated (naive local time), or None."""
+    body = _body(record_id)
+    if body is None:
+        return None
+    return datetime.fromtimestamp(_decode(body[:TIME_CHARS]) / 1000)
+
+
+def time_key(when: datetime) -> str:
+    """The time part of IDs allocated at ``when``: a bound for range scans."""
+    return _encode(max(0, _ms(when)), TIME_CHARS)
+
+
+def sort_key(record: dict) -> str:
+    """Creation-order key of a record: its ID's time+random part, or, for
+    older IDs, its created_at encoded the same way followed by the ID."""
+    body = _body(record.get("id"))
+    if body is not None:
+        return body
+    try:
+        created = datetime.fromisoformat(str(record.get("created_at", ""))).replace(tzinfo=None)
+        return time_key(created) + str(record.get("id", ""))
+    except ValueError:
+        return "0" * TIME_CHARS + str(record.get("id", ""))
@@ -0,0 +1,159 @@
+"""
+ContextOS — MCP Worker Router
+Run several MCP server processes behind one port.
+
+    python server.py --workers 4                    # SSE on :8000/sse
+    python server.py --workers 4 --transport http   # streamable HTTP on :8000/mcp
+
+The router starts the workers on the ports after its own (8001, 8002, ...)
+and forwards every request to one of them. MCP sessions live in the worker
+that opened them, so each session sticks to its worker:
+
+  SSE               GET /sse goes to the least busy worker; the router reads
+                    the session_id from the stream's "endpoint" event and
+                    sends POST /messages/?session_id=... to the same worker.
+  streamable HTTP   initialize goes to the least busy worker; requests
+                    carrying its Mcp-Session-Id header follow it.
+
+Workers share data/ through storage's file locks, and each one watches the
+files for the others' writes (record index, subscriptions, search). The
+idempotency cache is per worker: a retry on the same session is
+deduplicated, one that reconnects may land on another worker.
+"""
+
+import re
+import sys
+import time
+import signal
+import socket
+import subprocess
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+# Seconds to wait for the workers to start listening
+STARTUP_TIMEOUT = 60
+# Bytes of an SSE stream searched for the endpoint event
+ENDPOINT_SCAN_BYTES = 4096
+
+SESSION_HEADER = "mcp-session-id"
+_SESSION_RE = re.compile(rb"session_id=([0-9A-Za-z_-]+)")
+# Not forwarded: they describe one hop, not the message
+_HOP_HEADERS = {"host", "connection", "keep-alive", "transfer-encoding", "upgrade",
+                "proxy-connection", "te", "trailer", "content-length"}
+
+
+class WorkerRouter:
+    def __init__(self, upstreams: list):
+        self.upstreams = upstreams              # ["http://127.0.0.1:8001", ...]
+        self.sessions = {}                      # session id → worker index
+        self.load = [0] * len(upstreams)        # open requests/streams per worker
+        self.client = httpx.AsyncClient(timeout=httpx.Timeout(None, connect=10),
+                                        limits=httpx.Limits(max_connections=None,
+                                                            max_keepalive_connections=100))
+
+    def pick(self) -> int:
+        return min(range(len(self.upstreams)), key=lambda i: self.load[i])
+
+    async def forward(self, request):
+        session = request.query_params.get("session_id") or request.headers.get(SESSION_HEADER)
+        if session:
+            worker = self.sessions.get(session)
+            if worker is None:
+                return JSONResponse({"error": "Unknown or expired session"}, status_code=404)
+        else:
+            worker = self.pick()
+
+        url = self.upstreams[worker] + request.url.path
+        if request.url.query:
+            url += "?" + request.url.query
+        headers = [(k, v) for k, v in request.headers.items() if k.lower() not in _HOP_HEADERS]
+        upstream_request = self.client.build_request(request.method, url, headers=headers,
+                                                     content=await request.body())
+        try:
+            response = await self.client.send(upstream_request, stream=True)
+        except httpx.HTTPError as e:
+            print(f"⚠️ Worker {worker + 1} unreachable: {e}")
+            return JSONResponse({"error": "MCP worker unavailable"}, status_code=502)
+
+        new_session = response.headers.get(SESSION_HEADER)
+        if new_session:
+            self.sessions[new_session] = worker
+        if session and (response.status_code == 404 or request.method == "DELETE"):
+            self.sessions.pop(session, None)
+
+        self.load[worker] += 1
+        body = response.aiter_raw()
+        if request.method == "GET" and request.url.path.rstrip("/").endswith("/sse"):
+            body = self._track_sse(body, worker)
+        return StreamingResponse(
+            body,
+            status_code=response.status_code,
+            headers={k: v for k, v in response.headers.items() if k.lower() not in _HOP_HEADERS},
+            background=BackgroundTask(self._finish, response, worker),
+        )
+
+    async def _track_sse(self, body, worker: int):
+        """Pass an SSE stream through, mapping its session to ``worker`` for as long as it is open."""
+        seen, session = b"", None
+        try:
+            async for chunk in body:
+                if session is None and len(seen) < ENDPOINT_SCAN_BYTES:
+                    seen += chunk
+                    match = _SESSION_RE.search(seen)
+                    if match:
+                        session = match.group(1).decode("ascii")
+                        self.sessions[session] = worker
+                yield chunk
+        finally:
+            if session is not None:
+                self.sessions.pop(session, None)
+
+    async def _finish(self, response, worker: int) -> None:
+        self.load[worker] -= 1
+        await response.aclose()
+
+
+def _wait_for(port: int, processes: list) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if any(p.poll() is not None for p in processes):
+            raise SystemExit("❌ An MCP worker exited during startup")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"❌ MCP worker on port {port} did not start within {STARTUP_TIMEOUT}s")
+
+
+def run_router(script: str, transport: str, host: str, port: int, workers: int) -> None:
+    """Start ``workers`` copies of ``script`` on the following ports and route ``host:port`` to them."""
+    ports = [port + 1 + i for i in range(workers)]
+    # Stop the workers on SIGTERM too, not only on Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    processes = [
+        subprocess.Popen([sys.executable, script, "--transport", transport, "--host", "127.0.0.1",
+                          "--port", str(p), "--workers", "1", "--quiet"])
+        for p in ports
+    ]
+    try:
+        for p in ports:
+            _wait_for(p, processes)
+        router = WorkerRouter([f"http://127.0.0.1:{p}" for p in ports])
+        app = Starlette(routes=[Route("/{path:path}", router.forward,
+                                      methods=["GET", "POST", "DELETE"])])
+        print(f"🔀 Routing :{port} → {workers} workers on ports {ports[0]}-{ports[-1]}")
+        uvicorn.run(app, host=host, port=port, log_level="warning")
+    finally:
+        for p in processes:
+            p.terminate()
+        for p in processes:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
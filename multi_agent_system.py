@@ -17,10 +17,10 @@ so the Telegram bot can render rich step-by-step responses.
 
 import os
 import sys
-import json
 import uuid
 import asyncio
 import re
+import contextvars
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict
 from enum import Enum
@@ -29,9 +29,11 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from semantic_router import process_message
 from slack_integration import intelligent_send, broadcast_to_channel
 from phone_agent import PhoneCallingAgent
+from ids import new_id
+from write_buffer import get_write_buffer
+import storage
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
-os.makedirs(DATA_DIR, exist_ok=True)
+DATA_DIR = storage.DATA_DIR
 os.makedirs(os.path.join(DATA_DIR, "agents"), exist_ok=True)
 
 
@@ -40,19 +42,8 @@ os.makedirs(os.path.join(DATA_DIR, "agents"), exist_ok=True)
 # ──────────────────────────────────────────────────────────────
 
 def _load_json(filename: str) -> list:
-    filepath = os.path.join(DATA_DIR, filename)
-    if os.path.exists(filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return storage.load_json(filename)
 
-def _save_json(filename: str, data: list):
-    filepath = os.path.join(DATA_DIR, filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
-def _gen_id(prefix: str) -> str:
-    return f"{prefix}-{uuid.uuid4().hex[:4]}"
 
 def _find_contact(name: str) -> Optional[dict]:
     """Find contact by name (case-insensitive)."""
@@ -82,6 +73,28 @@ def _find_expert(expertise: str) -> Optional[dict]:
     return None
 
 
+# ──────────────────────────────────────────────────────────────
+# Step Streaming
+# ──────────────────────────────────────────────────────────────
+
+# Callback (agent_name, step) installed by route_message_stream()
+_step_sink = contextvars.ContextVar("step_sink", default=None)
+
+
+class StepLog(list):
+    """An agent's steps list that also reports each step to an active stream."""
+
+    def __init__(self, agent_name: str):
+        super().__init__()
+        self.agent_name = agent_name
+
+    def append(self, step):
+        super().append(step)
+        sink = _step_sink.get()
+        if sink:
+            sink(self.agent_name, step)
+
+
 # ──────────────────────────────────────────────────────────────
 # Agent Status
 # ──────────────────────────────────────────────────────────────
@@ -104,7 +117,7 @@ class AgentTaskQueue:
     
     async def add_task(self, task: dict):
         async with self.lock:
-            task["id"] = _gen_id("TSK")
+            task["id"] = new_id("TSK")
             task["created_at"] = datetime.now().isoformat()
             task["status"] = "pending"
             self.tasks.append(task)
@@ -170,6 +183,10 @@ class BaseAgent:
     async def execute_task(self, task: dict) -> dict:
         """Override in subclass. Must return {"steps": [...], ...}"""
         raise NotImplementedError
+
+    def new_steps(self) -> StepLog:
+        """Steps list for one task; appended steps are streamed live."""
+        return StepLog(self.name)
     
     async def work(self):
         pass
@@ -196,66 +213,37 @@ class CalendarAgent(BaseAgent):
         return {"steps": [f"❓ {self.name}: Unknown action '{action}'"]}
     
     async def schedule_event(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         title = task.get("title", "Meeting")
         time = task.get("time", "TBD")
         participants = task.get("participants", [])
         force = task.get("force", False)
         
-        # Step 1: Check availability & Conflicts
-        conflicting_event = None
-        events = _load_json("calendar.json")
-        
+        # Step 1: Check availability
+        person_name = None
         if participants:
             person_name = participants[0] if isinstance(participants[0], str) else str(participants[0])
             steps.append(f"✅ CalendarAgent: Checking {person_name}'s availability...")
             await asyncio.sleep(0.1)
-            
-            # Simple conflict check: same person + same time string (for demo)
-            for e in events:
-                if person_name in e.get("participants", []) and e.get("time", "").lower() == time.lower() and e.get("status") != "cancelled":
-                    conflicting_event = e
-                    break
-            
-            if conflicting_event:
-                if not force:
-                    # Fix: Handle both 'topic' and 'title' keys
-                    conflict_title = conflicting_event.get("topic", conflicting_event.get("title", "Meeting"))
-                    steps.append(f"⚠️ Conflict detected: {person_name} has '{conflict_title}' at {time}")
-                    steps.append(f"❓ Prioritize this meeting or assign to someone else?")
-                    return {
-                        "steps": steps,
-                        "status": "conflict",
-                        "conflict_details": conflicting_event
-                    }
-                else:
-                    conflict_title = conflicting_event.get("topic", conflicting_event.get("title", "Meeting"))
-                    steps.append(f"⚠️ Conflict override: Removing '{conflict_title}'")
-                    conflicting_event["status"] = "cancelled"
-                    # In a real app we would notify them of cancellation
-            
-            steps.append(f"📅 {person_name} free at {time} ✅")
         else:
             steps.append(f"✅ CalendarAgent: Reserving time slot at {time}...")
-        
-
 
         # Generate Meeting Link if requested
         meeting_link = ""
+        link_step = None
         lower_title = title.lower()
         if "google meet" in lower_title or "meet" in lower_title:
             meeting_link = f"https://meet.google.com/{uuid.uuid4().hex[:3]}-{uuid.uuid4().hex[:4]}-{uuid.uuid4().hex[:3]}"
-            steps.append(f"📹 Generated Google Meet link: {meeting_link}")
+            link_step = f"📹 Generated Google Meet link: {meeting_link}"
         elif "zoom" in lower_title:
             # Zoom IDs are typically 9-11 digits, using hex for simplicity here
             meeting_link = f"https://zoom.us/j/{uuid.uuid4().int % 10**10}?pwd={uuid.uuid4().hex[:8]}"
-            steps.append(f"📹 Generated Zoom link: {meeting_link}")
+            link_step = f"📹 Generated Zoom link: {meeting_link}"
         elif "teams" in lower_title:
             meeting_link = f"https://teams.microsoft.com/l/meetup-join/{uuid.uuid4().hex}"
-            steps.append(f"📹 Generated Teams link: {meeting_link}")
+            link_step = f"📹 Generated Teams link: {meeting_link}"
 
-        # Step 2: Create event
-        eid = _gen_id("EVT")
+        eid = new_id("EVT")
         event = {
             "id": eid,
             "title": title,
@@ -266,9 +254,44 @@ class CalendarAgent(BaseAgent):
             "status": "scheduled",
             "link": meeting_link
         }
-        events.append(event)
-        _save_json("calendar.json", events)
-        
+
+        # Step 2: Conflict check and create event, in one locked write so
+        # events added meanwhile by other processes are seen and kept
+        def book(events):
+            conflict = None
+            if person_name:
+                # Simple conflict check: same person + same time string (for demo)
+                for e in events:
+                    if person_name in e.get("participants", []) and e.get("time", "").lower() == time.lower() and e.get("status") != "cancelled":
+                        conflict = e
+                        break
+            if conflict and not force:
+                return conflict
+            if conflict:
+                # In a real app we would notify them of cancellation
+                conflict["status"] = "cancelled"
+            events.append(event)
+            return conflict
+
+        conflicting_event = await storage.update_json("calendar.json", book)
+
+        if conflicting_event:
+            # Fix: Handle both 'topic' and 'title' keys
+            conflict_title = conflicting_event.get("topic", conflicting_event.get("title", "Meeting"))
+            if not force:
+                steps.append(f"⚠️ Conflict detected: {person_name} has '{conflict_title}' at {time}")
+                steps.append(f"❓ Prioritize this meeting or assign to someone else?")
+                return {
+                    "steps": steps,
+                    "status": "conflict",
+                    "conflict_details": conflicting_event
+                }
+            steps.append(f"⚠️ Conflict override: Removing '{conflict_title}'")
+        if person_name:
+            steps.append(f"📅 {person_name} free at {time} ✅")
+        if link_step:
+            steps.append(link_step)
+
         steps.append(f"✅ Meeting scheduled | {eid}")
         
         return {
@@ -278,7 +301,7 @@ class CalendarAgent(BaseAgent):
         }
     
     async def reschedule_event(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         old_time = task.get("old_time", "")
         new_time = task.get("new_time", "")
         person = task.get("person", "")
@@ -289,40 +312,37 @@ class CalendarAgent(BaseAgent):
             await asyncio.sleep(0.1)
             steps.append(f"📅 {person} FREE at {new_time} ✅")
         
-        # Step 2: Reschedule
-        events = _load_json("calendar.json")
-        found = False
-        for event in events:
-            evt_time = event.get("time", "").lower()
-            if old_time.lower() in evt_time:
-                event["time"] = new_time
-                event["rescheduled_at"] = datetime.now().isoformat()
-                event["status"] = "rescheduled"
-                found = True
-                break
-        
-        if found:
-            _save_json("calendar.json", events)
-            steps.append(f"✅ Meeting rescheduled from {old_time} → {new_time}")
-        else:
+        # Step 2: Reschedule (one locked write: concurrent appends are kept)
+        def move(events):
+            for event in events:
+                evt_time = event.get("time", "").lower()
+                if old_time.lower() in evt_time:
+                    event["time"] = new_time
+                    event["rescheduled_at"] = datetime.now().isoformat()
+                    event["status"] = "rescheduled"
+                    return None
             # Create new entry for the reschedule
-            eid = _gen_id("EVT")
-            event = {
+            eid = new_id("EVT")
+            events.append({
                 "id": eid,
                 "title": f"Rescheduled: {old_time} → {new_time}",
                 "time": new_time,
                 "participants": [person] if person else [],
                 "created_at": datetime.now().isoformat(),
                 "status": "rescheduled"
-            }
-            events.append(event)
-            _save_json("calendar.json", events)
+            })
+            return eid
+
+        eid = await storage.update_json("calendar.json", move)
+        if eid is None:
+            steps.append(f"✅ Meeting rescheduled from {old_time} → {new_time}")
+        else:
             steps.append(f"✅ Meeting rescheduled to {new_time} | {eid}")
         
         return {"steps": steps, "status": "success"}
     
     async def query_meetings(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         events = _load_json("calendar.json")
         
         steps.append("📅 CalendarAgent: Fetching your meetings...")
@@ -364,7 +384,7 @@ class AlertAgent(BaseAgent):
         return {"steps": [f"❓ {self.name}: Unknown action"]}
     
     async def send_alert(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         title = task.get("title", "Alert")
         message = task.get("message", "Unknown issue")
         priority = task.get("priority", "High")
@@ -372,7 +392,7 @@ class AlertAgent(BaseAgent):
         target_person = task.get("target_person", "")
         
         # Step 1: Create alert
-        aid = _gen_id("ALT")
+        aid = new_id("ALT")
         is_critical = priority.lower() in ("critical", "high")
         
         steps.append(f"🚨 AlertAgent: {'CRITICAL' if is_critical else priority.upper()} alert")
@@ -386,9 +406,8 @@ class AlertAgent(BaseAgent):
             "status": "active",
             "recipients": recipients
         }
-        alerts = _load_json("alerts.json")
-        alerts.append(alert)
-        _save_json("alerts.json", alerts)
+        # Group-committed with other agents' writes; stored before we report it
+        await get_write_buffer().write("alerts.json", alert)
         
         # Step 2: Send to recipients
         if target_person:
@@ -440,7 +459,7 @@ class AlertAgent(BaseAgent):
         return {"steps": steps, "alert_id": aid, "status": "sent"}
     
     async def escalate(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         steps.append("🚨 AlertAgent: CRITICAL status")
         
         contacts = _load_json("contacts.json")
@@ -470,13 +489,13 @@ class TaskAgent(BaseAgent):
         return {"steps": [f"❓ {self.name}: Unknown action"]}
     
     async def create_ticket(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         title = task.get("title", "Task")
         assigned_to = task.get("assigned_to", "unassigned")
         priority = task.get("priority", "Medium")
         deadline = task.get("deadline", "TBD")
         
-        tid = _gen_id("TKT")
+        tid = new_id("TKT")
         
         ticket = {
             "id": tid,
@@ -487,9 +506,7 @@ class TaskAgent(BaseAgent):
             "created_at": datetime.now().isoformat(),
             "status": "open"
         }
-        tickets = _load_json("tickets.json")
-        tickets.append(ticket)
-        _save_json("tickets.json", tickets)
+        await get_write_buffer().write("tickets.json", ticket)
         
         steps.append(f"🎫 TaskAgent: Ticket created for {assigned_to}")
         steps.append(f"📋 {title} | Priority: {priority} | {tid}")
@@ -518,7 +535,7 @@ class SearchAgent(BaseAgent):
         return {"steps": [f"❓ {self.name}: Unknown action"]}
     
     async def find_expert(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         expertise = task.get("expertise", "")
         
         steps.append(f"🔍 SearchAgent: Searching for {expertise} expert...")
@@ -532,22 +549,20 @@ class SearchAgent(BaseAgent):
             
             # Log the search
             msg_log = {
-                "id": _gen_id("MSG"),
+                "id": new_id("MSG"),
                 "to": contact["name"],
                 "message": f"You were identified as the {expertise} expert",
                 "sent_at": datetime.now().isoformat(),
                 "status": "sent"
             }
-            messages = _load_json("messages.json")
-            messages.append(msg_log)
-            _save_json("messages.json", messages)
+            get_write_buffer().add("messages.json", msg_log)
         else:
             steps.append(f"❌ No {expertise} expert found in contacts")
         
         return {"steps": steps, "status": "found" if contact else "not_found"}
     
     async def web_search(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         query = task.get("query", "")
         
         steps.append(f"🔍 SearchAgent: Searching '{query}'...")
@@ -555,20 +570,18 @@ class SearchAgent(BaseAgent):
         
         # Simulate search
         search_log = {
-            "id": _gen_id("SCH"),
+            "id": new_id("SCH"),
             "query": query,
             "searched_at": datetime.now().isoformat(),
             "status": "completed"
         }
-        searches = _load_json("searches.json") if os.path.exists(os.path.join(DATA_DIR, "searches.json")) else []
-        searches.append(search_log)
-        _save_json("searches.json", searches)
+        get_write_buffer().add("searches.json", search_log)
         
         steps.append(f"✅ Search complete: results found for '{query}'")
         return {"steps": steps, "status": "found"}
     
     async def monitor_status(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         service = task.get("service", "system")
         
         steps.append(f"📊 SearchAgent: Checking {service} status...")
@@ -595,11 +608,11 @@ class DelegationAgent(BaseAgent):
         return {"steps": [f"❓ {self.name}: Unknown action"]}
     
     async def delegate_to_person(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         person = task.get("person", "unknown")
         task_desc = task.get("task_description", "")
         
-        dlg_id = _gen_id("DLG")
+        dlg_id = new_id("DLG")
         delegation = {
             "id": dlg_id,
             "person": person,
@@ -607,20 +620,18 @@ class DelegationAgent(BaseAgent):
             "assigned_at": datetime.now().isoformat(),
             "status": "assigned"
         }
-        delegations = _load_json("delegations.json") if os.path.exists(os.path.join(DATA_DIR, "delegations.json")) else []
-        delegations.append(delegation)
-        _save_json("delegations.json", delegations)
+        get_write_buffer().add("delegations.json", delegation)
         
         steps.append(f"👤 DelegationAgent: Task delegated to {person}")
         steps.append(f"📋 {task_desc} | {dlg_id}")
         return {"steps": steps, "status": "delegated"}
     
     async def contact_person(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         person = task.get("person", "")
         message = task.get("message", "")
         
-        msg_id = _gen_id("MSG")
+        msg_id = new_id("MSG")
         contact_log = {
             "id": msg_id,
             "to": person,
@@ -628,9 +639,7 @@ class DelegationAgent(BaseAgent):
             "sent_at": datetime.now().isoformat(),
             "status": "sent"
         }
-        contacts = _load_json("messages.json")
-        contacts.append(contact_log)
-        _save_json("messages.json", contacts)
+        get_write_buffer().add("messages.json", contact_log)
         
         steps.append(f"💬 DelegationAgent: Contacted {person}")
         return {"steps": steps, "status": "sent"}
@@ -658,7 +667,7 @@ class MessagingAgent(BaseAgent):
         return {"steps": [f"❓ {self.name}: Unknown action"]}
     
     async def send_message(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         person = task.get("person", "")
         message = task.get("message", "")
         
@@ -667,7 +676,7 @@ class MessagingAgent(BaseAgent):
         steps.append(f"✅ MessageDeliveryAgent: Message sent to {person}")
         
         # Log message
-        msg_id = _gen_id("MSG")
+        msg_id = new_id("MSG")
         msg_log = {
             "id": msg_id,
             "to": person,
@@ -676,9 +685,7 @@ class MessagingAgent(BaseAgent):
             "status": "delivered",
             "channel": "slack" if contact else "queued"
         }
-        messages = _load_json("messages.json")
-        messages.append(msg_log)
-        _save_json("messages.json", messages)
+        get_write_buffer().add("messages.json", msg_log)
         
         # Try to find contact
         contact = _find_contact(person)
@@ -698,7 +705,7 @@ class MessagingAgent(BaseAgent):
         return {"steps": steps, "message_id": msg_id, "status": "delivered"}
     
     async def send_status_update(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         person = task.get("person", "")
         message = task.get("message", "")
         
@@ -706,7 +713,7 @@ class MessagingAgent(BaseAgent):
         
         steps.append(f"✅ MessageDeliveryAgent: Sent to {person}")
         
-        msg_id = _gen_id("MSG")
+        msg_id = new_id("MSG")
         msg_log = {
             "id": msg_id,
             "to": person,
@@ -715,9 +722,7 @@ class MessagingAgent(BaseAgent):
             "status": "delivered",
             "channel": "slack"
         }
-        messages = _load_json("messages.json")
-        messages.append(msg_log)
-        _save_json("messages.json", messages)
+        get_write_buffer().add("messages.json", msg_log)
         
         # REAL Status Update to #social (or #general)
         # We simulate this by sending to a user, or we could add channel support to intelligent_send.
@@ -741,7 +746,7 @@ class MessagingAgent(BaseAgent):
         return {"steps": steps, "status": "delivered"}
     
     async def notify_contacts(self, task: dict) -> dict:
-        steps = []
+        steps = self.new_steps()
         people = task.get("people", [])
         message = task.get("message", "")
         
@@ -781,10 +786,15 @@ class AgentOrchestrator:
         }
     
     async def route_message(self, message: str, context: dict = None) -> dict:
-        """Route message to agents and return rich step-by-step results."""
+        """Route message to agents and return rich step-by-step results.
+
+        The result includes the semantic router trace under "pipeline"."""
         
         print(f"\n⚡ Processing: {message}")
         msg_lower = message.lower()
+
+        # Semantic routing runs once per message; the trace is returned to callers
+        pipeline = process_message(message)["pipeline"]
         
         all_agent_results = []
         
@@ -813,7 +823,7 @@ class AgentOrchestrator:
                     "force": True  # FORCE IT!
                 })
                 all_agent_results.append({"agent": "CalendarAgent", "result": r1})
-                return self._build_response(message, all_agent_results)
+                return self._build_response(message, all_agent_results, pipeline)
         
         # ─── Pattern 1: "Tell X to fix Y" → Message + Ticket ───
         tell_fix_match = re.search(
@@ -841,7 +851,7 @@ class AgentOrchestrator:
             })
             all_agent_results.append({"agent": "TaskAgent", "result": r2})
             
-            return self._build_response(message, all_agent_results)
+            return self._build_response(message, all_agent_results, pipeline)
         
         # ─── Pattern 2: "Tell X the Y is fixed" → Status update ───
         tell_fixed_match = re.search(
@@ -859,7 +869,7 @@ class AgentOrchestrator:
             })
             all_agent_results.append({"agent": "MessageDeliveryAgent", "result": r1})
             
-            return self._build_response(message, all_agent_results)
+            return self._build_response(message, all_agent_results, pipeline)
         
         # ─── Pattern 3: "Tell/Contact X to/about Y" (general message) ───
         tell_match = re.search(
@@ -877,7 +887,7 @@ class AgentOrchestrator:
             })
             all_agent_results.append({"agent": "MessageDeliveryAgent", "result": r1})
             
-            return self._build_response(message, all_agent_results)
+            return self._build_response(message, all_agent_results, pipeline)
         
         # ─── Pattern 4: "Schedule meeting with X at Y" ───
         schedule_match = re.search(
@@ -896,7 +906,7 @@ class AgentOrchestrator:
             })
             all_agent_results.append({"agent": "CalendarAgent", "result": r1})
             
-            return self._build_response(message, all_agent_results)
+            return self._build_response(message, all_agent_results, pipeline)
         
         # ─── Pattern 5: "Reschedule X to Y" ───
         reschedule_match = re.search(
@@ -930,7 +940,7 @@ class AgentOrchestrator:
             })
             all_agent_results.append({"agent": "CalendarAgent", "result": r1})
             
-            return self._build_response(message, all_agent_results)
+            return self._build_response(message, all_agent_results, pipeline)
         
         # ─── Pattern 6: "What meetings do I have?" ───
         if any(q in msg_lower for q in ["what meeting", "my meeting", "list meeting", "show meeting", "upcoming meeting", "do i have"]):
@@ -939,7 +949,7 @@ class AgentOrchestrator:
             })
             all_agent_results.append({"agent": "CalendarAgent", "result": r1})
             
-            return self._build_response(message, all_agent_results)
+            return self._build_response(message, all_agent_results, pipeline)
         
         # ─── Pattern 7: "Find the X expert" ───
         # Handle "who is exper tin devops", "who knows python", "find devops expert"
@@ -964,9 +974,9 @@ class AgentOrchestrator:
                     "expertise": expertise
                 })
                 all_agent_results.append({"agent": "SearchAgent", "result": r1})
-                return self._build_response(message, all_agent_results)
+                return self._build_response(message, all_agent_results, pipeline)
             
-            return self._build_response(message, all_agent_results)
+            return self._build_response(message, all_agent_results, pipeline)
         
         # ─── Pattern 8: "Critical X is down!" / "Send alert to X" ───
         alert_to_match = re.search(r'(?:send|trigger)\s+(?:an?\s+)?alert\s+(?:to\s+)?(\w+)?', msg_lower)
@@ -982,7 +992,7 @@ class AgentOrchestrator:
                 "target_person": target
             })
             all_agent_results.append({"agent": "AlertAgent", "result": r1})
-            return self._build_response(message, all_agent_results)
+            return self._build_response(message, all_agent_results, pipeline)
         
         if critical_match:
             r1 = await self.agents["AlertAgent"].execute_task({
@@ -992,7 +1002,7 @@ class AgentOrchestrator:
                 "priority": "Critical"
             })
             all_agent_results.append({"agent": "AlertAgent", "result": r1})
-            return self._build_response(message, all_agent_results)
+            return self._build_response(message, all_agent_results, pipeline)
 
         # ─── Pattern 9: "Call X to Y" (Voice Agent) ───
         call_match = re.search(r'call\s+(\w+)\s+(?:to|about|for)\s+(.+)', msg_lower)
@@ -1036,11 +1046,9 @@ class AgentOrchestrator:
                      })
                      all_agent_results.append({"agent": "PhoneCallingAgent", "result": r1})
             
-            return self._build_response(message, all_agent_results)
+            return self._build_response(message, all_agent_results, pipeline)
         
         # ─── Fallback: Use semantic router ───
-        result = process_message(message)
-        pipeline = result["pipeline"]
         rpcs = pipeline.get("stage_4_rpc_plan", [])
         
         if rpcs:
@@ -1068,6 +1076,7 @@ class AgentOrchestrator:
                 "total_tasks": 0,
                 "tasks": [],
                 "agent_results": [],
+                "pipeline": pipeline,
                 "response_lines": [
                     "🤔 I understood your message but couldn't identify a clear action.",
                     "",
@@ -1079,9 +1088,57 @@ class AgentOrchestrator:
                 ]
             }
         
-        return self._build_response(message, all_agent_results)
+        return self._build_response(message, all_agent_results, pipeline)
     
-    def _build_response(self, message: str, agent_results: list) -> dict:
+    async def route_message_stream(self, message: str, context: dict = None):
+        """Async-generator variant of route_message().
+
+        Yields {"type": "step", "agent": ..., "step": ...} as soon as each agent
+        records a step, then {"type": "done", "result": ...} with the same
+        result route_message() returns.
+        """
+        queue = asyncio.Queue()
+
+        def _sink(agent_name, step):
+            queue.put_nowait({"type": "step", "agent": agent_name, "step": step})
+
+        # The routing task copies the current context, sink included
+        token = _step_sink.set(_sink)
+        try:
+            routing = asyncio.ensure_future(self.route_message(message, context))
+        finally:
+            _step_sink.reset(token)
+
+        next_event = None
+        try:
+            while True:
+                next_event = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({next_event, routing}, return_when=asyncio.FIRST_COMPLETED)
+                if next_event in done:
+                    yield next_event.result()
+                    continue
+                break
+
+            while not queue.empty():
+                yield queue.get_nowait()
+        finally:
+            # Closed or cancelled early (e.g. a cancelled chat job): stop the agents too
+            routing.cancel()
+            if next_event is not None:
+                next_event.cancel()
+
+        result = routing.result()
+
+        # Agents that don't use new_steps() (e.g. PhoneCallingAgent) report at the end
+        for ar in result.get("agent_results", []):
+            steps = ar.get("result", {}).get("steps", [])
+            if not isinstance(steps, StepLog):
+                for step in steps:
+                    yield {"type": "step", "agent": ar["agent"], "step": step}
+
+        yield {"type": "done", "result": result}
+
+    def _build_response(self, message: str, agent_results: list, pipeline: dict = None) -> dict:
         """Build the final response with step-by-step lines."""
         response_lines = []
         tasks = []
@@ -1114,6 +1171,7 @@ class AgentOrchestrator:
             "total_tasks": len(agent_results),
             "tasks": tasks,
             "agent_results": agent_results,
+            "pipeline": pipeline,
             "response_lines": response_lines
         }
     
@@ -0,0 +1,318 @@
+"""
+ContextOS — Record Index
+Lookup indexes for the MCP query tools, so questions like "what's on
+Monday" or "Dana's open tickets" touch only the matching records.
+
+Indexed:
+  id                              every collection
+  status                          every collection
+  participants                    events
+  priority, system                alerts
+  priority, assignee              tickets
+  target                          reminders
+  meeting time                    events, sorted, for date ranges
+  creation order                  every collection, sorted by ID, for since/until
+
+Event times are free text ("Monday 10am", "tomorrow 2pm", "2026-02-16
+14:00"); parse_when() resolves them against the event's created_at, the
+same way the semantic router resolves relative dates. Times it cannot
+place on a day are simply left out of the time index.
+
+Kept current like the search index: each lookup checks the storage
+versions (one stat() per collection, or a daemon round trip) and applies
+only the changed records.
+Records moved to the archives (archive.py) are not indexed;
+lookup_archived() filters them the same way, month by month.
+
+Usage:
+    from record_index import get_record_index
+    index = get_record_index()
+    index.lookup("tickets", assignee="dana", status="open")
+    index.lookup("alerts", since="2026-02-16", until="2026-02-17")
+    index.between(datetime(2026, 2, 16), datetime(2026, 2, 17))
+"""
+
+import re
+import bisect
+import threading
+from datetime import datetime, timedelta, time as clock_time
+
+import ids
+import archive
+import storage
+
+INDEXED_FIELDS = {
+    "events": ("status", "participants"),
+    "alerts": ("status", "priority", "system"),
+    "tickets": ("status", "priority", "assignee"),
+    "reminders": ("status", "target"),
+}
+
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_DATE_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+# ID time may precede created_at slightly (the ID is allocated first)
+_CREATED_SLACK = timedelta(seconds=1)
+_CLOCK_RE = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b|\b(\d{1,2}):(\d{2})\b", re.IGNORECASE)
+
+
+def parse_when(text: str, reference: datetime = None) -> tuple:
+    """Resolve a free-text time against ``reference`` (default: now).
+
+    Returns (datetime, has_clock_time), or (None, False) if the text names
+    neither a day nor a time of day. A time without a day falls on the
+    reference day; a weekday means its next occurrence after it.
+    """
+    reference = reference or datetime.now()
+    text = str(text or "").strip()
+    if not text:
+        return None, False
+    try:
+        parsed = datetime.fromisoformat(text)
+        return parsed.replace(tzinfo=None), len(text) > 10
+    except ValueError:
+        pass
+
+    lower = text.lower()
+    day = None
+    match = _DATE_RE.search(lower)
+    if match:
+        try:
+            day = datetime.fromisoformat(match.group(1)).date()
+        except ValueError:
+            pass
+    if day is None:
+        if "today" in lower or "tonight" in lower:
+            day = reference.date()
+        elif "tomorrow" in lower:
+            day = reference.date() + timedelta(days=1)
+        elif "next week" in lower:
+            day = reference.date() + timedelta(days=7 - reference.weekday())
+        else:
+            for i, name in enumerate(_WEEKDAYS):
+                if name in lower or re.search(rf"\b{name[:3]}\b", lower):
+                    days_ahead = (i - reference.weekday()) % 7 or 7
+                    day = reference.date() + timedelta(days=days_ahead)
+                    break
+
+    hour = minute = None
+    match = _CLOCK_RE.search(lower)
+    if match:
+        if match.group(3):
+            hour, minute = int(match.group(1)) % 12, int(match.group(2) or 0)
+            if match.group(3) == "pm":
+                hour += 12
+        else:
+            hour, minute = int(match.group(4)), int(match.group(5))
+        if hour > 23 or minute > 59:
+            hour = minute = None
+    elif "noon" in lower:
+        hour, minute = 12, 0
+
+    if day is None and hour is None:
+        return None, False
+    day = day or reference.date()
+    return datetime.combine(day, clock_time(hour or 0, minute or 0)), hour is not None
+
+
+def _keys(value) -> list:
+    values = value if isinstance(value, list) else [value]
+    return [str(v).strip().lower() for v in values if v not in (None, "")]
+
+
+class RecordIndex:
+    def __init__(self, collections: dict = None):
+        self._tracker = storage.SnapshotTracker(collections)
+        self.collections = self._tracker.collections
+        self._lock = threading.Lock()
+        self._fields = {}    # (collection, field) → {value: {id, ...}}
+        self._starts = []    # sorted (start iso, event id)
+        self._start_of = {}  # event id → (start iso, has clock time)
+        self._created = {}   # collection → sorted (ids.sort_key, id)
+        self._listeners = []
+
+    # ── Maintenance ────────────────────────────
+    def add_listener(self, listener) -> None:
+        """Call ``listener(changes)`` with each non-empty batch of
+        [(collection, before, after)] the index applies, in order.
+
+        Called on the refreshing thread with the index locked: keep it quick.
+        """
+        self._listeners.append(listener)
+
+    def refresh(self) -> None:
+        """Apply the writes made since the last call (by any process)."""
+        with self._lock:
+            added, created = [], {}
+            changes = self._tracker.changes()
+            for name, before, after in changes:
+                if before is not None:
+                    self._remove(name, before)
+                if after is not None:
+                    self._add(name, after, added)
+                    created.setdefault(name, []).append((ids.sort_key(after), after["id"]))
+            if added:
+                # One sort instead of an insort per event (the first refresh adds them all)
+                self._starts.extend(added)
+                self._starts.sort()
+            for name, entries in created.items():
+                order = self._created.setdefault(name, [])
+                order.extend(entries)
+                order.sort()
+            if changes:
+                for listener in self._listeners:
+                    listener(changes)
+
+    def _add(self, name: str, record: dict, added: list) -> None:
+        record_id = record["id"]
+        for field in INDEXED_FIELDS.get(name, ()):
+            postings = self._fields.setdefault((name, field), {})
+            for key in _keys(self._field_value(record, field)):
+                postings.setdefault(key, set()).add(record_id)
+        if name == "events":
+            start, has_time = event_start(record)
+            if start is not None:
+                entry = (start.isoformat(), record_id)
+                added.append(entry)
+                self._start_of[record_id] = (entry[0], has_time)
+
+    def _remove(self, name: str, record: dict) -> None:
+        record_id = record["id"]
+        for field in INDEXED_FIELDS.get(name, ()):
+            postings = self._fields.get((name, field), {})
+            for key in _keys(self._field_value(record, field)):
+                members = postings.get(key)
+                if members is not None:
+                    members.discard(record_id)
+                    if not members:
+                        del postings[key]
+        if name == "events" and record_id in self._start_of:
+            start, _ = self._start_of.pop(record_id)
+            _discard(self._starts, (start, record_id))
+        _discard(self._created.get(name, []), (ids.sort_key(record), record_id))
+
+    @staticmethod
+    def _field_value(record: dict, field: str):
+        if field == "assignee":
+            return record.get("assignee") or record.get("assigned_to")
+        return record.get(field)
+
+    # ── Lookups ────────────────────────────────
+    def lookup(self, name: str, since: str = None, until: str = None, **equals) -> list:
+        """Records of a collection whose indexed fields match.
+
+        Each filter is a comma-separated list of accepted values
+        (case-insensitive); None skips the filter. since/until bound
+        created_at like storage.query() does, found by a range scan over the
+        time-sorted IDs. Raises KeyError for an unknown collection and
+        QueryError for a field that is not indexed or a malformed date.
+        """
+        if name not in self.collections:
+            raise KeyError(name)
+        in_range = storage.record_filter(since=since, until=until) if since or until else None
+        self.refresh()
+        with self._lock:
+            records = self._tracker.records(name)
+            selected = self._created_between(name, since, until) if in_range else None
+            for field, wanted in equals.items():
+                if wanted is None:
+                    continue
+                if field not in INDEXED_FIELDS.get(name, ()):
+                    raise storage.QueryError(f"{name} cannot be filtered by {field}")
+                postings = self._fields.get((name, field), {})
+                matching = set()
+                for key in _keys(wanted.split(",")):
+                    matching |= postings.get(key, set())
+                selected = matching if selected is None else selected & matching
+            if selected is None:
+                return list(records.values())
+            found = [records[i] for i in selected if i in records]
+            return [r for r in found if in_range(r)] if in_range else found
+
+    def lookup_archived(self, name: str, since: str = None, until: str = None, **equals) -> list:
+        """Like lookup(), over the records in the collection's archives that
+        are no longer hot. Opens no archive when the status filter names only
+        states that never get archived (archive.may_hold())."""
+        if name not in self.collections:
+            raise KeyError(name)
+        wanted = {}
+        for field, value in equals.items():
+            if value is None:
+                continue
+            if field not in INDEXED_FIELDS.get(name, ()):
+                raise storage.QueryError(f"{name} cannot be filtered by {field}")
+            wanted[field] = set(_keys(value.split(",")))
+        in_range = storage.record_filter(since=since, until=until)
+        if not archive.may_hold(name, equals.get("status")):
+            return []
+        self.refresh()
+        with self._lock:
+            hot = set(self._tracker.records(name))
+        return [r for r in archive.iter_archived(name, hot, since=since, until=until)
+                if in_range(r) and all(keys & set(_keys(self._field_value(r, field)))
+                                       for field, keys in wanted.items())]
+
+    def _created_between(self, name: str, since: str, until: str) -> set:
+        """IDs of records created in about [since, until); lookup() trims the edges."""
+        order = self._created.get(name, [])
+        lo = hi = None
+        if since:
+            lo = bisect.bisect_left(order, (ids.time_key(datetime.fromisoformat(since) - _CREATED_SLACK),))
+        if until:
+            hi = bisect.bisect_left(order, (ids.time_key(datetime.fromisoformat(until) + _CREATED_SLACK),))
+        return {record_id for _, record_id in order[lo:hi]}
+
+    def between(self, start: datetime, end: datetime) -> list:
+        """[(start, has_clock_time, event)] of events starting in [start, end), in time order."""
+        self.refresh()
+        with self._lock:
+            events = self._tracker.records("events")
+            lo = bisect.bisect_left(self._starts, (start.isoformat(), ""))
+            hi = bisect.bisect_left(self._starts, (end.isoformat(), ""))
+            found = []
+            for iso, record_id in self._starts[lo:hi]:
+                found.append((datetime.fromisoformat(iso), self._start_of[record_id][1], events[record_id]))
+            return found
+
+    def get(self, record_id: str) -> tuple:
+        """(collection, record) for an id, or (None, None)."""
+        self.refresh()
+        with self._lock:
+            for name in self.collections:
+                record = self._tracker.records(name).get(record_id)
+                if record is not None:
+                    return name, record
+        return None, None
+
+
+def _discard(entries: list, entry: tuple) -> None:
+    i = bisect.bisect_left(entries, entry)
+    if i < len(entries) and entries[i] == entry:
+        del entries[i]
+
+
+def event_start(event: dict) -> tuple:
+    """(start, has_clock_time) of an event's time, as the time index places it."""
+    return parse_when(event.get("time"), _created(event))
+
+
+def _created(record: dict) -> datetime:
+    try:
+        return datetime.fromisoformat(str(record.get("created_at", ""))).replace(tzinfo=None)
+    except ValueError:
+        return datetime.now()
+
+
+# ──────────────────────────────────────────────
+# Shared instance
+# ──────────────────────────────────────────────
+_record_index = None
+_record_index_lock = threading.Lock()
+
+
+def get_record_index() -> RecordIndex:
+    """Process-wide record index, built on first use."""
+    global _record_index
+    with _record_index_lock:
+        if _record_index is None:
+            _record_index = RecordIndex()
+        return _record_index
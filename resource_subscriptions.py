@@ -0,0 +1,138 @@
+"""
+ContextOS — Resource Subscriptions
+Push record changes to MCP clients instead of having them re-read files.
+
+Resources:
+  contextos://collections/{name}   a collection (events, alerts, tickets, reminders)
+  contextos://records/{id}         one record
+
+A client that subscribes to a URI (resources/subscribe) receives a
+notifications/resources/updated for it whenever a write lands, with the
+changed record IDs in the notification's _meta:
+
+    {"uri": "contextos://collections/alerts",
+     "_meta": {"contextos/changes": [{"id": "ALT-3f2a", "change": "create"}]}}
+
+Changes come from the record index, which diffs the data files whatever
+process wrote them. Clients on the 2026-07-28 protocol use
+subscriptions/listen instead: they get the same notifications without the
+_meta IDs (that wire format has no room for them) and can read the
+collection resource, whose "recent_changes" lists them.
+
+Usage:
+    subscriptions = ResourceSubscriptions()
+    subscriptions.install(mcp._mcp_server)  # FastMCP's low-level server
+    await subscriptions.publish(changes)    # [(collection, before, after)]
+"""
+
+from collections import deque
+
+try:
+    import mcp_types as types
+except ImportError:  # older MCP SDKs
+    from mcp import types
+
+try:  # subscriptions/listen (2026-07-28 protocol); absent from older SDKs
+    from mcp.server.subscriptions import InMemorySubscriptionBus, ListenHandler, ResourceUpdated
+except ImportError:
+    InMemorySubscriptionBus = ListenHandler = ResourceUpdated = None
+
+COLLECTION_URI = "contextos://collections/{name}"
+RECORD_URI = "contextos://records/{id}"
+CHANGES_META_KEY = "contextos/changes"
+
+# IDs listed in one notification; beyond this it is marked truncated
+MAX_IDS_PER_NOTIFICATION = 500
+# Changes per collection kept for the collection resource's recent_changes
+RECENT_CHANGES = 100
+
+
+def change_type(before, after) -> str:
+    return "create" if before is None else "delete" if after is None else "update"
+
+
+def _client_key(session):
+    # Newer SDKs build a session object per request over one connection;
+    # subscriptions belong to the connection
+    return getattr(session, "_connection", session)
+
+
+class ResourceSubscriptions:
+    def __init__(self, bus=None):
+        if bus is None and InMemorySubscriptionBus is not None:
+            bus = InMemorySubscriptionBus()
+        self.bus = bus        # subscriptions/listen fan-out (2026-07-28 clients), if supported
+        self._clients = {}    # client key → (session, {uri, ...})
+        self.recent = {}      # collection → deque of {"id", "change"}
+        self.sent = 0
+
+    def subscribe(self, session, uri: str) -> None:
+        key = _client_key(session)
+        _, uris = self._clients.setdefault(key, (session, set()))
+        uris.add(uri)
+
+    def unsubscribe(self, session, uri: str) -> None:
+        key = _client_key(session)
+        entry = self._clients.get(key)
+        if entry is not None:
+            entry[1].discard(uri)
+            if not entry[1]:
+                del self._clients[key]
+
+    def install(self, server) -> None:
+        """Serve resources/subscribe and resources/unsubscribe (plus
+        subscriptions/listen where the SDK has it) on a low-level MCP server."""
+        async def on_subscribe(ctx, params):
+            self.subscribe(ctx.session, str(params.uri))
+            print(f"\n[MCP LOG] 🔔 Subscribed to {params.uri} ({self.count} subscriptions)")
+            return types.EmptyResult()
+
+        async def on_unsubscribe(ctx, params):
+            self.unsubscribe(ctx.session, str(params.uri))
+            return types.EmptyResult()
+
+        server.add_request_handler("resources/subscribe", types.SubscribeRequestParams, on_subscribe)
+        server.add_request_handler("resources/unsubscribe", types.UnsubscribeRequestParams, on_unsubscribe)
+        if self.bus is not None:
+            server.add_request_handler("subscriptions/listen", types.SubscriptionsListenRequestParams,
+                                       ListenHandler(self.bus))
+
+    @property
+    def count(self) -> int:
+        return sum(len(uris) for _, uris in self._clients.values())
+
+    def updates(self, changes: list) -> dict:
+        """uri → [{"id", "change"}] for a batch of (collection, before, after)."""
+        updates = {}
+        for name, before, after in changes:
+            record = after if after is not None else before
+            item = {"id": record.get("id"), "change": change_type(before, after)}
+            updates.setdefault(COLLECTION_URI.format(name=name), []).append(item)
+            updates.setdefault(RECORD_URI.format(id=item["id"]), []).append(item)
+            self.recent.setdefault(name, deque(maxlen=RECENT_CHANGES)).append(item)
+        return updates
+
+    async def publish(self, changes: list) -> None:
+        """Notify the subscribers of every URI the changes touch."""
+        if not changes:
+            return
+        updates = self.updates(changes)
+        for key, (session, uris) in list(self._clients.items()):
+            for uri in uris & updates.keys():
+                items = updates[uri]
+                meta = {CHANGES_META_KEY: items[:MAX_IDS_PER_NOTIFICATION]}
+                if len(items) > MAX_IDS_PER_NOTIFICATION:
+                    meta["contextos/truncated"] = True
+                notification = types.ResourceUpdatedNotification(
+                    params=types.ResourceUpdatedNotificationParams(uri=uri, _meta=meta)
+                )
+                try:
+                    await session.send_notification(notification)
+                    self.sent += 1
+                except Exception:
+                    # Connection gone: forget its subscriptions
+                    self._clients.pop(key, None)
+                    break
+        if self.bus is not None:
+            for uri in updates:
+                await self.bus.publish(ResourceUpdated(uri=uri))
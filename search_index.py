@@ -0,0 +1,317 @@
+"""
+ContextOS — Full-Text Search
+Inverted index over the text fields of every collection.
+
+Indexed fields (weight):
+  summary, title, topic  → 3
+  issue, system, message → 2
+  participants, assignee, assigned_to, target → 1
+
+Queries are tokenized the same way as records (lowercase words, common
+stopwords dropped); every query token must match (AND), either exactly or
+— for tokens of MIN_PREFIX_LEN characters or more — as a prefix of an
+indexed term ("deplo" finds "deploy" and "deployment"). Hits are ranked by
+field weight × idf, exact matches counting double, most recently indexed
+first on ties.
+
+The index follows the data files by itself: each search checks the
+storage version of every collection (one stat() each, or a storage daemon
+round trip) and re-indexes only the records that were added, changed or
+removed since. Archived records
+(archive.py) stay searchable: each archived month is read once per change
+of its partition file, and a record moving from the hot file to the
+archive keeps its place in the index.
+
+Usage:
+    from search_index import get_index
+    get_index().search("payment gateway", collections=["alerts"], limit=10)
+"""
+
+import re
+import math
+import bisect
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import archive
+import storage
+
+FIELD_WEIGHTS = {
+    "summary": 3, "title": 3, "topic": 3,
+    "issue": 2, "system": 2, "message": 2,
+    "participants": 1, "assignee": 1, "assigned_to": 1, "target": 1,
+}
+
+# Shorter query tokens only match whole terms
+MIN_PREFIX_LEN = 2
+# A prefix expands to at most this many indexed terms
+MAX_PREFIX_TERMS = 64
+# Score multiplier for a term matching the query token exactly
+EXACT_BOOST = 2.0
+# Terms whose postings are kept as numpy arrays between queries
+MAX_CACHED_TERMS = 2048
+
+DEFAULT_LIMIT = 20
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or the to with".split()
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> list:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _doc_terms(record: dict) -> dict:
+    """term → summed field weight for one record."""
+    terms = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        value = record.get(field)
+        if not value:
+            continue
+        text = " ".join(map(str, value)) if isinstance(value, list) else str(value)
+        for token in tokenize(text):
+            terms[token] = terms.get(token, 0) + weight
+    return terms
+
+
+def _changed(old: dict, new: dict) -> set:
+    """IDs added, removed or changed between two {id: record} maps."""
+    return (old.keys() ^ new.keys()) | {i for i, r in new.items() if i in old and old[i] != r}
+
+
+class SearchIndex:
+    def __init__(self, collections: dict = None):
+        self.collections = dict(collections or storage.COLLECTIONS)
+        self._codes = {name: i for i, name in enumerate(self.collections)}
+        self._records = {}    # collection → {id: record} as last indexed
+        self._versions = {}
+        self._hot = {}        # collection → {id: record} of the data file
+        self._months = {}     # archive partition path → (signature, {id: record})
+        self._archived = {}   # collection → {id: record} over its partitions
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        # Records are numbered as they are indexed; postings hold those numbers
+        self._postings = {}   # term → {doc: weight}
+        self._terms = []      # sorted vocabulary, for prefix lookups
+        self._docs = {}       # doc → (collection, record, terms)
+        self._doc_of = {}     # (collection, id) → doc
+        self._next_doc = 0
+        # Collection code per doc number (-1: removed), for filtering in numpy
+        self._doc_codes = np.full(1024, -1, dtype=np.int8)
+        self._arrays = OrderedDict()  # term → (docs, weights), see _term_arrays()
+
+    def __len__(self):
+        return len(self._docs)
+
+    # ── Maintenance ────────────────────────────
+    def refresh(self) -> None:
+        """Bring the index up to date with the data files."""
+        with self._lock:
+            for name in self.collections:
+                self._refresh(name)
+            if self._next_doc > 2 * len(self._docs) + 65536:
+                self._renumber()
+
+    def _refresh(self, name: str) -> None:
+        filename = self.collections[name]
+        version = storage.file_version(filename)
+        changed = set()
+        if self._versions.get(name) != version:
+            try:
+                records = storage.load_json(filename)
+            except (OSError, ValueError):
+                return  # caught mid-write; the next search retries
+            new = {r["id"]: r for r in records if isinstance(r, dict) and "id" in r}
+            changed |= _changed(self._hot.get(name, {}), new)
+            self._hot[name] = new
+            self._versions[name] = version
+        changed |= self._refresh_archived(name)
+
+        # The hot copy of a record wins over an archived one
+        hot, archived = self._hot[name], self._archived.get(name, {})
+        indexed = self._records.setdefault(name, {})
+        for record_id in changed:
+            record = hot[record_id] if record_id in hot else archived.get(record_id)
+            previous = indexed.get(record_id)
+            if previous == record:
+                continue
+            if previous is not None:
+                self._remove(name, record_id)
+                del indexed[record_id]
+            if record is not None:
+                self._add(name, record)
+                indexed[record_id] = record
+
+    def _refresh_archived(self, name: str) -> set:
+        """Re-read the archived months of a collection whose partition
+        changed; returns the IDs added, changed or removed."""
+        changed = set()
+        archived = self._archived.setdefault(name, {})
+        for _, path in archive.partitions(name):
+            signature = archive.signature(path)
+            known, old = self._months.get(path, (None, {}))
+            if known == signature:
+                continue
+            new = {r["id"]: r for r in archive.iter_partition(path) if "id" in r}
+            for record_id in _changed(old, new):
+                changed.add(record_id)
+                if record_id in new:
+                    archived[record_id] = new[record_id]
+                else:
+                    archived.pop(record_id, None)
+            self._months[path] = (signature, new)
+        return changed
+
+    def _renumber(self) -> None:
+        """Re-index from scratch once updates have left too many unused doc numbers."""
+        self._reset()
+        for name, records in self._records.items():
+            for record in records.values():
+                self._add(name, record)
+
+    def _add(self, name: str, record: dict) -> None:
+        doc = self._next_doc
+        self._next_doc += 1
+        if doc >= len(self._doc_codes):
+            grown = np.full(2 * len(self._doc_codes), -1, dtype=np.int8)
+            grown[:len(self._doc_codes)] = self._doc_codes
+            self._doc_codes = grown
+        self._doc_codes[doc] = self._codes[name]
+
+        terms = _doc_terms(record)
+        for term, weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[doc] = weight
+            self._arrays.pop(term, None)
+        self._docs[doc] = (name, record, terms)
+        self._doc_of[(name, record["id"])] = doc
+
+    def _remove(self, name: str, record_id) -> None:
+        doc = self._doc_of.pop((name, record_id))
+        _, _, terms = self._docs.pop(doc)
+        self._doc_codes[doc] = -1
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc]
+            self._arrays.pop(term, None)
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+
+    # ── Queries ────────────────────────────────
+    def _term_arrays(self, term: str) -> tuple:
+        """(doc numbers, weights) of a term as numpy arrays, cached until it changes."""
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self._postings[term]
+            arrays = (np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                      np.fromiter(postings.values(), dtype=np.float32, count=len(postings)))
+            self._arrays[term] = arrays
+            if len(self._arrays) > MAX_CACHED_TERMS:
+                self._arrays.popitem(last=False)
+        else:
+            self._arrays.move_to_end(term)
+        return arrays
+
+    def _expand(self, token: str) -> list:
+        """[(term, boost)] of the indexed terms a query token matches."""
+        matches = []
+        if token in self._postings:
+            matches.append((token, EXACT_BOOST))
+        if len(token) >= MIN_PREFIX_LEN:
+            i = bisect.bisect_right(self._terms, token)
+            end = min(len(self._terms), i + MAX_PREFIX_TERMS)
+            while i < end and self._terms[i].startswith(token):
+                matches.append((self._terms[i], 1.0))
+                i += 1
+        return matches
+
+    def search(self, query: str, collections: list = None, limit: int = DEFAULT_LIMIT,
+               offset: int = 0) -> dict:
+        """Ranked records matching every token of ``query``.
+
+        Returns:
+            {"items": [{"collection", "id", "score", "record"}...],
+             "total": <matching records>, "next_offset": int | None}
+        """
+        limit = max(0, min(int(limit), storage.MAX_PAGE_SIZE))
+        offset = max(0, int(offset))
+        empty = {"items": [], "total": 0, "next_offset": None}
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return empty
+
+        self.refresh()
+        with self._lock:
+            expanded = [self._expand(token) for token in tokens]
+            if not all(expanded):
+                return empty
+
+            # Dense vectors over doc numbers: a token's contribution to a doc
+            # is its best-scoring matching term; all tokens must contribute
+            size = self._next_doc
+            total_docs = len(self._docs) or 1
+            scores = np.zeros(size, dtype=np.float32)
+            matched = None
+            for matches in expanded:
+                contribution = np.zeros(size, dtype=np.float32)
+                for term, boost in matches:
+                    docs, weights = self._term_arrays(term)
+                    factor = boost * math.log(1 + total_docs / len(docs))
+                    contribution[docs] = np.maximum(contribution[docs], weights * factor)
+                scores += contribution
+                hit = contribution > 0
+                matched = hit if matched is None else matched & hit
+
+            if collections:
+                wanted = [self._codes[c] for c in collections if c in self._codes]
+                matched &= np.isin(self._doc_codes[:size], wanted)
+
+            candidates = np.flatnonzero(matched)
+            total = len(candidates)
+            wanted_count = min(offset + limit, total)
+            if wanted_count <= offset:
+                top = candidates[:0]
+            else:
+                candidate_scores = scores[candidates]
+                if wanted_count < total:
+                    keep = np.argpartition(-candidate_scores, wanted_count - 1)[:wanted_count]
+                    candidates, candidate_scores = candidates[keep], candidate_scores[keep]
+                # Best score first; newest (highest doc number) first on ties
+                order = np.lexsort((-candidates, -candidate_scores))
+                top = candidates[order][offset:wanted_count]
+
+            items = []
+            for doc in top.tolist():
+                name, record, _ = self._docs[doc]
+                items.append({"collection": name, "id": record["id"],
+                              "score": round(float(scores[doc]), 3), "record": record})
+
+        next_offset = offset + limit if limit and offset + limit < total else None
+        return {"items": items, "total": total, "next_offset": next_offset}
+
+
+# ──────────────────────────────────────────────
+# Shared instance
+# ──────────────────────────────────────────────
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> SearchIndex:
+    """Process-wide index, built on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+        return _index
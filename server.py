@@ -6,52 +6,166 @@ Translates natural language (via Archestra) into structured machine actions.
 The "Hands" of the system - executes tools and stores results as JSON proof.
 """
 
-import json
 import os
+import sys
 import uuid
-from datetime import datetime
+import queue
+import atexit
+import bisect
+import asyncio
+import logging
+import logging.handlers
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
 
 from fastmcp import FastMCP
+from fastmcp.exceptions import ResourceError
+
+from search_index import get_index
+from record_index import get_record_index, parse_when, event_start
+from resource_subscriptions import ResourceSubscriptions, COLLECTION_URI, RECORD_URI
+from idempotency import idempotent, get_idempotency
+from ids import new_id
+import archive
+import storage
+
+# ──────────────────────────────────────────────
+# Action Log
+# ──────────────────────────────────────────────
+# Tools run on the event loop: they hand their log lines to a queue, and a
+# listener thread does the (blocking) writes to stdout, so a slow terminal
+# or pipe never stalls tool calls
+log = logging.getLogger("contextos.server")
+
+
+def _start_action_log():
+    if log.handlers:
+        return
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter("%(message)s"))
+    lines = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(lines, output)
+    listener.start()
+    atexit.register(listener.stop)  # flushes what is still queued
+    log.addHandler(logging.handlers.QueueHandler(lines))
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+
+_start_action_log()
+
 
 # ──────────────────────────────────────────────
 # Initialize FastMCP Server
 # ──────────────────────────────────────────────
-mcp = FastMCP("ContextOS")
+# External writes are noticed within this many seconds (see _watch_changes)
+WATCH_INTERVAL = 0.5
+
+subscriptions = ResourceSubscriptions()
+_watcher = None
+
+
+@asynccontextmanager
+async def _lifespan(server):
+    global _watcher
+    if _watcher is None or _watcher.done():
+        _watcher = asyncio.create_task(_watch_changes())
+    yield {}
+
+
+mcp = FastMCP("ContextOS", lifespan=_lifespan)
+subscriptions.install(mcp._mcp_server)
 
 # Data directory for JSON storage (visible proof for judges)
-DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
-os.makedirs(DATA_DIR, exist_ok=True)
+DATA_DIR = storage.DATA_DIR
 
 
 # ──────────────────────────────────────────────
 # Helper: Read/Write JSON storage
 # ──────────────────────────────────────────────
-def _load_json(filename: str) -> list:
-    """Load existing entries from a JSON file."""
-    filepath = os.path.join(DATA_DIR, filename)
-    if os.path.exists(filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+# Tools are async: file access runs on storage's I/O thread pool, and
+# writes to the same collection take turns (storage.append_json), so
+# concurrent tool calls never block the event loop or each other's
+# unrelated collections.
+async def _append(filename: str, entry: dict, check=None):
+    """Append ``entry`` to a collection; ``check(records)`` runs first, under the same lock."""
+    return await storage.append_json(filename, [entry], check)
 
 
-def _save_json(filename: str, data: list) -> None:
-    """Save entries to a JSON file."""
-    filepath = os.path.join(DATA_DIR, filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+# ──────────────────────────────────────────────
+# Helper: Build records (shared by single and bulk tools)
+# ──────────────────────────────────────────────
+def _meeting_link(topic: str) -> str:
+    """Generate a meeting link when the topic names a video platform."""
+    lower_topic = topic.lower()
+    if "google meet" in lower_topic or "meet" in lower_topic:
+        return f"https://meet.google.com/{uuid.uuid4().hex[:3]}-{uuid.uuid4().hex[:4]}-{uuid.uuid4().hex[:3]}"
+    elif "zoom" in lower_topic:
+        return f"https://zoom.us/j/{uuid.uuid4().int % 10**10}?pwd={uuid.uuid4().hex[:8]}"
+    elif "teams" in lower_topic:
+        return f"https://teams.microsoft.com/l/meetup-join/{uuid.uuid4().hex}"
+    return ""
 
 
-def _generate_id(prefix: str) -> str:
-    """Generate a short unique ID like EVT-a3b8 or TKT-f1d2."""
-    return f"{prefix}-{uuid.uuid4().hex[:4]}"
+def _event_entry(topic: str, time: str, participants: list) -> dict:
+    return {
+        "id": new_id("EVT"),
+        "topic": topic,
+        "time": time,
+        "participants": participants,
+        "created_at": datetime.now().isoformat(),
+        "status": "scheduled",
+        "link": _meeting_link(topic)
+    }
+
+
+def _alert_entry(system: str, issue: str, priority: str) -> dict:
+    return {
+        "id": new_id("ALT"),
+        "system": system,
+        "issue": issue,
+        "priority": priority,
+        "created_at": datetime.now().isoformat(),
+        "status": "active"
+    }
+
+
+def _ticket_entry(assignee: str, summary: str, due: str, priority: str) -> dict:
+    return {
+        "id": new_id("TKT"),
+        "assignee": assignee,
+        "summary": summary,
+        "due": due,
+        "priority": priority,
+        "created_at": datetime.now().isoformat(),
+        "status": "open"
+    }
+
+
+def _reminder_entry(message: str, time: str, target: str) -> dict:
+    return {
+        "id": new_id("REM"),
+        "message": message,
+        "time": time,
+        "target": target,
+        "created_at": datetime.now().isoformat(),
+        "status": "pending"
+    }
+
+
+def _conflicts(events: list, time: str) -> list:
+    """Topics of the active events already booked at ``time`` (simple conflict check)."""
+    return [e.get("topic") for e in events
+            if e.get("time") == time and e.get("status") != "cancelled"]
 
 
 # ──────────────────────────────────────────────
 # Tool 1: Schedule Event / Meeting
 # ──────────────────────────────────────────────
 @mcp.tool()
-def schedule_event(topic: str, time: str, participants: list[str]) -> str:
+@idempotent("schedule_event")
+async def schedule_event(topic: str, time: str, participants: list[str],
+                         idempotency_key: str = None) -> str:
     """
     Schedules a meeting on the team calendar.
     Use this tool when the user mentions 'meeting', 'sync', 'call',
@@ -62,59 +176,28 @@ def schedule_event(topic: str, time: str, participants: list[str]) -> str:
         topic: The meeting topic or subject
         time: When the meeting should happen (e.g., "Monday 10am", "tomorrow 2pm")
         participants: List of participant names or team names
+        idempotency_key: Optional; retries with the same key return the first result
 
     Returns:
         A confirmation message with the event ID
     """
-    event_id = _generate_id("EVT")
-    entry = {
-        "id": event_id,
-        "topic": topic,
-        "time": time,
-        "participants": participants,
-        "created_at": datetime.now().isoformat(),
-        "status": "scheduled"
-    }
+    entry = _event_entry(topic, time, participants)
+    event_id = entry["id"]
+    meeting_link = entry["link"]
 
     # Store in JSON
-    # Conflict Check (Simple)
-    events = _load_json("calendar.json")
-    for e in events:
-        if e.get("time") == time and e.get("status") != "cancelled":
-            # In a real MCP, we might raise an error or ask for confirmation.
-            # For this hackathon demo, we log it and proceed with a warning.
-            print(f"⚠️ Conflict detected with event: {e.get('topic')}")
-
-    # Generate Meeting Link
-    meeting_link = ""
-    lower_topic = topic.lower()
-    if "google meet" in lower_topic or "meet" in lower_topic:
-        meeting_link = f"https://meet.google.com/{uuid.uuid4().hex[:3]}-{uuid.uuid4().hex[:4]}-{uuid.uuid4().hex[:3]}"
-    elif "zoom" in lower_topic:
-        meeting_link = f"https://zoom.us/j/{uuid.uuid4().int % 10**10}?pwd={uuid.uuid4().hex[:8]}"
-    elif "teams" in lower_topic:
-        meeting_link = f"https://teams.microsoft.com/l/meetup-join/{uuid.uuid4().hex}"
-
-    entry = {
-        "id": event_id,
-        "topic": topic,
-        "time": time,
-        "participants": participants,
-        "created_at": datetime.now().isoformat(),
-        "status": "scheduled",
-        "link": meeting_link
-    }
-    
-    events.append(entry)
-    _save_json("calendar.json", events)
+    for other in await _append("calendar.json", entry, check=lambda events: _conflicts(events, time)):
+        # In a real MCP, we might raise an error or ask for confirmation.
+        # For this hackathon demo, we log it and proceed with a warning.
+        log.warning(f"⚠️ Conflict detected with event: {other}")
 
     # Console log for demo
-    print(f"\n[MCP LOG] 📅 ACTION: Scheduling '{topic}' @ {time}")
-    print(f"          Participants: {', '.join(participants)}")
-    print(f"          Event ID: {event_id}")
+    log.info(f"\n[MCP LOG] 📅 ACTION: Scheduling '{topic}' @ {time}")
+    log.info(f"          Participants: {', '.join(participants)}")
+    log.info(f"          Event ID: {event_id}")
 
     if meeting_link:
-        print(f"          Link: {meeting_link}")
+        log.info(f"          Link: {meeting_link}")
         return f"✅ Meeting '{topic}' scheduled for {time}. Link: {meeting_link}. ID: {event_id}"
     
     return f"✅ Meeting '{topic}' scheduled for {time} with {', '.join(participants)}. Event ID: {event_id}"
@@ -124,7 +207,8 @@ def schedule_event(topic: str, time: str, participants: list[str]) -> str:
 # Tool 2: Trigger Alert
 # ──────────────────────────────────────────────
 @mcp.tool()
-def trigger_alert(system: str, issue: str, priority: str) -> str:
+@idempotent("trigger_alert")
+async def trigger_alert(system: str, issue: str, priority: str, idempotency_key: str = None) -> str:
     """
     Sends an urgent DevOps alert to the on-call team.
     Use this tool when the user mentions 'error', 'down', 'fail',
@@ -135,29 +219,21 @@ def trigger_alert(system: str, issue: str, priority: str) -> str:
         system: The system or component affected (e.g., "Payment Gateway", "API Server")
         issue: Description of the problem
         priority: Alert priority - must be 'High', 'Medium', or 'Low'
+        idempotency_key: Optional; retries with the same key return the first result
 
     Returns:
         An alert confirmation with the alert ID
     """
-    alert_id = _generate_id("ALT")
-    entry = {
-        "id": alert_id,
-        "system": system,
-        "issue": issue,
-        "priority": priority,
-        "created_at": datetime.now().isoformat(),
-        "status": "active"
-    }
+    entry = _alert_entry(system, issue, priority)
+    alert_id = entry["id"]
 
     # Store in JSON
-    alerts = _load_json("alerts.json")
-    alerts.append(entry)
-    _save_json("alerts.json", alerts)
+    await _append("alerts.json", entry)
 
     # Console log for demo
-    print(f"\n[MCP LOG] 🚨 ACTION: Triggering Alert for {system} | Priority: {priority}")
-    print(f"          Issue: {issue}")
-    print(f"          Alert ID: {alert_id}")
+    log.info(f"\n[MCP LOG] 🚨 ACTION: Triggering Alert for {system} | Priority: {priority}")
+    log.info(f"          Issue: {issue}")
+    log.info(f"          Alert ID: {alert_id}")
 
     return f"🚨 Alert sent! The {system} team has been notified. Issue: '{issue}' | Priority: {priority} | Alert ID: {alert_id}"
 
@@ -166,7 +242,9 @@ def trigger_alert(system: str, issue: str, priority: str) -> str:
 # Tool 3: Create Ticket
 # ──────────────────────────────────────────────
 @mcp.tool()
-def create_ticket(assignee: str, summary: str, due: str, priority: str) -> str:
+@idempotent("create_ticket")
+async def create_ticket(assignee: str, summary: str, due: str, priority: str,
+                        idempotency_key: str = None) -> str:
     """
     Creates a Jira-style task ticket and assigns it to someone.
     Use this tool when the user assigns work, mentions a task, fix,
@@ -177,31 +255,22 @@ def create_ticket(assignee: str, summary: str, due: str, priority: str) -> str:
         summary: Brief description of the task
         due: Deadline or due date (e.g., "Friday 5pm", "end of day")
         priority: Task priority - 'High', 'Medium', or 'Low'
+        idempotency_key: Optional; retries with the same key return the first result
 
     Returns:
         A ticket confirmation with ticket ID
     """
-    ticket_id = _generate_id("TKT")
-    entry = {
-        "id": ticket_id,
-        "assignee": assignee,
-        "summary": summary,
-        "due": due,
-        "priority": priority,
-        "created_at": datetime.now().isoformat(),
-        "status": "open"
-    }
+    entry = _ticket_entry(assignee, summary, due, priority)
+    ticket_id = entry["id"]
 
     # Store in JSON
-    tickets = _load_json("tickets.json")
-    tickets.append(entry)
-    _save_json("tickets.json", tickets)
+    await _append("tickets.json", entry)
 
     # Console log for demo
-    print(f"\n[MCP LOG] 🎫 ACTION: Creating Ticket for {assignee}")
-    print(f"          Summary: {summary}")
-    print(f"          Due: {due} | Priority: {priority}")
-    print(f"          Ticket ID: {ticket_id}")
+    log.info(f"\n[MCP LOG] 🎫 ACTION: Creating Ticket for {assignee}")
+    log.info(f"          Summary: {summary}")
+    log.info(f"          Due: {due} | Priority: {priority}")
+    log.info(f"          Ticket ID: {ticket_id}")
 
     return f"🎫 Ticket {ticket_id} created! Assigned to {assignee}: '{summary}' | Due: {due} | Priority: {priority}"
 
@@ -210,7 +279,8 @@ def create_ticket(assignee: str, summary: str, due: str, priority: str) -> str:
 # Tool 4: Create Reminder
 # ──────────────────────────────────────────────
 @mcp.tool()
-def create_reminder(message: str, time: str, target: str) -> str:
+@idempotent("create_reminder")
+async def create_reminder(message: str, time: str, target: str, idempotency_key: str = None) -> str:
     """
     Creates a reminder for a person or team.
     Use this tool when the user says 'remind', 'don't forget',
@@ -220,34 +290,574 @@ def create_reminder(message: str, time: str, target: str) -> str:
         message: What to be reminded about
         time: When to trigger the reminder (e.g., "in 2 hours", "tomorrow morning")
         target: Who should receive the reminder (person or team name)
+        idempotency_key: Optional; retries with the same key return the first result
 
     Returns:
         A reminder confirmation with reminder ID
     """
-    reminder_id = _generate_id("REM")
-    entry = {
-        "id": reminder_id,
-        "message": message,
-        "time": time,
-        "target": target,
-        "created_at": datetime.now().isoformat(),
-        "status": "pending"
-    }
+    entry = _reminder_entry(message, time, target)
+    reminder_id = entry["id"]
 
     # Store in JSON
-    reminders = _load_json("reminders.json")
-    reminders.append(entry)
-    _save_json("reminders.json", reminders)
+    await _append("reminders.json", entry)
 
     # Console log for demo
-    print(f"\n[MCP LOG] ⏰ ACTION: Creating Reminder for {target}")
-    print(f"          Message: {message}")
-    print(f"          When: {time}")
-    print(f"          Reminder ID: {reminder_id}")
+    log.info(f"\n[MCP LOG] ⏰ ACTION: Creating Reminder for {target}")
+    log.info(f"          Message: {message}")
+    log.info(f"          When: {time}")
+    log.info(f"          Reminder ID: {reminder_id}")
 
     return f"⏰ Reminder set! Will remind {target}: '{message}' at {time}. Reminder ID: {reminder_id}"
 
 
+# ──────────────────────────────────────────────
+# Tool 5: Search Records
+# ──────────────────────────────────────────────
+@mcp.tool()
+async def search_records(query: str, collections: list[str] = None, limit: int = 10, offset: int = 0) -> dict:
+    """
+    Full-text search over past tickets, alerts, meetings and reminders.
+    Use this tool when the user asks to find, look up or check on an
+    existing item ("the payment gateway alert", "Dana's login ticket").
+    Every word must match, as a whole word or the start of one.
+
+    Args:
+        query: Words to search for (e.g., "payment gateway", "login bug dana")
+        collections: Optional subset of "events", "alerts", "tickets", "reminders"
+        limit: Results per page (max 200)
+        offset: Results to skip, from next_offset of the previous page
+
+    Returns:
+        Ranked matches ({"collection", "id", "score", "record"}), the total
+        match count and next_offset (None on the last page)
+    """
+    result = await storage.run_io(get_index().search, query, collections=collections,
+                                  limit=limit, offset=offset)
+    log.info(f"\n[MCP LOG] 🔎 ACTION: Search '{query}' → {result['total']} matches")
+    return result
+
+
+# ──────────────────────────────────────────────
+# Bulk writes: validate everything, then one save per collection
+# ──────────────────────────────────────────────
+PRIORITIES = ("High", "Medium", "Low")
+# Items accepted by one bulk call
+MAX_BULK_ITEMS = 500
+
+# Write tool → (data file, record builder, parameter types)
+WRITE_TOOLS = {
+    "schedule_event": ("calendar.json", _event_entry, {"topic": str, "time": str, "participants": list}),
+    "trigger_alert": ("alerts.json", _alert_entry, {"system": str, "issue": str, "priority": str}),
+    "create_ticket": ("tickets.json", _ticket_entry,
+                      {"assignee": str, "summary": str, "due": str, "priority": str}),
+    "create_reminder": ("reminders.json", _reminder_entry, {"message": str, "time": str, "target": str}),
+}
+
+
+def _validate(tool: str, params) -> tuple:
+    """(normalized params, None) or (None, error message) for one write call."""
+    if tool not in WRITE_TOOLS:
+        return None, f"unknown tool '{tool}' (expected one of: {', '.join(WRITE_TOOLS)})"
+    if not isinstance(params, dict):
+        return None, "params must be an object"
+    _, _, types = WRITE_TOOLS[tool]
+    missing = [name for name in types if name not in params]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+    unexpected = [name for name in params if name not in types]
+    if unexpected:
+        return None, f"unexpected {', '.join(unexpected)}"
+    for name, kind in types.items():
+        value = params[name]
+        if not isinstance(value, kind) or not value:
+            return None, f"{name} must be a non-empty {'list' if kind is list else 'string'}"
+    if tool == "schedule_event" and not all(isinstance(p, str) and p for p in params["participants"]):
+        return None, "participants must be names"
+    if "priority" in types:
+        priority = params["priority"].strip().capitalize()
+        if priority not in PRIORITIES:
+            return None, f"priority must be one of: {', '.join(PRIORITIES)}"
+        params = {**params, "priority": priority}
+    return params, None
+
+
+async def _bulk_write(calls: list) -> dict:
+    """Apply [(tool, params)] as one load/save per collection.
+
+    Nothing is written if any call is invalid. Collections are saved
+    independently (and in parallel): a failure saving one file leaves the
+    others committed, and is reported on each of its items.
+    """
+    if len(calls) > MAX_BULK_ITEMS:
+        return {"ok": False, "results": [],
+                "errors": [{"index": None, "error": f"at most {MAX_BULK_ITEMS} items per call"}]}
+    checked = [_validate(tool, params) for tool, params in calls]
+    errors = [{"index": i, "tool": tool, "error": error}
+              for i, ((tool, _), (_, error)) in enumerate(zip(calls, checked)) if error]
+    if errors:
+        return {"ok": False, "results": [], "errors": errors}
+
+    results = [None] * len(calls)
+    by_file = {}
+    for i, ((tool, _), (params, _)) in enumerate(zip(calls, checked)):
+        filename, build, _ = WRITE_TOOLS[tool]
+        entry = build(**params)
+        results[i] = {"index": i, "tool": tool, "id": entry["id"]}
+        if entry.get("link"):
+            results[i]["link"] = entry["link"]
+        by_file.setdefault(filename, []).append((i, entry))
+
+    def check(items):
+        if not any("participants" in entry for _, entry in items):
+            return None  # nothing to check: a plain append
+        def find_conflicts(records):
+            conflicts, earlier = {}, []
+            for i, entry in items:
+                if "participants" in entry:
+                    # Checked against earlier items of the same batch too
+                    conflicts[i] = _conflicts(records, entry["time"]) + _conflicts(earlier, entry["time"])
+                earlier.append(entry)
+            return conflicts
+        return find_conflicts
+
+    files = list(by_file)
+    outcomes = await asyncio.gather(*(storage.append_json(f, [entry for _, entry in by_file[f]],
+                                                          check(by_file[f])) for f in files),
+                                    return_exceptions=True)
+    for filename, outcome in zip(files, outcomes):
+        for i, _ in by_file[filename]:
+            if isinstance(outcome, BaseException):
+                results[i]["error"] = f"not saved: {outcome}"
+                errors.append({"index": i, "tool": results[i]["tool"], "error": results[i]["error"]})
+            elif outcome and outcome.get(i):
+                results[i]["conflicts"] = outcome[i]
+
+    counts = ", ".join(f"{f} ×{len(by_file[f])}" for f in files)
+    log.info(f"\n[MCP LOG] 📦 ACTION: Bulk write of {len(calls)} records ({counts or 'nothing'})")
+    if errors:
+        log.warning(f"          ❌ {len(errors)} not saved")
+    return {"ok": not errors, "results": results, "errors": errors}
+
+
+# ──────────────────────────────────────────────
+# Tool 6: Bulk Create Tickets
+# ──────────────────────────────────────────────
+@mcp.tool()
+@idempotent("bulk_create_tickets")
+async def bulk_create_tickets(tickets: list[dict], idempotency_key: str = None) -> dict:
+    """
+    Creates several tickets at once (one storage write for all of them).
+    Use this instead of repeated create_ticket calls when a message
+    assigns more than one task.
+
+    Args:
+        tickets: Items with assignee, summary, due and priority
+            ('High', 'Medium' or 'Low'), as for create_ticket
+        idempotency_key: Optional; retries with the same key return the first result
+
+    Returns:
+        {"ok", "results": [{"index", "tool", "id"}...], "errors": [...]};
+        if any item is invalid nothing is created and errors lists why
+    """
+    return await _bulk_write([("create_ticket", t) for t in tickets])
+
+
+# ──────────────────────────────────────────────
+# Tool 7: Bulk Schedule Events
+# ──────────────────────────────────────────────
+@mcp.tool()
+@idempotent("bulk_schedule_events")
+async def bulk_schedule_events(events: list[dict], idempotency_key: str = None) -> dict:
+    """
+    Schedules several meetings at once (one storage write for all of them).
+    Use this instead of repeated schedule_event calls when a message
+    books more than one meeting.
+
+    Args:
+        events: Items with topic, time and participants, as for schedule_event
+        idempotency_key: Optional; retries with the same key return the first result
+
+    Returns:
+        {"ok", "results": [{"index", "tool", "id", "link"?, "conflicts"?}...],
+        "errors": [...]}; if any item is invalid nothing is scheduled
+    """
+    return await _bulk_write([("schedule_event", e) for e in events])
+
+
+# ──────────────────────────────────────────────
+# Tool 8: Execute Plan
+# ──────────────────────────────────────────────
+@mcp.tool()
+@idempotent("execute_plan")
+async def execute_plan(rpcs: list[dict], idempotency_key: str = None) -> dict:
+    """
+    Runs a multi-action plan in one call: meetings, alerts, tickets and
+    reminders together, one storage write per collection.
+    Use this when a single message asks for several actions.
+
+    Args:
+        rpcs: Items of the form {"tool": "create_ticket", "params": {...}},
+            tool being schedule_event, trigger_alert, create_ticket or
+            create_reminder (other keys, e.g. action_type, are ignored)
+        idempotency_key: Optional; retries with the same key return the first result
+
+    Returns:
+        {"ok", "results": [{"index", "tool", "id", ...}...], "errors": [...]},
+        results in the order of rpcs; if any item is invalid nothing is written
+    """
+    calls = [(rpc.get("tool"), rpc.get("params")) if isinstance(rpc, dict) else (None, None)
+             for rpc in rpcs]
+    return await _bulk_write(calls)
+
+
+# ──────────────────────────────────────────────
+# Read tools: answered from the record index
+# ──────────────────────────────────────────────
+DEFAULT_LIST_LIMIT = 20
+# Events have no end time; each blocks this long unless it has duration_minutes
+DEFAULT_MEETING_MINUTES = 30
+SLOT_STEP_MINUTES = 15
+
+
+def _when(text: str, name: str) -> tuple:
+    when, has_time = parse_when(text)
+    if when is None:
+        raise storage.QueryError(f"could not understand {name} '{text}' (try 2026-02-16, 'Monday', 'tomorrow 2pm')")
+    return when, has_time
+
+
+def _time_range(on: str, start: str, end: str) -> tuple:
+    if on:
+        day = _when(on, "on")[0].replace(hour=0, minute=0, second=0, microsecond=0)
+        return day, day + timedelta(days=1)
+    lo = _when(start, "start")[0] if start else datetime.min
+    hi = _when(end, "end")[0] if end else datetime.max
+    return lo, hi
+
+
+def _project(record: dict, fields: str) -> dict:
+    if not fields:
+        return record
+    wanted = {f.strip().lower() for f in fields.split(",") if f.strip()} | {"id", "starts_at"}
+    return {k: v for k, v in record.items() if k.lower() in wanted}
+
+
+def _list_events(on, start, end, participant, status, fields, limit, cursor) -> dict:
+    index = get_record_index()
+    matching = index.lookup("events", participants=participant, status=status)
+    archived = index.lookup_archived("events", participants=participant, status=status)
+    if not (on or start or end):
+        return storage.query(matching + archived, fields=fields, cursor=cursor, limit=limit)
+
+    # Date range: walk the time index, meeting time order
+    lo, hi = _time_range(on, start, end)
+    wanted = {r["id"] for r in matching}
+    found = [(when, has_time, e) for when, has_time, e in index.between(lo, hi) if e["id"] in wanted]
+    # Archived events aren't in the time index
+    for e in archived:
+        when, has_time = event_start(e)
+        if when is not None and lo <= when < hi:
+            found.append((when, has_time, e))
+    found.sort(key=lambda item: (item[0].isoformat(), item[2]["id"]))
+    keys = [(when.isoformat(), e["id"]) for when, _, e in found]
+    limit = max(0, min(int(limit), storage.MAX_PAGE_SIZE))
+    first = bisect.bisect_right(keys, storage.decode_cursor(cursor)) if cursor else 0
+    page = found[first:first + limit]
+    items = [_project({**e, "starts_at": when.isoformat() if has_time else when.date().isoformat()}, fields)
+             for when, has_time, e in page]
+    more = first + limit < len(found)
+    next_cursor = None
+    if page and more:
+        last_when, _, last = page[-1]
+        next_cursor = storage.encode_cursor({"created_at": last_when.isoformat(), "id": last["id"]})
+    return {"items": items, "total": len(found), "next_cursor": next_cursor}
+
+
+def _find_free_slot(participants, date, duration_minutes, earliest, latest, count) -> dict:
+    day = _when(date, "date")[0].replace(hour=0, minute=0, second=0, microsecond=0)
+    try:
+        window_start = datetime.combine(day.date(), datetime.strptime(earliest, "%H:%M").time())
+        window_end = datetime.combine(day.date(), datetime.strptime(latest, "%H:%M").time())
+    except ValueError:
+        raise storage.QueryError("earliest/latest must be HH:MM, e.g. 09:00")
+    duration = timedelta(minutes=max(1, int(duration_minutes)))
+
+    index = get_record_index()
+    theirs = {r["id"] for r in index.lookup("events", participants=",".join(participants))}
+    busy = []
+    for when, has_time, event in index.between(day, day + timedelta(days=1)):
+        if has_time and event["id"] in theirs and event.get("status") != "cancelled":
+            length = event.get("duration_minutes") or DEFAULT_MEETING_MINUTES
+            busy.append((when, when + timedelta(minutes=length), event))
+
+    slots = []
+    candidate = window_start
+    while candidate + duration <= window_end and len(slots) < count:
+        clash = [b_end for b_start, b_end, _ in busy if b_start < candidate + duration and candidate < b_end]
+        if clash:
+            # Jump past the meeting, back onto the slot grid
+            candidate = max(clash)
+            extra = (candidate - window_start) % timedelta(minutes=SLOT_STEP_MINUTES)
+            if extra:
+                candidate += timedelta(minutes=SLOT_STEP_MINUTES) - extra
+            continue
+        slots.append({"start": candidate.isoformat(), "end": (candidate + duration).isoformat()})
+        candidate += duration
+    return {
+        "date": day.date().isoformat(),
+        "slots": slots,
+        "busy": [{"id": e["id"], "topic": e.get("topic"), "start": s.isoformat(), "end": t.isoformat()}
+                 for s, t, e in busy],
+    }
+
+
+async def _read(fn, *args) -> dict:
+    try:
+        return await storage.run_io(fn, *args)
+    except storage.QueryError as e:
+        return {"error": str(e)}
+
+
+# ──────────────────────────────────────────────
+# Tool 9: List Events
+# ──────────────────────────────────────────────
+@mcp.tool()
+async def list_events(on: str = None, start: str = None, end: str = None, participant: str = None,
+                      status: str = None, fields: str = None, limit: int = DEFAULT_LIST_LIMIT,
+                      cursor: str = None) -> dict:
+    """
+    Lists meetings on the team calendar, archived ones included.
+    Use this tool when the user asks what is scheduled ("what's on Monday",
+    "Dana's meetings tomorrow", "anything at 3pm?").
+
+    Args:
+        on: A day ("2026-02-16", "Monday", "tomorrow"); or use start/end
+        start: Meetings at or after this time ("2026-02-16 09:00", "today")
+        end: Meetings before this time
+        participant: Comma-separated names; any of them attending
+        status: Comma-separated statuses (e.g. "scheduled")
+        fields: Comma-separated fields to return (id always included)
+        limit: Page size (max 200)
+        cursor: next_cursor of the previous page
+
+    Returns:
+        {"items", "total", "next_cursor"}; with a day or range, items are in
+        meeting time order and carry "starts_at", otherwise newest first
+    """
+    result = await _read(_list_events, on, start, end, participant, status, fields, limit, cursor)
+    log.info(f"\n[MCP LOG] 📆 ACTION: List events → {result.get('total', 0)} found")
+    return result
+
+
+# ──────────────────────────────────────────────
+# Tool 10: Find Free Slot
+# ──────────────────────────────────────────────
+@mcp.tool()
+async def find_free_slot(participants: list[str], date: str, duration_minutes: int = 30,
+                         earliest: str = "09:00", latest: str = "17:00", count: int = 3) -> dict:
+    """
+    Finds times when all participants are free on a given day.
+    Use this tool before scheduling when the user asks for a time that
+    works for everyone, or when schedule_event reports a conflict.
+
+    Args:
+        participants: Names whose meetings must not overlap
+        date: The day to search ("2026-02-16", "Friday", "tomorrow")
+        duration_minutes: Length of the meeting
+        earliest / latest: Working hours as HH:MM
+        count: How many free slots to return
+
+    Returns:
+        {"date", "slots": [{"start", "end"}...], "busy": [meetings in the way]}
+    """
+    result = await _read(_find_free_slot, participants, date, duration_minutes, earliest, latest, count)
+    log.info(f"\n[MCP LOG] 🗓️ ACTION: Free slots for {', '.join(participants)} on {date}"
+             f" → {len(result.get('slots', []))} found")
+    return result
+
+
+# ──────────────────────────────────────────────
+# Tool 11: List Alerts
+# ──────────────────────────────────────────────
+@mcp.tool()
+async def list_alerts(status: str = None, priority: str = None, system: str = None, since: str = None,
+                      until: str = None, fields: str = None, limit: int = DEFAULT_LIST_LIMIT,
+                      cursor: str = None) -> dict:
+    """
+    Lists DevOps alerts, newest first, archived (long resolved) ones included.
+    Use this tool when the user asks which alerts are active, or about
+    incidents on a system.
+
+    Args:
+        status: Comma-separated statuses (e.g. "active")
+        priority: Comma-separated priorities ("High,Medium")
+        system: Comma-separated system names (e.g. "Payment Gateway")
+        since / until: ISO dates bounding when the alert was raised
+        fields: Comma-separated fields to return (id always included)
+        limit: Page size (max 200)
+        cursor: next_cursor of the previous page
+
+    Returns:
+        {"items", "total", "next_cursor"}
+    """
+    def run():
+        index = get_record_index()
+        filters = dict(since=since, until=until, status=status, priority=priority, system=system)
+        matching = index.lookup("alerts", **filters) + index.lookup_archived("alerts", **filters)
+        return storage.query(matching, since=since, until=until, fields=fields, cursor=cursor, limit=limit)
+
+    result = await _read(run)
+    log.info(f"\n[MCP LOG] 🚨 ACTION: List alerts → {result.get('total', 0)} found")
+    return result
+
+
+# ──────────────────────────────────────────────
+# Tool 12: List Tickets
+# ──────────────────────────────────────────────
+@mcp.tool()
+async def list_tickets(status: str = None, assignee: str = None, priority: str = None, since: str = None,
+                       until: str = None, fields: str = None, limit: int = DEFAULT_LIST_LIMIT,
+                       cursor: str = None) -> dict:
+    """
+    Lists tickets, newest first, archived (long closed) ones included.
+    Use this tool when the user asks about open tasks, someone's work, or
+    high-priority items.
+
+    Args:
+        status: Comma-separated statuses (e.g. "open")
+        assignee: Comma-separated names
+        priority: Comma-separated priorities ("High,Medium")
+        since / until: ISO dates bounding when the ticket was created
+        fields: Comma-separated fields to return (id always included)
+        limit: Page size (max 200)
+        cursor: next_cursor of the previous page
+
+    Returns:
+        {"items", "total", "next_cursor"}
+    """
+    def run():
+        index = get_record_index()
+        filters = dict(since=since, until=until, status=status, assignee=assignee, priority=priority)
+        matching = index.lookup("tickets", **filters) + index.lookup_archived("tickets", **filters)
+        return storage.query(matching, since=since, until=until, fields=fields, cursor=cursor, limit=limit)
+
+    result = await _read(run)
+    log.info(f"\n[MCP LOG] 🎫 ACTION: List tickets → {result.get('total', 0)} found")
+    return result
+
+
+# ──────────────────────────────────────────────
+# Tool 13: Get Record
+# ──────────────────────────────────────────────
+def _find_record(record_id: str) -> tuple:
+    """(collection, record) from the hot set, else from the archives."""
+    collection, record = get_record_index().get(record_id)
+    if record is None:
+        collection, record = archive.find(record_id)
+    return collection, record
+
+
+@mcp.tool()
+async def get_record(record_id: str) -> dict:
+    """
+    Fetches one meeting, alert, ticket or reminder by its ID.
+    Use this tool when the user mentions an ID such as EVT-01KXQ8ZC4D7M3YHQ2A or TKT-f1d2.
+
+    Args:
+        record_id: The record ID
+
+    Returns:
+        {"collection", "record"}, or {"error"} if there is no such record
+    """
+    collection, record = await storage.run_io(_find_record, record_id.strip())
+    log.info(f"\n[MCP LOG] 🔍 ACTION: Get {record_id} → {collection or 'not found'}")
+    if record is None:
+        return {"error": f"No record with ID '{record_id}'"}
+    return {"collection": collection, "record": record}
+
+
+# ──────────────────────────────────────────────
+# Resources: collections and records, with change notifications
+# ──────────────────────────────────────────────
+# Records shown when a collection resource is read
+COLLECTION_RESOURCE_PAGE = 20
+
+
+def _collection_resource(name: str):
+    async def read() -> dict:
+        def page():
+            return storage.query(get_record_index().lookup(name), limit=COLLECTION_RESOURCE_PAGE)
+        result = await storage.run_io(page)
+        return {
+            "collection": name,
+            "total": result["total"],
+            "latest": result["items"],
+            "recent_changes": list(subscriptions.recent.get(name, ())),
+        }
+    read.__doc__ = (f"The {name} collection: total, latest {COLLECTION_RESOURCE_PAGE} records and "
+                    f"recent changes. Subscribe for notifications carrying the changed IDs.")
+    return read
+
+
+for _name in storage.COLLECTIONS:
+    mcp.resource(COLLECTION_URI.format(name=_name), name=_name, mime_type="application/json")(
+        _collection_resource(_name))
+
+
+@mcp.resource(RECORD_URI.format(id="{record_id}"), mime_type="application/json")
+async def record_resource(record_id: str) -> dict:
+    """One meeting, alert, ticket or reminder by ID; subscribe to hear when it changes."""
+    collection, record = await storage.run_io(_find_record, record_id)
+    if record is None:
+        raise ResourceError(f"No record with ID '{record_id}'")
+    return {"collection": collection, "record": record}
+
+
+@mcp.resource("contextos://metrics", mime_type="application/json")
+async def metrics_resource() -> dict:
+    """Server counters: duplicate tool calls suppressed, subscriptions and notifications sent."""
+    return {
+        "idempotency": get_idempotency().metrics(),
+        "subscriptions": {"active": subscriptions.count, "notifications_sent": subscriptions.sent},
+    }
+
+
+async def _watch_changes() -> None:
+    """Turn committed writes into resources/updated notifications.
+
+    Writes from this process wake the watcher at once; writes from other
+    processes (the dashboard, the Telegram bot) are noticed within
+    WATCH_INTERVAL.
+    """
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+    batches = asyncio.Queue()
+
+    def post(callback, *args):
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            pass  # loop closed during shutdown
+
+    index = get_record_index()
+    await storage.run_io(index.refresh)  # baseline: existing records are not news
+    index.add_listener(lambda changes: post(batches.put_nowait, changes))
+    storage.add_commit_listener(lambda filename: post(wake.set))
+    while True:
+        try:
+            await asyncio.wait_for(wake.wait(), WATCH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        wake.clear()
+        await storage.run_io(index.refresh)
+        while not batches.empty():
+            changes = batches.get_nowait()
+            try:
+                await subscriptions.publish(changes)
+            except Exception as e:
+                log.warning(f"⚠️ Change notification failed: {e}")
+
+
 # ──────────────────────────────────────────────
 # Initialize JSON Files at Startup
 # ──────────────────────────────────────────────
@@ -256,33 +866,67 @@ def _init_json_files():
     for filename in ["calendar.json", "alerts.json", "tickets.json", "reminders.json"]:
         filepath = os.path.join(DATA_DIR, filename)
         if not os.path.exists(filepath):
-            _save_json(filename, [])
+            # Locked: other workers may be starting (and writing) too
+            storage.modify_json(filename, lambda records: None)
             print(f"✓ Created {filename}")
 
 
+def stateless_app():
+    """ASGI app for `--stateless` workers: streamable HTTP without sessions,
+    so any worker can answer any request (no resource subscriptions)."""
+    return mcp.http_app(transport="http", stateless_http=True, json_response=True)
+
+
 # ──────────────────────────────────────────────
 # Entry Point
 # ──────────────────────────────────────────────
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ContextOS MCP server")
+    parser.add_argument("--transport", choices=["sse", "http"], default=os.getenv("MCP_TRANSPORT", "sse"))
+    parser.add_argument("--host", default=os.getenv("MCP_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("MCP_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("MCP_WORKERS", "1")),
+                        help="server processes; >1 runs them behind a session-affine router")
+    parser.add_argument("--stateless", action="store_true",
+                        help="with --transport http: plain uvicorn workers, no sessions")
+    parser.add_argument("--quiet", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    path = "/sse" if args.transport == "sse" else "/mcp"
+
     _init_json_files()
-    
-    print("\n" + "═" * 60)
-    print("🚀 ContextOS MCP Server")
-    print("═" * 60)
-    print("📡 SSE Server: http://0.0.0.0:8000/sse")
-    print("🔌 Archestra Connection:")
-    print("   • Windows/Mac: http://host.docker.internal:8000/sse")
-    print("   • Linux: http://172.17.0.1:8000/sse")
-    print("\n💾 Data Files: data/")
-    print("   • calendar.json | alerts.json | tickets.json | reminders.json")
-    print("═" * 60 + "\n")
+
+    if not args.quiet:
+        print("\n" + "═" * 60)
+        print("🚀 ContextOS MCP Server")
+        print("═" * 60)
+        print(f"📡 {args.transport.upper()} Server: http://{args.host}:{args.port}{path}"
+              + (f" ({args.workers} workers)" if args.workers > 1 else ""))
+        print("🔌 Archestra Connection:")
+        print(f"   • Windows/Mac: http://host.docker.internal:{args.port}{path}")
+        print(f"   • Linux: http://172.17.0.1:{args.port}{path}")
+        print(f"\n💾 Data Files: {DATA_DIR}")
+        print("   • calendar.json | alerts.json | tickets.json | reminders.json")
+        print("═" * 60 + "\n")
 
     try:
-        mcp.run(
-            transport="sse",
-            host="0.0.0.0",
-            port=8000
-        )
+        if args.stateless:
+            if args.transport != "http":
+                parser.error("--stateless needs --transport http")
+            import uvicorn
+            uvicorn.run("server:stateless_app", factory=True, host=args.host, port=args.port,
+                        workers=args.workers, app_dir=os.path.dirname(os.path.abspath(__file__)))
+        elif args.workers > 1:
+            from mcp_router import run_router
+            run_router(os.path.abspath(__file__), args.transport, args.host, args.port, args.workers)
+        else:
+            mcp.run(
+                transport=args.transport,
+                host=args.host,
+                port=args.port,
+                show_banner=not args.quiet,
+            )
     except KeyboardInterrupt:
         print("\n\n🛑 Server stopped by user.")
     except Exception as e:
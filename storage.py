@@ -0,0 +1,646 @@
+"""
+ContextOS — Storage Layer
+Shared access to the JSON collections in data/.
+
+Collections (name → file):
+  events    → calendar.json
+  alerts    → alerts.json
+  tickets   → tickets.json
+  reminders → reminders.json
+
+Queries support status/priority/date filters, field projection, ordering
+by created_at and opaque cursors, so callers only ever ship one page.
+iter_collection() streams records straight from the file, one at a time,
+for exports that must not hold a whole collection in memory. Both also
+read the compressed archives that archive.py moves finished records to.
+
+Every file has a version counter that increases whenever its contents
+change — through save_json() or by another process writing the file —
+so callers can cache derived data and answer conditional requests.
+SnapshotTracker turns those version bumps into per-record differences;
+ChangeFeed numbers them as create/update/delete events for live feeds
+that clients can resume.
+
+Async callers use run_io() / update_json(): blocking file access runs on a
+bounded thread pool, and writes to the same file are serialized — across
+processes too (file_lock()), so several MCP server workers, the dashboard
+and the bots can share data/. CONTEXTOS_DATA_DIR points everything that
+goes through this module at another directory.
+
+With CONTEXTOS_STORAGE_SOCKET set, the same functions go through the
+storage daemon (storage_daemon.py) instead of the files: it keeps the data
+in memory and serializes writes for every process.
+"""
+
+import os
+import json
+import asyncio
+import functools
+import base64
+import bisect
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DATA_DIR = os.getenv("CONTEXTOS_DATA_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+os.makedirs(DATA_DIR, exist_ok=True)
+
+COLLECTIONS = {
+    "events": "calendar.json",
+    "alerts": "alerts.json",
+    "tickets": "tickets.json",
+    "reminders": "reminders.json",
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Bytes read at a time by iter_json()
+READ_CHUNK_SIZE = 64 * 1024
+
+# Storage daemon socket; unset reads and writes the files directly
+STORAGE_SOCKET = os.getenv("CONTEXTOS_STORAGE_SOCKET")
+
+
+class QueryError(ValueError):
+    """Raised for malformed query parameters (bad cursor, date, order...)."""
+
+
+# ──────────────────────────────────────────────
+# Read/Write JSON files
+# ──────────────────────────────────────────────
+def load_json(filename: str) -> list:
+    """Load all entries from a JSON file in data/."""
+    daemon = _daemon()
+    if daemon is not None:
+        return daemon.load(filename)[1]
+    filepath = os.path.join(DATA_DIR, filename)
+    if os.path.exists(filepath):
+        with open(filepath, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return []
+
+
+def save_json(filename: str, data: list) -> None:
+    """Save entries to a JSON file in data/.
+
+    Written to a temporary file and renamed over the old one, so concurrent
+    readers see either the previous or the new contents, never half a file.
+    """
+    daemon = _daemon()
+    if daemon is not None:
+        daemon.save(filename, data)
+        _committed(filename)
+        return
+    filepath = os.path.join(DATA_DIR, filename)
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _bump_version(filename)
+    _committed(filename)
+
+
+_commit_listeners = []
+_daemon_client = None
+_daemon_lock = threading.Lock()
+
+
+def _daemon():
+    """Client of the storage daemon, or None when the files are used directly."""
+    global _daemon_client
+    if not STORAGE_SOCKET:
+        return None
+    with _daemon_lock:
+        if _daemon_client is None:
+            from storage_daemon import StorageClient
+            _daemon_client = StorageClient(STORAGE_SOCKET)
+        return _daemon_client
+
+
+def _committed(filename: str) -> None:
+    for listener in list(_commit_listeners):
+        listener(filename)
+
+
+def add_commit_listener(listener) -> None:
+    """Call ``listener(filename)`` after every save_json() in this process.
+
+    Runs on the saving thread, so listeners must be quick and thread-safe
+    (e.g. loop.call_soon_threadsafe). Writes by other processes are only
+    seen through file_version().
+    """
+    _commit_listeners.append(listener)
+
+
+@contextmanager
+def file_lock(filename: str):
+    """Exclusive lock on a data file, shared with every other process and
+    thread using it. Hold it across a read-modify-write (see modify_json)."""
+    path = os.path.join(DATA_DIR, f".{filename}.lock")
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ~10 s; keep waiting
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def modify_json(filename: str, update):
+    """Load a file, let ``update(records)`` change the list in place, save it,
+    all under file_lock(). Returns whatever ``update`` returns.
+
+    Through the storage daemon the save is conditional on the version that
+    was loaded instead, and the whole step is retried if another write got
+    in between.
+    """
+    daemon = _daemon()
+    if daemon is not None:
+        while True:
+            version, records = daemon.load(filename)
+            result = update(records)
+            try:
+                daemon.save(filename, records, if_version=version)
+            except daemon.Conflict:
+                continue
+            _committed(filename)
+            return result
+    with file_lock(filename):
+        records = load_json(filename)
+        result = update(records)
+        save_json(filename, records)
+        return result
+
+
+def append_records(filename: str, entries: list, check=None):
+    """Append ``entries`` to a file. ``check(records)`` sees the records
+    before them, in the same locked step, and its result is returned.
+
+    Through the storage daemon an append without a check sends only the
+    new entries.
+    """
+    daemon = _daemon()
+    if daemon is not None and check is None:
+        daemon.append(filename, entries)
+        _committed(filename)
+        return None
+
+    def update(records):
+        result = check(records) if check else None
+        records.extend(entries)
+        return result
+    return modify_json(filename, update)
+
+
+def iter_json(filename: str, chunk_size: int = READ_CHUNK_SIZE):
+    """Yield the entries of a JSON array file one by one.
+
+    Reads ``chunk_size`` characters at a time and decodes each element as
+    soon as it is complete, so memory stays bounded by the largest single
+    record rather than the file size. (Through the storage daemon the
+    records arrive in one message.)
+    """
+    daemon = _daemon()
+    if daemon is not None:
+        yield from daemon.load(filename)[1]
+        return
+    filepath = os.path.join(DATA_DIR, filename)
+    if not os.path.exists(filepath):
+        return
+    decoder = json.JSONDecoder()
+    with open(filepath, "r", encoding="utf-8") as f:
+        buf, pos, opened = "", 0, False
+        while True:
+            # Skip whitespace, the opening bracket and separators
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buf):
+                    ch = buf[pos]
+                    if not opened:
+                        if ch != "[":
+                            raise ValueError(f"{filename}: expected a JSON array")
+                        opened = True
+                    elif ch == "]":
+                        return
+                    elif ch != ",":
+                        break
+                    pos += 1
+                    continue
+                more = f.read(chunk_size)
+                if not more:
+                    return
+                buf, pos = buf[pos:] + more, 0
+
+            try:
+                entry, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Element continues past the buffer: read on and retry
+                more = f.read(chunk_size)
+                if not more:
+                    raise
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield entry
+            if pos >= chunk_size:
+                buf, pos = buf[pos:], 0
+
+
+def collection_file(name: str) -> str:
+    """Map a collection name to its file. Raises KeyError if unknown."""
+    return COLLECTIONS[name]
+
+
+def load_collection(name: str) -> list:
+    return load_json(collection_file(name))
+
+
+# ──────────────────────────────────────────────
+# Async access
+# ──────────────────────────────────────────────
+# File reads/writes issued from async code run on at most this many threads
+IO_THREADS = int(os.getenv("STORAGE_IO_THREADS", "8"))
+
+_io_pool = None
+_io_pool_lock = threading.Lock()
+_write_locks = weakref.WeakKeyDictionary()  # event loop → {filename: asyncio.Lock}
+
+
+async def run_io(fn, *args, **kwargs):
+    """Run a blocking storage call on the I/O thread pool."""
+    global _io_pool
+    with _io_pool_lock:
+        if _io_pool is None:
+            _io_pool = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="storage-io")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_pool, functools.partial(fn, *args, **kwargs))
+
+
+def write_lock(filename: str) -> asyncio.Lock:
+    """Lock serializing the read-modify-write cycles on one file.
+
+    One per event loop (an asyncio.Lock can't be shared between loops); the
+    file lock underneath covers writers on other loops and processes.
+    """
+    locks = _write_locks.setdefault(asyncio.get_running_loop(), {})
+    lock = locks.get(filename)
+    if lock is None:
+        lock = locks[filename] = asyncio.Lock()
+    return lock
+
+
+async def load_json_async(filename: str) -> list:
+    return await run_io(load_json, filename)
+
+
+async def update_json(filename: str, update):
+    """Load a file, let ``update(records)`` change the list in place, save it.
+
+    Runs as one modify_json() step on the I/O pool, under the file's write
+    lock: writers to the same collection take turns (in this process on the
+    asyncio lock, so they don't each park a pool thread on the file lock),
+    other collections and readers go ahead in parallel. Returns whatever
+    ``update`` returns.
+    """
+    async with write_lock(filename):
+        return await run_io(modify_json, filename, update)
+
+
+async def append_json(filename: str, entries: list, check=None):
+    """append_records() on the I/O pool, under the file's write lock."""
+    async with write_lock(filename):
+        return await run_io(append_records, filename, entries, check)
+
+
+# ──────────────────────────────────────────────
+# Version counters
+# ──────────────────────────────────────────────
+_versions = {}  # filename → (stat signature, version)
+_versions_lock = threading.Lock()
+
+
+def _stat_signature(filename: str):
+    try:
+        st = os.stat(os.path.join(DATA_DIR, filename))
+    except FileNotFoundError:
+        return None
+    # Every save replaces the file, so the inode changes even when a write
+    # from another process lands within the same mtime tick at the same size
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _bump_version(filename: str) -> None:
+    with _versions_lock:
+        _, version = _versions.get(filename, (None, 0))
+        _versions[filename] = (_stat_signature(filename), version + 1)
+
+
+def file_version(filename: str) -> int:
+    """Version of a data file; increases whenever its contents change.
+
+    Writes from other processes are picked up through mtime/size. On files
+    it costs one stat() call. Through the storage daemon it is the daemon's
+    version, fetched with a blocking round trip that may also wait for a
+    free connection: async code calls it through run_io().
+    """
+    return file_state(filename)[0]
+
+
+def last_modified(filename: str) -> float:
+    """Modification time of a data file (0 if it doesn't exist yet); costs
+    the same as file_version()."""
+    return file_state(filename)[1]
+
+
+def file_state(filename: str) -> tuple:
+    """(file_version(), last_modified()) from a single stat() or daemon round trip."""
+    daemon = _daemon()
+    if daemon is not None:
+        return daemon.stat(filename)
+    signature = _stat_signature(filename)
+    modified = signature[0] / 1e9 if signature else 0.0
+    with _versions_lock:
+        known = _versions.get(filename)
+        if known is None:
+            version = 1
+        elif known[0] != signature:
+            version = known[1] + 1
+        else:
+            return known[1], modified
+        _versions[filename] = (signature, version)
+        return version, modified
+
+
+# ──────────────────────────────────────────────
+# Queries
+# ──────────────────────────────────────────────
+def page_key(record: dict) -> tuple:
+    """Where a record falls in query() pages and cursors: (created_at, id)."""
+    return (record.get("created_at", ""), record.get("id", ""))
+
+
+def encode_cursor(record: dict) -> str:
+    raw = json.dumps(list(page_key(record)), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (str(created_at), str(record_id))
+    except (ValueError, TypeError):
+        raise QueryError("invalid cursor")
+
+
+def parse_time(value: str, name: str) -> str:
+    """Normalize a date/datetime filter to the isoformat used in created_at."""
+    try:
+        return datetime.fromisoformat(value).isoformat()
+    except ValueError:
+        raise QueryError(f"invalid {name}: expected ISO date, e.g. 2026-02-14 or 2026-02-14T17:50")
+
+
+def _values(csv: str) -> set:
+    return {v.strip().lower() for v in csv.split(",") if v.strip()}
+
+
+def record_filter(status: str = None, priority: str = None, since: str = None,
+                  until: str = None):
+    """Predicate for the status/priority/since/until filters of query().
+
+    Raises QueryError for malformed dates up front, before any record is read.
+    """
+    statuses = _values(status) if status else None
+    priorities = _values(priority) if priority else None
+    since = parse_time(since, "since") if since else None
+    until = parse_time(until, "until") if until else None
+
+    def matches(r: dict) -> bool:
+        if statuses and str(r.get("status", "")).lower() not in statuses:
+            return False
+        if priorities and str(r.get("priority", "")).lower() not in priorities:
+            return False
+        created_at = r.get("created_at", "")
+        if since and created_at < since:
+            return False
+        if until and created_at >= until:
+            return False
+        return True
+
+    return matches
+
+
+def query(records: list, status: str = None, priority: str = None, since: str = None,
+          until: str = None, fields: str = None, cursor: str = None,
+          limit: int = DEFAULT_PAGE_SIZE, order: str = "desc") -> dict:
+    """Filter, sort and page a list of records.
+
+    Args:
+        status / priority: Comma-separated values, case-insensitive
+        since / until: ISO date(time) bounds on created_at (since inclusive, until exclusive)
+        fields: Comma-separated fields to return ("id" is always included)
+        cursor: next_cursor from the previous page
+        limit: Page size (0 returns only the total), capped at MAX_PAGE_SIZE
+        order: "desc" (newest first) or "asc"
+
+    Returns:
+        {"items": [...], "total": <matching records>, "next_cursor": str | None}
+    """
+    if order not in ("asc", "desc"):
+        raise QueryError("order must be 'asc' or 'desc'")
+    limit = max(0, min(int(limit), MAX_PAGE_SIZE))
+
+    matches = record_filter(status=status, priority=priority, since=since, until=until)
+    matched = [r for r in records if matches(r)]
+
+    matched.sort(key=page_key)
+    keys = [page_key(r) for r in matched]
+
+    if order == "asc":
+        start = bisect.bisect_right(keys, decode_cursor(cursor)) if cursor else 0
+        page = matched[start:start + limit]
+        has_more = start + limit < len(matched)
+    else:
+        end = bisect.bisect_left(keys, decode_cursor(cursor)) if cursor else len(matched)
+        page = matched[max(0, end - limit):end][::-1]
+        has_more = end - limit > 0
+
+    next_cursor = encode_cursor(page[-1]) if page and has_more else None
+    return {"items": project(page, fields), "total": len(matched), "next_cursor": next_cursor}
+
+
+def project(records: list, fields: str = None) -> list:
+    """Only the comma-separated ``fields`` of each record ("id" always)."""
+    if not fields:
+        return records
+    wanted = _values(fields) | {"id"}
+    return [{k: v for k, v in r.items() if k.lower() in wanted} for r in records]
+
+
+def _archived(name: str, skip, status=None, since=None, until=None, **_):
+    # archive.py builds on this module
+    import archive
+    return archive.iter_archived(name, skip, status=status, since=since, until=until)
+
+
+def _moved_ids(name: str) -> set:
+    import archive  # archive.py builds on this module
+    return archive.moved_ids(name)
+
+
+def query_collection(name: str, **params) -> dict:
+    """query() over a named collection, archived records included. Raises
+    KeyError if unknown.
+
+    Pages come from the hot file; archive months are opened newest first
+    (oldest first for order="asc") only once a page reaches past the hot
+    records, and the total counts archived records from the archive's
+    counts file — see archive.query_tiers().
+    """
+    records = load_collection(name)
+    import archive  # archive.py builds on this module
+    return archive.query_tiers(name, records, **params)
+
+
+def iter_collection(name: str, **filters):
+    """Stream the records of a collection that pass record_filter(**filters):
+    archived ones first, then the file's in insertion order. Raises
+    KeyError/QueryError before reading."""
+    filename = collection_file(name)
+    matches = record_filter(**filters)
+
+    def records():
+        hot = {r.get("id") for r in iter_json(filename) if isinstance(r, dict)}
+        yield from (r for r in _archived(name, hot, **filters) if matches(r))
+        yield from (r for r in iter_json(filename) if isinstance(r, dict) and matches(r))
+
+    return records()
+
+
+# ──────────────────────────────────────────────
+# Change tracking
+# ──────────────────────────────────────────────
+class SnapshotTracker:
+    """Per-record differences between successive versions of the collections.
+
+    changes() checks every collection's version (file_version() each),
+    reloads only files that changed and diffs them by record id against
+    the last snapshot. The first call reports every existing record as created.
+    Not thread-safe; callers hold their own lock.
+    """
+
+    def __init__(self, collections: dict = None):
+        self.collections = dict(collections or COLLECTIONS)
+        self._versions = {}
+        self._snapshots = {}
+
+    def changes(self) -> list:
+        """[(collection, before, after)]: before is None for creates, after for deletes."""
+        changes = []
+        for name, filename in self.collections.items():
+            version = file_version(filename)
+            if self._versions.get(name) == version:
+                continue
+            try:
+                records = load_json(filename)
+            except (OSError, ValueError):
+                continue  # caught mid-write by another process; retry next time
+            self._versions[name] = version
+            new = {r["id"]: r for r in records if isinstance(r, dict) and "id" in r}
+            old = self._snapshots.get(name, {})
+            self._snapshots[name] = new
+            for record_id, record in new.items():
+                before = old.get(record_id)
+                if before != record:
+                    changes.append((name, before, record))
+            for record_id in old.keys() - new.keys():
+                changes.append((name, old[record_id], None))
+        return changes
+
+    def records(self, name: str) -> dict:
+        """{id: record} of a collection as of the last changes() call."""
+        return self._snapshots.get(name, {})
+
+
+class ChangeFeed:
+    """Per-record deltas across collections, with a bounded replay history.
+
+    poll() turns SnapshotTracker changes into create/update/delete events
+    with increasing integer ids. Records an archive run moved out of a hot
+    file are still there for queries, so they make one "archive" event
+    per collection ({"count": n}) instead of deletes; since(id) replays what a client missed,
+    or returns None when that id has already fallen out of the history
+    (the client should then reload from scratch).
+    """
+
+    def __init__(self, collections: dict = None, history: int = 1000):
+        self.last_id = 0
+        self._events = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._tracker = SnapshotTracker(collections)
+        self._tracker.changes()  # baseline: existing records aren't news
+
+    def poll(self) -> list:
+        """Record and return the events caused by writes since the last poll."""
+        with self._lock:
+            events = []
+            moved = {}     # collection → IDs the latest archive run moved
+            archived = {}  # collection → how many of them left the hot file
+            for name, before, after in self._tracker.changes():
+                if before is None:
+                    events.append(self._event(name, "create", after))
+                elif after is None:
+                    if name not in moved:
+                        moved[name] = _moved_ids(name)
+                    if before["id"] in moved[name]:
+                        archived[name] = archived.get(name, 0) + 1
+                    else:
+                        events.append(self._event(name, "delete", {"id": before["id"]}))
+                else:
+                    events.append(self._event(name, "update", after))
+            for name, count in archived.items():
+                events.append(self._event(name, "archive", {"count": count}))
+            return events
+
+    def _event(self, collection: str, op: str, record: dict) -> dict:
+        self.last_id += 1
+        event = {"id": self.last_id, "collection": collection, "op": op, "record": record}
+        self._events.append(event)
+        return event
+
+    def since(self, event_id: int):
+        """Events after ``event_id``; None if some of them are no longer kept."""
+        with self._lock:
+            if event_id > self.last_id:
+                return None  # id from a previous run of the feed
+            oldest = self._events[0]["id"] if self._events else self.last_id + 1
+            if event_id < oldest - 1:
+                return None
+            return [e for e in self._events if e["id"] > event_id]
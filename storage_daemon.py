@@ -0,0 +1,371 @@
+"""
+ContextOS — Storage Daemon
+One process owns data/ and serves it to all the others over a Unix socket.
+
+    python storage_daemon.py                                   # data/storage.sock
+    CONTEXTOS_STORAGE_SOCKET=data/storage.sock python server.py
+    CONTEXTOS_STORAGE_SOCKET=data/storage.sock python dashboard.py
+
+With CONTEXTOS_STORAGE_SOCKET set, storage.py sends its loads, saves,
+appends and version checks here instead of opening the files, so every
+process sees the same data and writes take turns in one place. Nothing
+changes for callers of storage.py.
+
+The daemon keeps every file it has served in memory. Each write is
+appended to a log (data/storage.*.log) and acknowledged once it is in the
+log. Every CHECKPOINT_SECONDS the in-memory state is saved to
+data/storage.snapshot, the JSON files are rewritten for anything still
+reading them directly, and the older log segments are deleted. On startup
+the daemon loads the snapshot and replays the newer log segments; a file
+it has never seen is read from its JSON file. While the daemon runs it
+owns data/: edit the JSON files by hand only while it is stopped, and
+delete storage.snapshot so they are read again.
+
+Wire format: a 4-byte big-endian length, then a msgpack array. Requests
+are [op, *args]; replies [True, result] or [False, error].
+
+  load     filename                         → [version, records]
+  stat     filename                         → [version, modified]
+  save     filename, records, if_version    → version
+  append   filename, records, if_version    → version
+
+A write with if_version (not None) only goes ahead if the file is still
+at that version; otherwise the reply is [False, "conflict"]. Versions
+start at the daemon's boot time in milliseconds, so they keep increasing
+across restarts.
+"""
+
+import os
+import glob
+import json
+import time
+import queue
+import struct
+import signal
+import socket
+import asyncio
+import argparse
+import threading
+
+import msgpack
+
+import storage
+
+SOCKET_PATH = os.path.join(storage.DATA_DIR, "storage.sock")
+SNAPSHOT_FILE = os.path.join(storage.DATA_DIR, "storage.snapshot")
+LOG_PATTERN = os.path.join(storage.DATA_DIR, "storage.{:08d}.log")
+CHECKPOINT_SECONDS = float(os.getenv("STORAGE_CHECKPOINT_SECONDS", "5"))
+# fsync the log before acknowledging a write (survives power loss, not just crashes)
+FSYNC = os.getenv("STORAGE_FSYNC", "0") == "1"
+# Connections a client process keeps open
+POOL_SIZE = int(os.getenv("STORAGE_POOL_SIZE", "8"))
+MAX_MESSAGE = 1 << 30
+
+_HEADER = struct.Struct(">I")
+CONFLICT = "conflict"
+
+
+class DaemonError(RuntimeError):
+    """The storage daemon rejected a request."""
+
+
+class Conflict(DaemonError):
+    """A conditional write found the file at another version."""
+
+
+def pack(message) -> bytes:
+    body = msgpack.packb(message, use_bin_type=True)
+    return _HEADER.pack(len(body)) + body
+
+
+def _unpack(body: bytes):
+    return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+
+# ──────────────────────────────────────────────
+# Daemon
+# ──────────────────────────────────────────────
+class StorageDaemon:
+    def __init__(self, data_dir: str = storage.DATA_DIR):
+        self.data_dir = data_dir
+        self.files = {}      # filename → records
+        self.versions = {}   # filename → version
+        self.modified = {}   # filename → unix time of the last change
+        self.dirty = set()   # files changed since the last checkpoint
+        self.boot = int(time.time() * 1000)
+        self.seq = 0         # sequence number of the last logged write
+        self.segment = 0
+        self._log = None
+        self._checkpointing = False
+
+    # ── Recovery ───────────────────────────────
+    def recover(self) -> None:
+        """Load the snapshot and replay the log segments written after it."""
+        covered = 0
+        if os.path.exists(SNAPSHOT_FILE):
+            with open(SNAPSHOT_FILE, "rb") as f:
+                snapshot = _unpack(f.read())
+            covered = self.seq = snapshot["seq"]
+            self.files = snapshot["files"]
+            self.modified = snapshot["modified"]
+        replayed = 0
+        for path in sorted(glob.glob(LOG_PATTERN.replace("{:08d}", "*"))):
+            self.segment = max(self.segment, int(path.rsplit(".", 2)[-2]))
+            for seq, op, filename, records in _read_log(path):
+                if seq <= covered:
+                    continue
+                self._load(filename)
+                self._apply(op, filename, records)
+                self.seq = seq
+                replayed += 1
+        for filename in self.files:
+            self.versions[filename] = self.boot
+        self.dirty = set(self.files)
+        self._open_segment()
+        print(f"💾 Storage daemon: {len(self.files)} files, {replayed} writes replayed from the log")
+
+    def _open_segment(self) -> None:
+        self.segment += 1
+        self._log = open(LOG_PATTERN.format(self.segment), "ab")
+
+    # ── Operations ─────────────────────────────
+    def _load(self, filename: str) -> list:
+        records = self.files.get(filename)
+        if records is None:
+            path = os.path.join(self.data_dir, filename)
+            records = []
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    records = json.load(f)
+                self.modified[filename] = os.path.getmtime(path)
+            self.files[filename] = records
+            self.versions[filename] = self.boot
+        return records
+
+    def _apply(self, op: str, filename: str, records: list) -> None:
+        if op == "save":
+            self.files[filename] = list(records)
+        else:
+            self.files[filename].extend(records)
+
+    def handle(self, request: list):
+        op, filename, *args = request
+        if not isinstance(filename, str) or ".." in filename.replace("\\", "/").split("/"):
+            raise DaemonError(f"invalid filename {filename!r}")
+        records = self._load(filename)
+        version = self.versions[filename]
+        if op == "load":
+            return [version, records]
+        if op == "stat":
+            return [version, self.modified.get(filename, 0.0)]
+        if op in ("save", "append"):
+            new, if_version = args
+            if if_version is not None and if_version != version:
+                return CONFLICT
+            self.seq += 1
+            self._log.write(pack([self.seq, op, filename, new]))
+            self._log.flush()
+            if FSYNC:
+                os.fsync(self._log.fileno())
+            self._apply(op, filename, new)
+            self.versions[filename] = version + 1
+            self.modified[filename] = time.time()
+            self.dirty.add(filename)
+            return version + 1
+        raise DaemonError(f"unknown operation {op!r}")
+
+    # ── Checkpoints ────────────────────────────
+    async def checkpoint(self) -> None:
+        """Snapshot the state and drop the log segments it covers."""
+        if not self.dirty or self._checkpointing:
+            return
+        self._checkpointing = True
+        try:
+            # Writes from here on go to a new segment; the snapshot covers the rest
+            closed = self._log
+            closed.close()
+            closed_paths = [p for p in glob.glob(LOG_PATTERN.replace("{:08d}", "*"))
+                            if int(p.rsplit(".", 2)[-2]) <= self.segment]
+            self._open_segment()
+            state = {"seq": self.seq, "files": {f: list(r) for f, r in self.files.items()},
+                     "modified": dict(self.modified)}
+            dirty, self.dirty = self.dirty, set()
+            try:
+                await asyncio.to_thread(self._write_checkpoint, state, dirty, closed_paths)
+            except Exception:
+                self.dirty |= dirty
+                raise
+        finally:
+            self._checkpointing = False
+
+    def _write_checkpoint(self, state: dict, dirty: set, closed_paths: list) -> None:
+        tmp = SNAPSHOT_FILE + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(msgpack.packb(state, use_bin_type=True))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, SNAPSHOT_FILE)
+        for path in closed_paths:
+            os.remove(path)
+        for filename in dirty:
+            path = os.path.join(self.data_dir, filename)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.daemon.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state["files"][filename], f, indent=2, ensure_ascii=False)
+            os.replace(tmp, path)
+
+    async def _checkpoint_loop(self) -> None:
+        while True:
+            await asyncio.sleep(CHECKPOINT_SECONDS)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                print(f"⚠️ Storage checkpoint failed: {e}")
+
+    # ── Serving ────────────────────────────────
+    async def _serve_client(self, reader, writer) -> None:
+        try:
+            while True:
+                header = await reader.readexactly(_HEADER.size)
+                (length,) = _HEADER.unpack(header)
+                if length > MAX_MESSAGE:
+                    break
+                try:
+                    reply = self.handle(_unpack(await reader.readexactly(length)))
+                    if reply == CONFLICT:
+                        writer.write(pack([False, CONFLICT]))
+                    else:
+                        writer.write(pack([True, reply]))
+                except (DaemonError, ValueError, TypeError, KeyError, OSError) as e:
+                    writer.write(pack([False, str(e)]))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path: str = SOCKET_PATH) -> None:
+        self.recover()
+        if os.path.exists(path):
+            os.remove(path)
+        server = await asyncio.start_unix_server(self._serve_client, path=path)
+        checkpoints = asyncio.create_task(self._checkpoint_loop())
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+        print(f"💾 Storage daemon listening on {path}")
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            checkpoints.cancel()
+            # A clean stop leaves no log to replay
+            await self.checkpoint()
+            self._log.close()
+            if os.path.getsize(self._log.name) == 0:
+                os.remove(self._log.name)
+            if os.path.exists(path):
+                os.remove(path)
+            print("\n🛑 Storage daemon stopped.")
+
+
+def _read_log(path: str):
+    """(seq, op, filename, records) of a log segment; stops at a torn last entry."""
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset + _HEADER.size <= len(data):
+        (length,) = _HEADER.unpack_from(data, offset)
+        end = offset + _HEADER.size + length
+        if end > len(data):
+            break  # write cut short by a crash: never acknowledged
+        yield _unpack(data[offset + _HEADER.size:end])
+        offset = end
+
+
+# ──────────────────────────────────────────────
+# Client
+# ──────────────────────────────────────────────
+class StorageClient:
+    """Blocking client with a pool of connections, safe to share between threads."""
+
+    Conflict = Conflict
+
+    def __init__(self, path: str = SOCKET_PATH, pool_size: int = POOL_SIZE):
+        self.path = path
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        return sock
+
+    def call(self, *request):
+        self._slots.acquire()
+        try:
+            try:
+                sock = self._idle.get_nowait()
+            except queue.Empty:
+                sock = self._connect()
+            try:
+                sock.sendall(pack(list(request)))
+                ok, result = _unpack(_recv_exactly(sock, _recv_length(sock)))
+            except BaseException:
+                sock.close()
+                raise
+            self._idle.put(sock)
+        finally:
+            self._slots.release()
+        if not ok:
+            raise Conflict(result) if result == CONFLICT else DaemonError(result)
+        return result
+
+    def load(self, filename: str) -> tuple:
+        version, records = self.call("load", filename)
+        return version, records
+
+    def stat(self, filename: str) -> tuple:
+        version, modified = self.call("stat", filename)
+        return version, modified
+
+    def save(self, filename: str, records: list, if_version: int = None) -> int:
+        return self.call("save", filename, records, if_version)
+
+    def append(self, filename: str, records: list, if_version: int = None) -> int:
+        return self.call("append", filename, records, if_version)
+
+
+def _recv_exactly(sock, n: int) -> bytes:
+    chunks, remaining = [], n
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            raise ConnectionError("storage daemon closed the connection")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_length(sock) -> int:
+    return _HEADER.unpack(_recv_exactly(sock, _HEADER.size))[0]
+
+
+# ──────────────────────────────────────────────
+# Entry Point
+# ──────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="ContextOS storage daemon")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket to listen on")
+    args = parser.parse_args()
+    if storage.STORAGE_SOCKET:
+        # This process is the backend: it must read the files, not itself
+        print("⚠️ Ignoring CONTEXTOS_STORAGE_SOCKET in the storage daemon")
+    if not hasattr(socket, "AF_UNIX"):
+        raise SystemExit("❌ The storage daemon needs Unix domain sockets (Linux/macOS)")
+    asyncio.run(StorageDaemon().serve(args.socket))
+
+
+if __name__ == "__main__":
+    main()
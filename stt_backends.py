@@ -0,0 +1,143 @@
+"""
+ContextOS — Speech-to-Text Backends
+Pluggable STT engines used by VoiceProcessor.
+
+Backends:
+  • google — Google Web Speech API via SpeechRecognition (network, default)
+  • vosk   — Local CPU decoding, model loaded once into a pool of warm workers
+
+Configuration (.env / environment):
+  STT_BACKEND=google|vosk
+  VOSK_MODEL_PATH=models/vosk-model-small-en-us-0.15
+  STT_POOL_SIZE=2
+
+Every backend is a callable taking ``sr.AudioData`` and returning text, and
+raises ``sr.UnknownValueError`` when nothing intelligible was heard.
+"""
+
+import os
+import abc
+import json
+import queue
+import time
+
+import speech_recognition as sr
+
+DEFAULT_BACKEND = "google"
+DEFAULT_VOSK_MODEL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "vosk-model-small-en-us-0.15")
+DEFAULT_POOL_SIZE = 2
+
+# One loaded backend per name for the lifetime of the process
+_BACKENDS = {}
+
+
+class STTBackend(abc.ABC):
+    """Base class for speech-to-text engines."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def transcribe(self, audio_data: sr.AudioData) -> str:
+        """Return the text heard, or raise sr.UnknownValueError."""
+
+    def __call__(self, audio_data: sr.AudioData) -> str:
+        return self.transcribe(audio_data)
+
+
+class GoogleSTTBackend(STTBackend):
+    """Google Web Speech API (free tier, needs network)."""
+
+    name = "google"
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, audio_data: sr.AudioData) -> str:
+        return self.recognizer.recognize_google(audio_data)
+
+
+class VoskSTTBackend(STTBackend):
+    """Offline Vosk (Kaldi) decoding on the CPU.
+
+    The acoustic model is loaded once and shared; a fixed pool of
+    KaldiRecognizer workers is created up front so no request pays the
+    warm-up cost. Audio is fed to the recognizer in small frames, the same
+    way a live stream would be decoded.
+    """
+
+    name = "vosk"
+    SAMPLE_RATE = 16000
+    FRAME_BYTES = 8000  # 0.25 s of 16 kHz, 16-bit mono PCM
+
+    def __init__(self, model_path: str = None, pool_size: int = None):
+        try:
+            from vosk import Model, KaldiRecognizer, SetLogLevel
+        except ImportError:
+            raise RuntimeError("vosk not installed. Run: pip install vosk")
+
+        model_path = model_path or os.getenv("VOSK_MODEL_PATH", DEFAULT_VOSK_MODEL)
+        pool_size = pool_size or int(os.getenv("STT_POOL_SIZE", DEFAULT_POOL_SIZE))
+        if not os.path.isdir(model_path):
+            raise RuntimeError(
+                f"Vosk model not found at {model_path}. "
+                "Download one from https://alphacephei.com/vosk/models"
+            )
+
+        SetLogLevel(-1)
+        started = time.perf_counter()
+        self.model = Model(model_path)
+        self._workers = queue.Queue()
+        for _ in range(pool_size):
+            self._workers.put(KaldiRecognizer(self.model, self.SAMPLE_RATE))
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"🎙️  Vosk model loaded ({pool_size} warm workers, {elapsed:.0f} ms)")
+
+    def transcribe(self, audio_data: sr.AudioData) -> str:
+        pcm = audio_data.get_raw_data(convert_rate=self.SAMPLE_RATE, convert_width=2)
+
+        # Blocks until a warm worker is free
+        recognizer = self._workers.get()
+        try:
+            parts = []
+            for offset in range(0, len(pcm), self.FRAME_BYTES):
+                if recognizer.AcceptWaveform(pcm[offset:offset + self.FRAME_BYTES]):
+                    parts.append(json.loads(recognizer.Result()).get("text", ""))
+            parts.append(json.loads(recognizer.FinalResult()).get("text", ""))
+        finally:
+            recognizer.Reset()
+            self._workers.put(recognizer)
+
+        text = " ".join(p for p in parts if p)
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+BACKENDS = {
+    "google": GoogleSTTBackend,
+    "vosk": VoskSTTBackend,
+}
+
+
+def get_stt_backend(name: str = None) -> STTBackend:
+    """Return the configured backend, loading it on first use.
+
+    Falls back to Google if a local engine cannot be loaded.
+    """
+    name = (name or os.getenv("STT_BACKEND", DEFAULT_BACKEND)).lower()
+    if name in _BACKENDS:
+        return _BACKENDS[name]
+
+    if name not in BACKENDS:
+        print(f"⚠️  Unknown STT_BACKEND '{name}', using {DEFAULT_BACKEND}")
+        return get_stt_backend(DEFAULT_BACKEND)
+
+    try:
+        _BACKENDS[name] = BACKENDS[name]()
+    except RuntimeError as e:
+        if name == DEFAULT_BACKEND:
+            raise
+        print(f"⚠️  STT backend '{name}' unavailable: {e}")
+        print(f"   Falling back to {DEFAULT_BACKEND}")
+        return get_stt_backend(DEFAULT_BACKEND)
+    return _BACKENDS[name]
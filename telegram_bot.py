@@ -22,8 +22,7 @@ Architecture:
 
 import os
 import sys
-import json
-import uuid
+import time
 import asyncio
 
 from datetime import datetime
@@ -62,6 +61,12 @@ except ImportError:
     sys.exit(1)
 
 from voice_processor import VoiceProcessor
+from telegram_scheduler import ChatOrderedUpdateProcessor
+from telegram_webhook import run_webhook
+from aggregates import get_aggregates
+from ids import new_id
+from write_buffer import flush_pending
+import storage
 
 
 
@@ -77,18 +82,23 @@ if not TELEGRAM_BOT_TOKEN:
     print("   5. Then: python telegram_bot.py")
     sys.exit(1)
 
+# Update ingestion: "polling" (default) or "webhook" (see telegram_webhook.py)
+TELEGRAM_MODE = os.getenv("TELEGRAM_MODE", "polling").lower()
+
 # Optional: Slack webhook
 SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
 if not SLACK_WEBHOOK_URL:
     print("⚠️  SLACK_WEBHOOK_URL not set. Agent messages will be simulated.")
     print("   To enable real Slack messages: set SLACK_WEBHOOK_URL=<your-url>")
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
-os.makedirs(DATA_DIR, exist_ok=True)
+DATA_DIR = storage.DATA_DIR
 
 # Create temp_audio directory for voice messages
 os.makedirs("temp_audio", exist_ok=True)
 
+# Minimum seconds between edits of a streaming reply (Telegram rate-limits edits)
+STREAM_EDIT_INTERVAL = 1.0
+
 # Track conversations (user_id → context)
 CONVERSATIONS = {}
 
@@ -100,24 +110,8 @@ CONVERSATIONS = {}
 # Utilities
 # ──────────────────────────────────────────────────────────────
 def _load_json(filename: str) -> list:
-    """Load JSON file."""
-    filepath = os.path.join(DATA_DIR, filename)
-    if os.path.exists(filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
-
-
-def _save_json(filename: str, data: list) -> None:
-    """Save to JSON file."""
-    filepath = os.path.join(DATA_DIR, filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
-
-def _gen_id(prefix: str) -> str:
-    """Generate unique ID."""
-    return f"{prefix}-{uuid.uuid4().hex[:4]}"
+    """Load JSON file (through storage, or via the storage daemon)."""
+    return storage.load_json(filename)
 
 
 def _execute_rpc(rpc: dict) -> dict:
@@ -127,7 +121,7 @@ def _execute_rpc(rpc: dict) -> dict:
     now = datetime.now().isoformat()
 
     if tool == "schedule_event":
-        eid = _gen_id("EVT")
+        eid = new_id("EVT")
         entry = {
             "id": eid,
             "topic": p.get("topic", ""),
@@ -136,9 +130,7 @@ def _execute_rpc(rpc: dict) -> dict:
             "created_at": now,
             "status": "scheduled"
         }
-        data = _load_json("calendar.json")
-        data.append(entry)
-        _save_json("calendar.json", data)
+        storage.append_records("calendar.json", [entry])
         return {
             "agent": "📅 Calendar",
             "action": "schedule_event",
@@ -148,7 +140,7 @@ def _execute_rpc(rpc: dict) -> dict:
         }
 
     elif tool == "trigger_alert":
-        aid = _gen_id("ALT")
+        aid = new_id("ALT")
         entry = {
             "id": aid,
             "system": p.get("system", ""),
@@ -157,9 +149,7 @@ def _execute_rpc(rpc: dict) -> dict:
             "created_at": now,
             "status": "active"
         }
-        data = _load_json("alerts.json")
-        data.append(entry)
-        _save_json("alerts.json", data)
+        storage.append_records("alerts.json", [entry])
         return {
             "agent": "🚨 Alert",
             "action": "trigger_alert",
@@ -169,7 +159,7 @@ def _execute_rpc(rpc: dict) -> dict:
         }
 
     elif tool == "create_ticket":
-        tid = _gen_id("TKT")
+        tid = new_id("TKT")
         entry = {
             "id": tid,
             "assignee": p.get("assignee", ""),
@@ -179,9 +169,7 @@ def _execute_rpc(rpc: dict) -> dict:
             "created_at": now,
             "status": "open"
         }
-        data = _load_json("tickets.json")
-        data.append(entry)
-        _save_json("tickets.json", data)
+        storage.append_records("tickets.json", [entry])
         return {
             "agent": "🎫 Ticket",
             "action": "create_ticket",
@@ -191,7 +179,7 @@ def _execute_rpc(rpc: dict) -> dict:
         }
 
     elif tool == "create_reminder":
-        rid = _gen_id("REM")
+        rid = new_id("REM")
         entry = {
             "id": rid,
             "message": p.get("message", ""),
@@ -200,9 +188,7 @@ def _execute_rpc(rpc: dict) -> dict:
             "created_at": now,
             "status": "pending"
         }
-        data = _load_json("reminders.json")
-        data.append(entry)
-        _save_json("reminders.json", data)
+        storage.append_records("reminders.json", [entry])
         return {
             "agent": "⏰ Reminder",
             "action": "create_reminder",
@@ -228,6 +214,8 @@ class TelegramBot:
         self.token = token
         self.orchestrator = AgentOrchestrator(telegram_bot=self)
         self.voice_processor = VoiceProcessor()
+        # Chats run concurrently, updates within one chat stay in order
+        self.update_processor = ChatOrderedUpdateProcessor()
         # Use HTTPXRequest with HTTP/1.1 enforcement for stability
         from telegram.request import HTTPXRequest
         request = HTTPXRequest(
@@ -245,6 +233,7 @@ class TelegramBot:
             .token(self.token)
             .request(request)
             .get_updates_request(request)
+            .concurrent_updates(self.update_processor)
             .build()
         )
 
@@ -321,17 +310,19 @@ class TelegramBot:
 
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /status command."""
-        cals = len(_load_json("calendar.json"))
-        alts = len(_load_json("alerts.json"))
-        tkts = len(_load_json("tickets.json"))
-        rems = len(_load_json("reminders.json"))
+        # Materialized counters: only files written since the last call are read
+        stats = await asyncio.to_thread(get_aggregates().summary)
+        sched = self.update_processor.metrics()
+        pending = stats["by_status"].get("reminders", {}).get("pending", 0)
 
         status = (
             f"📊 ContextOS Status\n\n"
-            f"📅 Calendar: {cals} events\n"
-            f"🚨 Alerts: {alts} active\n"
-            f"🎫 Tickets: {tkts} open\n"
-            f"⏰ Reminders: {rems} pending\n\n"
+            f"📅 Calendar: {stats['totals']['events']} events\n"
+            f"🚨 Alerts: {stats['active_alerts']} active\n"
+            f"🎫 Tickets: {stats['open_tickets']} open\n"
+            f"⏰ Reminders: {pending} pending\n\n"
+            f"⚙️ Updates: {sched['in_flight']}/{sched['max_concurrency']} running | "
+            f"{sched['active_chats']} chats busy | deepest queue {sched['busiest_chat_depth']}\n\n"
             f"🟢 All systems operational!"
         )
         await update.message.reply_text(status)
@@ -343,14 +334,24 @@ class TelegramBot:
         
         # 1. Download File
         voice_file = await update.message.voice.get_file()
-        ogg_path = f"temp_audio/{user_id}.ogg"
+        # Unique per message: voice notes from one user may overlap across chats
+        ogg_path = f"temp_audio/{user_id}_{update.message.message_id}.ogg"
         await voice_file.download_to_drive(ogg_path)
         
-        await update.message.reply_text("👂 Listening...")
-        
-        # 2. Transcribe (STT)
-        text_command = self.voice_processor.transcribe_audio(ogg_path)
-        
+        listening = await update.message.reply_text("👂 Listening...")
+
+        # 2. Transcribe (STT) — long notes are chunked and decoded in parallel,
+        # partial text is shown as soon as the leading chunks are done
+        async def _show_partial(index: int, text: str, prefix: str):
+            if not prefix:
+                return
+            try:
+                await listening.edit_text(f"👂 Listening... '{prefix}'")
+            except Exception as e:
+                print(f"⚠️ Could not update partial transcript: {e}")
+
+        text_command = await self.voice_processor.transcribe_audio_chunked(ogg_path, on_partial=_show_partial)
+
         if not text_command:
             await update.message.reply_text("❌ Could not understand audio.")
             return
@@ -395,6 +396,24 @@ class TelegramBot:
                 await asyncio.sleep(2) # Wait a bit longer before retry
         print(f"❌ Failed to reply after {retries} attempts.")
 
+    async def _stream_edit(self, update: Update, reply, text: str, final: bool = False):
+        """Send the first progress message, then edit it in place."""
+        if reply is None:
+            try:
+                return await update.message.reply_text(text)
+            except Exception as e:
+                print(f"⚠️ Could not send progress message: {e}")
+                return None
+        try:
+            await reply.edit_text(text)
+        except Exception as e:
+            # "Message is not modified" is harmless; otherwise make sure the result arrives
+            if "not modified" not in str(e):
+                print(f"⚠️ Could not update progress message: {e}")
+                if final:
+                    await self._safe_reply(update, text)
+        return reply
+
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle incoming messages — renders rich step-by-step agent responses."""
         user_id = update.effective_user.id
@@ -417,8 +436,23 @@ class TelegramBot:
             # Get context
             user_context = CONVERSATIONS.get(user_id, {})
             
-            # Route through multi-agent system
-            result = await self.orchestrator.route_message(message_text, context=user_context)
+            # Route through multi-agent system, showing steps as agents produce them
+            result = {}
+            live_reply = None
+            live_lines = []
+            last_edit = float("-inf")
+            async for event in self.orchestrator.route_message_stream(message_text, context=user_context):
+                if event["type"] == "done":
+                    result = event["result"]
+                    continue
+                live_lines.append(event["step"])
+                now = time.monotonic()
+                if now - last_edit >= STREAM_EDIT_INTERVAL:
+                    last_edit = now
+                    live_reply = await self._stream_edit(
+                        update, live_reply,
+                        "⚡ ContextOS Multi-Agent Response\n\n" + "\n".join(live_lines) + "\n\n⏳ Working..."
+                    )
             
             total_tasks = result.get("total_tasks", 0)
             response_lines = result.get("response_lines", [])
@@ -451,7 +485,10 @@ class TelegramBot:
                     "• \"Tell Dana the payment bug is fixed\""
                 )
             
-            await self._safe_reply(update, response)
+            if live_reply:
+                await self._stream_edit(update, live_reply, response, final=True)
+            else:
+                await self._safe_reply(update, response)
             
             # Store context
             CONVERSATIONS[user_id] = {
@@ -510,7 +547,13 @@ class TelegramBot:
                 break
 
     def run(self):
-        """Start the bot's polling."""
+        """Start the bot in the configured ingestion mode."""
+        if TELEGRAM_MODE == "webhook":
+            asyncio.get_event_loop().run_until_complete(
+                run_webhook(self.application, allowed_updates=[Update.MESSAGE])
+            )
+            return
+
         self.application.run_polling(
             allowed_updates=["message", "text", "photo", "voice"],
             drop_pending_updates=True,
@@ -542,7 +585,8 @@ def main() -> None:
     for filename in ["calendar.json", "alerts.json", "tickets.json", "reminders.json"]:
         filepath = os.path.join(DATA_DIR, filename)
         if not os.path.exists(filepath):
-            _save_json(filename, [])
+            # Locked no-op write: never clobbers records written meanwhile
+            storage.modify_json(filename, lambda records: None)
             print(f"✓ Created {filename}")
 
     # Create and run the bot
@@ -550,6 +594,21 @@ def main() -> None:
          print("❌ Error: Token not found")
          return
 
+    # Webhook mode keeps one Application for the life of the process;
+    # handler errors are already contained by error_handler
+    if TELEGRAM_MODE == "webhook":
+        print("🚀 Bot is running in WEBHOOK mode!\n")
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            TelegramBot(TELEGRAM_BOT_TOKEN).run()
+        except KeyboardInterrupt:
+            print("\n\n🛑 Bot stopped by user.")
+        finally:
+            loop.close()
+            flush_pending()
+        return
+
     # Infinite Retry Loop for Resilience
     while True:
         try:
@@ -569,6 +628,9 @@ def main() -> None:
             print("🔄 Restarting bot in 5 seconds...")
             import time
             time.sleep(5)
+        finally:
+            # Agent records buffered on the loop that just ended
+            flush_pending()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+"""
+ContextOS — Telegram Update Scheduler
+Per-chat ordered, cross-chat concurrent update processing.
+
+python-telegram-bot processes updates one at a time by default, so a slow
+route_message (Slack broadcast, phone call, voice note) in one chat blocks
+every other chat. This processor runs different chats concurrently while
+keeping updates from the same chat strictly in arrival order — Pattern 0
+("prioritize this") relies on the previous message of that chat having
+finished first.
+
+Usage:
+    processor = ChatOrderedUpdateProcessor(max_concurrency=8)
+    Application.builder().concurrent_updates(processor)...
+"""
+
+import os
+import asyncio
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("TELEGRAM_MAX_CONCURRENT_UPDATES", "8"))
+
+# Updates allowed to wait inside the processor (queued behind their chat
+# or behind the global cap) before the Application itself stops feeding us
+MAX_PENDING_UPDATES = 1024
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Runs updates concurrently across chats, serially within a chat."""
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        # The base semaphore only bounds how many updates may be pending;
+        # the real handler concurrency cap is applied after the chat lock so
+        # updates queued behind their own chat don't hold a global slot.
+        super().__init__(max_concurrent_updates=MAX_PENDING_UPDATES)
+        self.max_concurrency = max_concurrency
+        self._running = asyncio.Semaphore(max_concurrency)
+        self._chat_locks = {}
+        self._queue_depth = {}
+        self.in_flight = 0
+        self.processed = 0
+        self.max_queue_depth = 0
+
+    @staticmethod
+    def _chat_key(update: object):
+        if isinstance(update, Update) and update.effective_chat:
+            return update.effective_chat.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine) -> None:
+        chat_id = self._chat_key(update)
+        if chat_id is None:
+            async with self._running:
+                await self._run(coroutine)
+            return
+
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        depth = self._queue_depth.get(chat_id, 0) + 1
+        self._queue_depth[chat_id] = depth
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        try:
+            # asyncio.Lock wakes waiters FIFO, so a chat's updates run in arrival order
+            async with lock:
+                async with self._running:
+                    await self._run(coroutine)
+        finally:
+            depth = self._queue_depth[chat_id] - 1
+            if depth:
+                self._queue_depth[chat_id] = depth
+            else:
+                # Drop idle chats so the maps don't grow with every user ever seen
+                del self._queue_depth[chat_id]
+                self._chat_locks.pop(chat_id, None)
+
+    async def _run(self, coroutine) -> None:
+        self.in_flight += 1
+        try:
+            await coroutine
+        finally:
+            self.in_flight -= 1
+            self.processed += 1
+
+    def queue_depths(self) -> dict:
+        """Pending + running updates per chat (only chats with work)."""
+        return dict(self._queue_depth)
+
+    def metrics(self) -> dict:
+        depths = self._queue_depth.values()
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "active_chats": len(self._queue_depth),
+            "queued": sum(depths),
+            "busiest_chat_depth": max(depths, default=0),
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
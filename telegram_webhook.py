@@ -0,0 +1,103 @@
+"""
+ContextOS — Telegram Webhook Ingestion
+Receive Telegram updates over HTTPS push instead of long polling.
+
+A small Starlette app (served by uvicorn) accepts POSTs from Telegram,
+checks the X-Telegram-Bot-Api-Secret-Token header and puts the decoded
+Update on the Application's update queue, so the same handlers (and the
+per-chat scheduler) process it exactly as in polling mode.
+
+Configuration (.env / environment):
+  TELEGRAM_MODE=webhook
+  TELEGRAM_WEBHOOK_URL=https://your-host.example.com   (public base URL; optional)
+  TELEGRAM_WEBHOOK_SECRET=<1-256 chars of A-Z a-z 0-9 _ ->
+  TELEGRAM_WEBHOOK_PORT=8443
+  TELEGRAM_WEBHOOK_PATH=/telegram/webhook
+
+Without TELEGRAM_WEBHOOK_URL the endpoint still runs locally but is not
+registered with Telegram — handy for replaying recorded updates with
+tools/post_telegram_update.py.
+"""
+
+import os
+import hmac
+import json
+import secrets
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+from telegram import Update
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("TELEGRAM_WEBHOOK_PATH", "/telegram/webhook")
+WEBHOOK_PORT = int(os.getenv("TELEGRAM_WEBHOOK_PORT", "8443"))
+WEBHOOK_LISTEN = os.getenv("TELEGRAM_WEBHOOK_LISTEN", "0.0.0.0")
+
+
+def create_webhook_app(application, secret_token: str, path: str = WEBHOOK_PATH) -> Starlette:
+    """Build the ASGI app that feeds webhook updates into ``application``."""
+
+    async def telegram_update(request: Request) -> Response:
+        received = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(received.encode(), secret_token.encode()):
+            return PlainTextResponse("Forbidden", status_code=403)
+
+        try:
+            data = await request.json()
+        except json.JSONDecodeError:
+            return PlainTextResponse("Invalid JSON", status_code=400)
+
+        if not isinstance(data, dict):
+            return PlainTextResponse("Invalid update", status_code=400)
+        try:
+            update = Update.de_json(data, application.bot)
+        except (TypeError, KeyError, ValueError, AttributeError):
+            # Valid JSON of the wrong shape: a 500 would make Telegram retry it
+            return PlainTextResponse("Invalid update", status_code=400)
+        if update is None:
+            return PlainTextResponse("Invalid update", status_code=400)
+
+        # Acknowledge immediately; the Application processes it in the background
+        await application.update_queue.put(update)
+        return Response(status_code=200)
+
+    async def health(request: Request) -> Response:
+        return PlainTextResponse("ok")
+
+    return Starlette(routes=[
+        Route(path, telegram_update, methods=["POST"]),
+        Route("/healthz", health, methods=["GET"]),
+    ])
+
+
+async def run_webhook(application, allowed_updates: list) -> None:
+    """Start ``application`` and serve the webhook endpoint until stopped."""
+    secret_token = os.getenv("TELEGRAM_WEBHOOK_SECRET") or secrets.token_urlsafe(32)
+    app = create_webhook_app(application, secret_token)
+    server = uvicorn.Server(uvicorn.Config(
+        app, host=WEBHOOK_LISTEN, port=WEBHOOK_PORT, log_level="warning",
+    ))
+
+    async with application:
+        if WEBHOOK_URL:
+            await application.bot.set_webhook(
+                url=WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+                secret_token=secret_token,
+                allowed_updates=allowed_updates,
+                drop_pending_updates=True,
+            )
+            print(f"🔗 Webhook registered: {WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}")
+        else:
+            print("⚠️  TELEGRAM_WEBHOOK_URL not set — webhook not registered with Telegram (local only)")
+
+        print(f"📥 Listening for updates on http://{WEBHOOK_LISTEN}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+        await application.start()
+        try:
+            await server.serve()
+        finally:
+            await application.stop()
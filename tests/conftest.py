@@ -0,0 +1,24 @@
+import os
+import sys
+import shutil
+import tempfile
+
+import pytest
+
+# storage.py reads CONTEXTOS_DATA_DIR at import: point it at a scratch
+# directory before any test imports it, so data/ is never touched
+DATA_DIR = os.environ["CONTEXTOS_DATA_DIR"] = tempfile.mkdtemp(prefix="contextos-tests-")
+os.environ.pop("CONTEXTOS_STORAGE_SOCKET", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def empty_data_dir():
+    """Every test starts from an empty data directory."""
+    for entry in os.listdir(DATA_DIR):
+        path = os.path.join(DATA_DIR, entry)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
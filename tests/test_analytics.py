@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+
+import analytics
+import storage
+
+
+class _Clock(datetime):
+    offset = timedelta(0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return datetime.now(tz) + cls.offset
+
+
+def test_ticket_ages_advance_while_the_snapshot_is_reused(monkeypatch):
+    created = (datetime.now() - timedelta(hours=2)).isoformat()
+    storage.save_json("tickets.json", [{"id": "TKT-1", "status": "open", "created_at": created}])
+    monkeypatch.setattr(analytics, "datetime", _Clock)
+    stats = analytics.Analytics(refresh_interval=0)
+
+    before = stats.age_distribution("tickets")["median_hours"]
+    _Clock.offset = timedelta(hours=10)
+    after = stats.age_distribution("tickets")["median_hours"]
+
+    assert round(before) == 2
+    assert round(after) == 12
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import archive
+import storage
+from aggregates import Aggregates
+from analytics import Analytics
+from record_index import RecordIndex
+from search_index import SearchIndex
+
+
+def _tickets(n=10):
+    old = (datetime.now() - timedelta(days=200)).isoformat()
+    return [{"id": f"TKT-{i}", "assignee": "Dana", "priority": "Low",
+             "status": "closed" if i % 2 else "open", "created_at": old} for i in range(n)]
+
+
+def test_lookups_and_stats_cover_archived_records():
+    storage.save_json("tickets.json", _tickets())
+    index, aggregates = RecordIndex(), Aggregates()
+    before = aggregates.summary()
+    timeline = aggregates.timeline("tickets", bucket="day")
+
+    assert archive.archive_collection("tickets") == 5
+    assert len(storage.load_json("tickets.json")) == 5
+
+    closed = index.lookup("tickets", status="closed") + index.lookup_archived("tickets", status="closed")
+    assert sorted(r["id"] for r in closed) == ["TKT-1", "TKT-3", "TKT-5", "TKT-7", "TKT-9"]
+    assert index.lookup_archived("tickets", status="open") == []
+    assert len(index.lookup_archived("tickets", assignee="dana")) == 5
+    assert storage.query_collection("tickets", limit=0)["total"] == 10
+
+    assert aggregates.summary() == before
+    assert aggregates.timeline("tickets", bucket="day") == timeline
+
+
+def test_records_left_hot_are_not_counted_twice():
+    records = _tickets(4)
+    storage.save_json("tickets.json", records)
+    aggregates = Aggregates()
+    total = aggregates.summary()["totals"]["tickets"]
+    # As if a run crashed after archiving but before dropping the hot copies
+    archive._append_partition("tickets", records[1]["created_at"][:7], [records[1], records[3]])
+    archive.archive_collection("tickets")
+    assert aggregates.summary()["totals"]["tickets"] == total
+    assert storage.query_collection("tickets", limit=0)["total"] == total
+
+
+def test_pages_run_from_hot_records_into_archived_months():
+    start = datetime.now() - timedelta(days=400)
+    records = [{"id": f"TKT-{i:03d}", "status": "closed" if i % 3 else "open", "priority": "Low",
+                "created_at": (start + timedelta(days=3 * i)).isoformat()} for i in range(120)]
+    storage.save_json("tickets.json", records)
+    archive.archive_collection("tickets")
+    everything = storage.load_json("tickets.json") + list(archive.iter_archived("tickets"))
+    assert len(everything) == len(records)
+
+    since = (start + timedelta(days=40, hours=5)).isoformat()
+    for params in ({}, {"status": "closed"}, {"order": "asc"}, {"since": since, "limit": 7}):
+        cursor = None
+        while True:
+            page = storage.query_collection("tickets", cursor=cursor, **params)
+            assert page == storage.query(everything, cursor=cursor, **params)
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+
+def test_change_feed_reports_a_run_as_one_archive_event():
+    storage.save_json("tickets.json", _tickets())
+    feed = storage.ChangeFeed()
+    archive.archive_collection("tickets")
+    storage.save_json("tickets.json", storage.load_json("tickets.json")[1:])  # a real delete
+
+    events = feed.poll()
+    assert [(e["op"], e["record"]) for e in events] == [("delete", {"id": "TKT-0"}),
+                                                       ("archive", {"count": 5})]
+
+
+def test_charts_and_search_keep_archived_records():
+    records = _tickets()
+    for r in records:
+        r["title"] = f"widget {r['id']}"
+    storage.save_json("tickets.json", records)
+    analytics, search = Analytics(refresh_interval=0), SearchIndex()
+    counts = analytics.counts("tickets", "status")
+    hits = search.search("widget", limit=20)
+
+    archive.archive_collection("tickets")
+    assert analytics.counts("tickets", "status") == counts
+    assert search.search("widget", limit=20) == hits
+    assert search.search("tkt-3")["items"][0]["id"] == "TKT-3"
@@ -0,0 +1,44 @@
+import asyncio
+
+import storage
+from chat_jobs import JobManager
+from multi_agent_system import AgentOrchestrator
+from write_buffer import get_write_buffer
+
+# Makes the AlertAgent and the TaskAgent write a record each
+MESSAGE = "Create a ticket for Dana to fix the login bug and alert the team that the database is down"
+
+
+def _slow_down(agent, seconds):
+    # Agents that wait on Slack, calls or the network before they write
+    execute = agent.execute_task
+
+    async def execute_task(task):
+        await asyncio.sleep(seconds)
+        return await execute(task)
+
+    agent.execute_task = execute_task
+
+
+def test_cancelled_job_stops_its_agents():
+    async def scenario():
+        orchestrator = AgentOrchestrator()
+        for agent in orchestrator.agents.values():
+            _slow_down(agent, 0.2)
+        jobs = JobManager(orchestrator.route_message_stream, max_concurrency=1)
+        job = jobs.submit(MESSAGE)
+        while job.status == "queued":
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.05)  # agents started, nothing written yet
+        assert jobs.cancel(job.id)
+        await jobs.wait(job)
+        # Long enough for agents that kept running to write, buffered writes included
+        await asyncio.sleep(0.5)
+        await get_write_buffer().flush()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == "cancelled"
+    assert storage.load_json("alerts.json") == []
+    assert storage.load_json("tickets.json") == []
+    assert storage.load_json("messages.json") == []
@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import numpy as np
+from pydub import AudioSegment
+
+import voice_processor
+from voice_processor import VoiceProcessor, _stitch
+
+RATE = 16000
+WORD_MS, PAUSE_MS, WORDS = 1500, 600, 16
+
+
+def _word_level(i):
+    return 1000 + 100 * i
+
+
+def _speech():
+    """WORDS "words" with pauses between them: word i is a constant sample
+    value, so a fake recognizer can tell which words a chunk holds."""
+    pause = np.zeros(RATE * PAUSE_MS // 1000, dtype=np.int16)
+    parts = []
+    for i in range(WORDS):
+        parts += [np.full(RATE * WORD_MS // 1000, _word_level(i), dtype=np.int16), pause]
+    samples = np.concatenate(parts)
+    return AudioSegment(samples.tobytes(), sample_width=2, frame_rate=RATE, channels=1)
+
+
+def _heard(audio_data):
+    """Word numbers in a chunk, in order of appearance."""
+    samples = np.frombuffer(audio_data.get_raw_data(), dtype=np.int16)
+    levels, first = np.unique(samples[samples != 0], return_index=True)
+    return [(int(level) - 1000) // 100 for level in levels[np.argsort(first)]]
+
+
+def _in_pause(ms):
+    offset = ms % (WORD_MS + PAUSE_MS)
+    return offset >= WORD_MS
+
+
+def test_chunks_are_cut_in_pauses_and_overlap():
+    audio = _speech()
+    ranges = VoiceProcessor(recognizer_backend=lambda audio_data: "").plan_chunks(audio)
+    overlap = voice_processor.CHUNK_OVERLAP_MS
+
+    assert len(ranges) > 1
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(audio)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        cut = end - overlap
+        assert start == cut - overlap
+        assert _in_pause(cut)
+    for start, end in ranges[:-1]:
+        assert end - start >= voice_processor.CHUNK_TARGET_MS
+
+
+def test_chunks_are_stitched_in_order_with_partial_transcripts(tmp_path):
+    audio = _speech()
+    path = str(tmp_path / "note.wav")
+    audio.export(path, format="wav")
+
+    def recognize(audio_data):
+        words = _heard(audio_data)
+        # Later chunks finish first
+        time.sleep(0.3 * (WORDS - words[0]) / WORDS)
+        return " ".join(f"w{i}" for i in words)
+
+    processor = VoiceProcessor(recognizer_backend=recognize)
+    ranges = processor.plan_chunks(audio.set_channels(1))
+    partials = []
+
+    async def on_partial(index, text, prefix):
+        partials.append((index, text, prefix))
+
+    text = asyncio.run(processor.transcribe_audio_chunked(path, on_partial))
+
+    expected = " ".join(f"w{i}" for i in range(WORDS))
+    assert text == expected
+    # Neighbours heard the words around their cut twice; the stitch kept one copy
+    heard = {index: chunk.split() for index, chunk, _ in partials}
+    assert all(set(heard[i]) & set(heard[i + 1]) for i in range(len(ranges) - 1))
+    assert sorted(index for index, _, _ in partials) == list(range(len(ranges)))
+    # Nothing is final until the first chunk is in; then the prefix is everything done
+    assert [index for index, _, _ in partials] == list(range(len(ranges)))[::-1]
+    assert all(prefix == "" for _, _, prefix in partials[:-1])
+    assert partials[-1][2] == expected
+
+
+def test_stitch_drops_words_repeated_by_the_overlap():
+    assert _stitch(["book a room for", "For the team", "", "team meeting"]) == \
+        "book a room for the team meeting"
+    assert _stitch(["no overlap", "here at all"]) == "no overlap here at all"
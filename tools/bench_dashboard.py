@@ -0,0 +1,84 @@
+"""
+Load-test the dashboard: requests per second and latency percentiles.
+
+Each worker thread keeps one HTTP connection open and reuses it for as long
+as the server allows (keep-alive); servers that answer ``Connection: close``
+force a new TCP handshake per request, which shows up in the numbers.
+
+Usage:
+    python dashboard.py                      # in another terminal
+    python tools/bench_dashboard.py
+    python tools/bench_dashboard.py --path /api/activity --workers 32 --requests 200
+    python tools/bench_dashboard.py --url http://localhost:5051   # e.g. an older checkout
+"""
+
+import time
+import argparse
+import threading
+import statistics
+import http.client
+from urllib.parse import urlparse
+
+
+def worker(host, port, path, count, latencies, errors, new_connection):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    for _ in range(count):
+        if new_connection:
+            conn.close()
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path, headers={"Accept-Encoding": "identity"})
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status >= 400:
+                errors.append(resp.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn.close()
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    conn.close()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard load test")
+    parser.add_argument("--url", default="http://localhost:5050")
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=100, help="requests per worker")
+    parser.add_argument("--new-connection", action="store_true", help="open a new TCP connection per request")
+    args = parser.parse_args()
+
+    target = urlparse(args.url)
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=worker, args=(target.hostname, target.port or 80, args.path,
+                                              args.requests, latencies, errors, args.new_connection))
+        for _ in range(args.workers)
+    ]
+
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"📊 {args.url}{args.path} — {args.workers} workers × {args.requests} requests")
+    print(f"   Completed: {len(latencies)} | Errors: {len(errors)} | Time: {elapsed:.2f}s")
+    print(f"   Throughput: {len(latencies) / elapsed:.0f} req/s")
+    if latencies:
+        print(f"   Latency: p50 {percentile(latencies, 50):.1f} ms | p99 {percentile(latencies, 99):.1f} ms"
+              f" | mean {statistics.mean(latencies):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Load-test the MCP server: parallel tool calls over SSE or streamable HTTP.
+
+Each worker opens its own MCP session (as separate gateway connections
+would) and issues tool calls back to back; the mix rotates through the
+write tools and search, so several collections are written at once.
+Reports throughput and latency percentiles per tool.
+
+Writes real records: point the server at a scratch data directory, or
+clean up data/ afterwards.
+
+Usage:
+    python server.py                         # in another terminal
+    python tools/bench_mcp.py
+    python tools/bench_mcp.py --workers 32 --calls 50
+    python tools/bench_mcp.py --tools create_ticket      # one collection only
+    python tools/bench_mcp.py --url http://localhost:8000/mcp   # --transport http
+
+To see throughput scale with server processes, use tools/bench_workers.py.
+"""
+
+import time
+import asyncio
+import argparse
+from collections import defaultdict
+
+from fastmcp import Client
+
+ARGUMENTS = {
+    "create_ticket": lambda i: {"assignee": "Dana", "summary": f"Bench ticket {i}",
+                                "due": "Friday", "priority": "Low"},
+    "trigger_alert": lambda i: {"system": "Bench", "issue": f"Bench alert {i}", "priority": "Low"},
+    "create_reminder": lambda i: {"message": f"Bench reminder {i}", "time": "tomorrow", "target": "Dana"},
+    "schedule_event": lambda i: {"topic": f"Bench sync {i}", "time": f"slot {i}",
+                                 "participants": ["Dana", "Eve"]},
+    "search_records": lambda i: {"query": "bench", "limit": 5},
+    "list_tickets": lambda i: {"assignee": "Dana", "limit": 5},
+    "list_alerts": lambda i: {"system": "Bench", "limit": 5},
+}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+async def worker(url, n, tools, calls, latencies, errors):
+    async with Client(url, timeout=60) as client:
+        for i in range(calls):
+            tool = tools[(n + i) % len(tools)]
+            started = time.perf_counter()
+            try:
+                await client.call_tool(tool, ARGUMENTS[tool](n * calls + i))
+            except Exception as e:
+                errors.append(f"{tool}: {e}")
+                continue
+            latencies[tool].append((time.perf_counter() - started) * 1000)
+
+
+def parse_tools(csv):
+    tools = [t.strip() for t in csv.split(",") if t.strip()]
+    unknown = [t for t in tools if t not in ARGUMENTS]
+    if unknown:
+        raise SystemExit(f"Unknown tool '{unknown[0]}'; choose from {', '.join(ARGUMENTS)}")
+    return tools
+
+
+async def measure(url, workers, calls, tools):
+    """Run the load; returns (latencies by tool, errors, elapsed seconds)."""
+    latencies, errors = defaultdict(list), []
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(url, n, tools, calls, latencies, errors)
+                           for n in range(workers)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run(args):
+    tools = parse_tools(args.tools)
+    latencies, errors, elapsed = await measure(args.url, args.workers, args.calls, tools)
+
+    done = sum(len(v) for v in latencies.values())
+    print(f"🔧 {args.workers} sessions × {args.calls} calls → {args.url}")
+    print(f"   {done} ok, {len(errors)} errors in {elapsed:.2f}s ({done / elapsed:,.0f} calls/s)")
+    for tool in tools:
+        values = sorted(latencies[tool])
+        if values:
+            print(f"   {tool:16} p50 {percentile(values, 50):7.1f} ms | p95 {percentile(values, 95):7.1f} ms"
+                  f" | p99 {percentile(values, 99):7.1f} ms | max {values[-1]:7.1f} ms")
+    for error in errors[:5]:
+        print(f"   ❌ {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP server load test")
+    parser.add_argument("--url", default="http://localhost:8000/sse", help=".../sse or .../mcp")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent MCP sessions")
+    parser.add_argument("--calls", type=int, default=25, help="tool calls per session")
+    parser.add_argument("--tools", default=",".join(ARGUMENTS), help="comma-separated tools to rotate through")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark full-text search: index build time and query latency.
+
+Writes synthetic tickets, alerts, events and reminders to a temporary data
+directory (your data/ is not touched), builds the index and times a set of
+exact, prefix and multi-word queries. Text draws from a Zipf-distributed
+vocabulary (a few very common words, a long tail of rare ones), like real
+ticket and alert text.
+
+Usage:
+    python tools/bench_search.py                       # 1,000,000 records
+    python tools/bench_search.py --records 100000 --queries 500
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import itertools
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage
+from search_index import SearchIndex
+
+WORDS = ("payment gateway login database api server deploy deployment checkout cache "
+         "latency outage billing invoice search index migration release mobile android "
+         "ios webhook queue worker timeout memory leak crash refund signup email report "
+         "dashboard metrics alerting backup restore network dns certificate ssl").split()
+PEOPLE = ["Alice", "Bob", "Dana", "Eve", "Frank", "Grace", "Heidi", "Ivan", "Judy", "Mallory"]
+SYSTEMS = ["Payment Gateway", "API Server", "Auth Service", "Database", "CDN", "Mobile App"]
+
+QUERIES = ["payment", "deplo", "login bug", "dana", "database outage", "cert", "memory leak",
+           "ssl certificate", "api timeout", "refund invoice", "zzz-no-match"]
+
+
+class Vocabulary:
+    """WORDS first (most common), then made-up words for the long tail."""
+
+    def __init__(self, rng, size=20000):
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        tail = {"".join(rng.choice(letters) for _ in range(rng.randint(4, 10))) for _ in range(size)}
+        self.words = WORDS + sorted(tail - set(WORDS))
+        self.cum_weights = list(itertools.accumulate(1 / (rank + 10) for rank in range(len(self.words))))
+        self.rng = rng
+
+    def sentence(self, n):
+        return " ".join(self.rng.choices(self.words, cum_weights=self.cum_weights, k=n))
+
+
+def generate(count, rng):
+    vocab = Vocabulary(rng)
+    start = datetime(2025, 1, 1)
+    per = count // 4
+    stamp = lambda i: (start + timedelta(seconds=i * 30)).isoformat()
+    yield "tickets.json", [{"id": f"TKT-{i}", "summary": vocab.sentence(6), "assignee": rng.choice(PEOPLE),
+                            "priority": "High", "created_at": stamp(i)} for i in range(per)]
+    yield "alerts.json", [{"id": f"ALT-{i}", "system": rng.choice(SYSTEMS), "issue": vocab.sentence(8),
+                           "priority": "High", "created_at": stamp(i)} for i in range(per)]
+    yield "calendar.json", [{"id": f"EVT-{i}", "topic": vocab.sentence(4), "created_at": stamp(i),
+                             "participants": rng.sample(PEOPLE, 3)} for i in range(per)]
+    yield "reminders.json", [{"id": f"REM-{i}", "message": vocab.sentence(5), "target": rng.choice(PEOPLE),
+                              "created_at": stamp(i)} for i in range(count - 3 * per)]
+
+
+def percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search benchmark")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.DATA_DIR = tmp
+        for filename, records in generate(args.records, rng):
+            storage.save_json(filename, records)
+
+        index = SearchIndex()
+        started = time.perf_counter()
+        index.refresh()
+        print(f"📚 Indexed {len(index):,} records in {time.perf_counter() - started:.1f}s")
+
+        print(f"🔎 {args.queries} runs per query (limit 20); 'first' includes building the term arrays")
+        for query in QUERIES:
+            t = time.perf_counter()
+            result = index.search(query, limit=20)
+            first = (time.perf_counter() - t) * 1000
+            latencies = []
+            for _ in range(args.queries):
+                t = time.perf_counter()
+                index.search(query, limit=20)
+                latencies.append((time.perf_counter() - t) * 1000)
+            latencies.sort()
+            print(f"   {query!r:20} {result['total']:>9,} hits | first {first:7.2f} ms"
+                  f" | p50 {percentile(latencies, 50):6.2f} ms | p99 {percentile(latencies, 99):6.2f} ms")
+
+if __name__ == "__main__":
+    main()
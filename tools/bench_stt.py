@@ -0,0 +1,107 @@
+"""
+Benchmark STT backends on sample clips (latency + word error rate).
+
+Clips live in data_test/audio/ by default: each ``<name>.wav`` needs a
+``<name>.txt`` next to it holding the reference transcript.
+
+Usage:
+    python tools/bench_stt.py
+    python tools/bench_stt.py --backends google,vosk --clips path/to/clips --runs 3
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+import statistics
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+import speech_recognition as sr
+from stt_backends import BACKENDS
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def load_clips(clips_dir: str) -> list:
+    clips = []
+    for wav in sorted(glob.glob(os.path.join(clips_dir, "*.wav"))):
+        txt = wav[:-4] + ".txt"
+        if not os.path.exists(txt):
+            print(f"⚠️  Skipping {os.path.basename(wav)} (no .txt reference)")
+            continue
+        with sr.AudioFile(wav) as source:
+            audio = sr.Recognizer().record(source)
+        with open(txt, "r", encoding="utf-8") as f:
+            clips.append((os.path.basename(wav), audio, f.read().strip()))
+    return clips
+
+
+def bench(backend_name: str, clips: list, runs: int) -> None:
+    print(f"\n── {backend_name} " + "─" * 40)
+    started = time.perf_counter()
+    try:
+        backend = BACKENDS[backend_name]()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return
+    print(f"   Startup: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    latencies, wers = [], []
+    for name, audio, reference in clips:
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            try:
+                text = backend.transcribe(audio)
+            except sr.UnknownValueError:
+                text = ""
+            except sr.RequestError as e:
+                print(f"   ❌ {name}: {e}")
+                return
+            latencies.append((time.perf_counter() - t0) * 1000)
+        wer = word_error_rate(reference, text)
+        wers.append(wer)
+        print(f"   {name:<28} {latencies[-1]:7.0f} ms  WER {wer:5.1%}  '{text}'")
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"   Latency: mean {statistics.mean(latencies):.0f} ms | p95 {p95:.0f} ms")
+    print(f"   Mean WER: {statistics.mean(wers):.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark STT backends")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--clips", default=os.path.join(project_root, "data_test", "audio"))
+    parser.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args()
+
+    clips = load_clips(args.clips) if os.path.isdir(args.clips) else []
+    if not clips:
+        print(f"❌ No sample clips found in {args.clips}")
+        print("   Add <name>.wav files with a matching <name>.txt transcript.")
+        return
+
+    print(f"🎧 {len(clips)} clips × {args.runs} run(s)")
+    for name in args.backends.split(","):
+        bench(name.strip(), clips, args.runs)
+
+
+if __name__ == "__main__":
+    main()
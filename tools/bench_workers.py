@@ -0,0 +1,109 @@
+"""
+Measure how MCP tool-call throughput scales with server processes.
+
+For each worker count, starts `server.py --workers N` on a scratch data
+directory (your data/ is not touched), seeds it, runs the bench_mcp.py load
+against it and stops it again. Prints calls/s per worker count.
+
+Writes to one collection are serialized across workers (they rewrite the
+same file under a lock), so the default mix is read-heavy, like agent
+traffic; add write tools with --tools to see where that levels off.
+Scaling needs as many free CPU cores as workers.
+
+Usage:
+    python tools/bench_workers.py
+    python tools/bench_workers.py --counts 1,2,4,8 --transport http
+    python tools/bench_workers.py --tools search_records,list_tickets,create_ticket
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_mcp import ARGUMENTS, measure, parse_tools
+
+SEED_RECORDS = 2000
+
+
+def seed(data_dir):
+    env = dict(os.environ, CONTEXTOS_DATA_DIR=data_dir)
+    script = (
+        "import storage, ids\n"
+        f"n = {SEED_RECORDS}\n"
+        "storage.save_json('tickets.json', [{'id': ids.new_id('TKT'), 'assignee': ['Dana', 'Eve'][i % 2],"
+        " 'summary': f'Bench ticket {i}', 'priority': 'Low', 'status': 'open',"
+        " 'created_at': '2026-01-01T09:00:00'} for i in range(n)])\n"
+        "storage.save_json('alerts.json', [{'id': ids.new_id('ALT'), 'system': 'Bench',"
+        " 'issue': f'Bench alert {i}', 'priority': 'Low', 'status': 'active',"
+        " 'created_at': '2026-01-01T09:00:00'} for i in range(n)])\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True)
+
+
+def wait_for_port(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"Server on port {port} did not start")
+
+
+async def bench(args, workers, tools):
+    with tempfile.TemporaryDirectory(prefix="contextos-bench-") as data_dir:
+        seed(data_dir)
+        env = dict(os.environ, CONTEXTOS_DATA_DIR=data_dir)
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "server.py"), "--transport", args.transport,
+             "--host", "127.0.0.1", "--port", str(args.port), "--workers", str(workers), "--quiet"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_port(args.port)
+            path = "/sse" if args.transport == "sse" else "/mcp"
+            url = f"http://127.0.0.1:{args.port}{path}"
+            await measure(url, 2, 2, tools)  # warm up (index builds)
+            latencies, errors, elapsed = await measure(url, args.sessions, args.calls, tools)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    done = sum(len(v) for v in latencies.values())
+    return done, len(errors), elapsed
+
+
+async def run(args):
+    tools = parse_tools(args.tools)
+    counts = [int(c) for c in args.counts.split(",")]
+    print(f"🔧 {args.sessions} sessions × {args.calls} calls over {args.transport}, tools: {', '.join(tools)}")
+    baseline = None
+    for workers in counts:
+        done, errors, elapsed = await bench(args, workers, tools)
+        rate = done / elapsed
+        baseline = baseline or rate
+        print(f"   {workers:2} workers: {rate:8,.0f} calls/s  ({rate / baseline:4.1f}×)"
+              f"  {done} ok, {errors} errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP server worker scaling benchmark")
+    parser.add_argument("--counts", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--transport", choices=["sse", "http"], default="sse")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--sessions", type=int, default=32, help="concurrent MCP sessions")
+    parser.add_argument("--calls", type=int, default=25, help="tool calls per session")
+    parser.add_argument("--tools", default="search_records,list_tickets,list_alerts",
+                        help=f"comma-separated tools to rotate through ({', '.join(ARGUMENTS)})")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
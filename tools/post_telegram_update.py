@@ -0,0 +1,50 @@
+"""
+Replay a recorded Telegram update against the local webhook endpoint.
+
+Usage:
+    set TELEGRAM_MODE=webhook & set TELEGRAM_WEBHOOK_SECRET=<secret> & python telegram_bot.py
+    python tools/post_telegram_update.py data_test/telegram_update.json
+    python tools/post_telegram_update.py update.json --url http://localhost:8443/telegram/webhook
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import requests
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+
+# Load .env so the secret matches the running bot
+env_file = os.path.join(project_root, ".env")
+if os.path.exists(env_file):
+    with open(env_file, "r") as f:
+        for line in f:
+            if line.strip() and not line.startswith("#") and "=" in line:
+                key, value = line.strip().split("=", 1)
+                os.environ.setdefault(key.strip(), value.strip().strip('"'))
+
+port = os.getenv("TELEGRAM_WEBHOOK_PORT", "8443")
+path = os.getenv("TELEGRAM_WEBHOOK_PATH", "/telegram/webhook")
+
+parser = argparse.ArgumentParser(description="POST recorded Telegram updates to the webhook")
+parser.add_argument("files", nargs="+", help="JSON files, each one update or a list of updates")
+parser.add_argument("--url", default=f"http://localhost:{port}{path}")
+parser.add_argument("--secret", default=os.getenv("TELEGRAM_WEBHOOK_SECRET", ""))
+args = parser.parse_args()
+
+if not args.secret:
+    print("❌ TELEGRAM_WEBHOOK_SECRET not set (pass --secret)")
+    sys.exit(1)
+
+for filename in args.files:
+    with open(filename, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    for update in payload if isinstance(payload, list) else [payload]:
+        started = time.perf_counter()
+        r = requests.post(args.url, json=update, headers={"X-Telegram-Bot-Api-Secret-Token": args.secret})
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"📤 update {update.get('update_id')} → {r.status_code} ({elapsed:.1f} ms)")
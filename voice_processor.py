@@ -4,15 +4,50 @@ import edge_tts
 import speech_recognition as sr
 from pydub import AudioSegment
 
+from stt_backends import get_stt_backend
+
 # Create temp directory for audio files
 TEMP_DIR = "temp_audio"
 os.makedirs(TEMP_DIR, exist_ok=True)
 
+# Long voice notes are split at silences and transcribed in parallel
+CHUNK_THRESHOLD_MS = 20_000   # Shorter audio goes out as a single request
+CHUNK_TARGET_MS = 15_000      # Preferred chunk length
+CHUNK_OVERLAP_MS = 500        # Audio shared by neighbouring chunks
+MIN_CHUNK_MS = 1_000          # Smaller trailing chunks are merged backwards
+MIN_SILENCE_MS = 400          # Pause length that counts as a boundary
+MAX_PARALLEL_CHUNKS = 4       # Concurrent recognition requests per voice note
+MAX_OVERLAP_WORDS = 8         # Words compared when stitching neighbours
+
+
+def _stitch(texts: list) -> str:
+    """Join chunk transcripts in order, dropping words repeated by the overlap."""
+    words = []
+    for text in texts:
+        nxt = text.split()
+        if not nxt:
+            continue
+        # Longest suffix of what we have that matches the start of the next chunk
+        for k in range(min(MAX_OVERLAP_WORDS, len(words), len(nxt)), 0, -1):
+            if [w.lower() for w in words[-k:]] == [w.lower() for w in nxt[:k]]:
+                nxt = nxt[k:]
+                break
+        words.extend(nxt)
+    return " ".join(words)
+
+
 class VoiceProcessor:
     """Handles Speech-to-Text (STT) and Text-to-Speech (TTS) using free tools."""
-    
-    def __init__(self):
+
+    def __init__(self, recognizer_backend=None):
+        """
+        Args:
+            recognizer_backend: Callable taking ``sr.AudioData`` and returning text.
+                Defaults to the STT_BACKEND engine from stt_backends (Google
+                unless configured); inject a stub to run offline.
+        """
         self.recognizer = sr.Recognizer()
+        self.recognize = recognizer_backend or get_stt_backend()
         self.check_dependencies()
 
     def check_dependencies(self):
@@ -26,7 +61,7 @@ class VoiceProcessor:
                 print("   Please install ffmpeg and add it to your PATH.")
         except Exception as e:
              print(f"⚠️  Voice dependency check failed: {e}")
-    
+
     def convert_ogg_to_wav(self, ogg_path: str) -> str:
         """Convert Telegram OGG audio to WAV for processing."""
         try:
@@ -39,23 +74,23 @@ class VoiceProcessor:
             return None
 
     def transcribe_audio(self, audio_path: str) -> str:
-        """Convert Audio to Text using Google Speech Recognition (Free)."""
+        """Convert Audio to Text using the configured STT backend."""
         try:
             # If OGG, convert to WAV first
             if audio_path.endswith(".ogg"):
                 audio_path = self.convert_ogg_to_wav(audio_path)
                 if not audio_path:
                     return "ERROR: conversion failed (ffmpeg missing?)"
-            
+
             with sr.AudioFile(audio_path) as source:
                 audio_data = self.recognizer.record(source)
-                text = self.recognizer.recognize_google(audio_data)
+                text = self.recognize(audio_data)
                 print(f"🎤 Voice transcribed: '{text}'")
                 return text
         except sr.UnknownValueError:
             return "ERROR: could not understand audio"
         except sr.RequestError as e:
-            return f"ERROR: Google Speech API error: {e}"
+            return f"ERROR: Speech API error: {e}"
         except Exception as e:
             print(f"❌ Transcription error: {e}")
             return f"ERROR: {str(e)}"
@@ -67,6 +102,105 @@ class VoiceProcessor:
                 except:
                     pass
 
+    def plan_chunks(self, audio: AudioSegment) -> list:
+        """Pick (start_ms, end_ms) chunk ranges cut in the middle of silences.
+
+        Neighbouring ranges overlap by CHUNK_OVERLAP_MS so words near a cut
+        are heard by both chunks; _stitch() removes the duplicates.
+        """
+        from pydub.silence import detect_nonsilent
+
+        duration = len(audio)
+        if duration <= CHUNK_THRESHOLD_MS:
+            return [(0, duration)]
+
+        speech = detect_nonsilent(audio, min_silence_len=MIN_SILENCE_MS,
+                                  silence_thresh=audio.dBFS - 16)
+        if not speech:
+            return [(0, duration)]
+
+        # Grow each chunk over speech regions until it reaches the target length
+        cuts = [0]
+        for i, (_, end) in enumerate(speech):
+            if end - cuts[-1] >= CHUNK_TARGET_MS:
+                next_start = speech[i + 1][0] if i + 1 < len(speech) else duration
+                cuts.append((end + next_start) // 2)
+        if cuts[-1] < duration:
+            cuts.append(duration)
+        if len(cuts) > 2 and cuts[-1] - cuts[-2] < MIN_CHUNK_MS:
+            del cuts[-2]
+
+        ranges = []
+        for start, end in zip(cuts, cuts[1:]):
+            # No usable silence (continuous speech) — fall back to fixed slices
+            pieces = -(-(end - start) // CHUNK_TARGET_MS) if end - start > 2 * CHUNK_TARGET_MS else 1
+            step = (end - start) // pieces
+            for p in range(pieces):
+                s = start + p * step
+                e = end if p == pieces - 1 else s + step
+                ranges.append((max(0, s - CHUNK_OVERLAP_MS), min(duration, e + CHUNK_OVERLAP_MS)))
+        return ranges
+
+    async def transcribe_audio_chunked(self, audio_path: str, on_partial=None) -> str:
+        """Transcribe long audio as parallel, silence-aligned chunks.
+
+        Args:
+            audio_path: OGG (Telegram voice note) or any ffmpeg-readable file
+            on_partial: Optional callback ``(index, text, prefix)`` (sync or async)
+                fired as each chunk finishes. ``prefix`` is the stitched transcript
+                of all chunks completed in order so far, so callers can act early.
+
+        Returns:
+            The stitched transcript, or an "ERROR: ..." string like transcribe_audio().
+        """
+        try:
+            if audio_path.endswith(".ogg"):
+                audio = AudioSegment.from_ogg(audio_path)
+            else:
+                audio = AudioSegment.from_file(audio_path)
+        except Exception as e:
+            print(f"❌ Error converting audio: {e}")
+            return "ERROR: conversion failed (ffmpeg missing?)"
+
+        audio = audio.set_channels(1)
+        ranges = self.plan_chunks(audio)
+        texts = [None] * len(ranges)
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_CHUNKS)
+
+        async def _run(index: int, start: int, end: int):
+            segment = audio[start:end]
+            audio_data = sr.AudioData(segment.raw_data, segment.frame_rate, segment.sample_width)
+            async with semaphore:
+                try:
+                    text = await asyncio.to_thread(self.recognize, audio_data)
+                except sr.UnknownValueError:
+                    text = ""
+            texts[index] = text
+
+            if on_partial and text:
+                done = []
+                for t in texts:
+                    if t is None:
+                        break
+                    done.append(t)
+                result = on_partial(index, text, _stitch(done))
+                if asyncio.iscoroutine(result):
+                    await result
+
+        try:
+            await asyncio.gather(*(_run(i, s, e) for i, (s, e) in enumerate(ranges)))
+        except sr.RequestError as e:
+            return f"ERROR: Speech API error: {e}"
+        except Exception as e:
+            print(f"❌ Transcription error: {e}")
+            return f"ERROR: {str(e)}"
+
+        text = _stitch(texts)
+        if not text:
+            return "ERROR: could not understand audio"
+        print(f"🎤 Voice transcribed ({len(ranges)} chunks): '{text}'")
+        return text
+
     async def text_to_speech(self, text: str, output_filename: str = "response.mp3") -> str:
         """Convert Text to Audio using Edge TTS (Free)."""
         output_path = os.path.join(TEMP_DIR, output_filename)
@@ -0,0 +1,156 @@
+"""
+ContextOS — Write-Behind Buffer
+Group commit for records the agents append (alerts, tickets, messages...).
+
+Each agent write used to be its own load → append → rewrite of the whole
+file; during an incident one message can produce several. Agents now hand
+their records to the buffer, which collects them per file and appends
+each batch in one storage write (storage.append_json) as soon as either
+
+  - FLUSH_RECORDS records are waiting for the file, or
+  - the oldest of them has waited FLUSH_DELAY_MS.
+
+add() returns at once with a future; callers that must not report success
+before the record is stored await it (or call write(), which does):
+
+    buffer = get_write_buffer()
+    buffer.add("messages.json", log_entry)             # fire and forget
+    await buffer.write("tickets.json", ticket)         # stored when this returns
+
+Shutdown: await buffer.flush() from async code (the dashboard's lifespan
+does); anything still pending when the interpreter exits — or when its
+event loop went away — is written by flush_pending(), which also runs at
+exit.
+"""
+
+import os
+import atexit
+import asyncio
+import threading
+
+import storage
+
+FLUSH_RECORDS = int(os.getenv("WRITE_BATCH_RECORDS", "50"))
+FLUSH_DELAY_MS = float(os.getenv("WRITE_BATCH_MS", "20"))
+
+
+class WriteBuffer:
+    """Per-event-loop buffer; use get_write_buffer()."""
+
+    def __init__(self, max_records: int = FLUSH_RECORDS, max_delay_ms: float = FLUSH_DELAY_MS):
+        self.max_records = max_records
+        self.max_delay = max_delay_ms / 1000
+        self._pending = {}   # filename → [(record, future)]
+        self._timers = {}    # filename → TimerHandle of the latency flush
+        self._flushing = set()
+        self.flushes = 0
+        self.records = 0
+        self.largest_batch = 0
+        self.failures = 0
+
+    def add(self, filename: str, record: dict) -> asyncio.Future:
+        """Queue ``record`` for ``filename``; the future resolves once it is stored."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.setdefault(filename, [])
+        batch.append((record, future))
+        if len(batch) >= self.max_records:
+            self._start_flush(filename)
+        elif filename not in self._timers:
+            self._timers[filename] = loop.call_later(self.max_delay, self._start_flush, filename)
+        return future
+
+    async def write(self, filename: str, record: dict) -> None:
+        """Queue ``record`` and wait until it is stored (raises if the write failed)."""
+        await self.add(filename, record)
+
+    def _start_flush(self, filename: str) -> None:
+        # Take the batch now, so later records start the next one
+        timer = self._timers.pop(filename, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(filename, None)
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._write(filename, batch))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _write(self, filename: str, batch: list) -> None:
+        try:
+            # Batches of one file keep their order: append_json takes its write lock in turn
+            await storage.append_json(filename, [record for record, _ in batch])
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠️ Buffered write of {len(batch)} records to {filename} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()  # fire-and-forget callers: reported above
+            return
+        self.flushes += 1
+        self.records += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    async def flush(self) -> None:
+        """Write everything pending now and wait for all flushes in progress."""
+        for filename in list(self._pending):
+            self._start_flush(filename)
+        while self._flushing:
+            await asyncio.gather(*list(self._flushing), return_exceptions=True)
+
+    def flush_pending(self) -> None:
+        """Synchronously write what is pending, for when the event loop is gone."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        pending, self._pending = self._pending, {}
+        for filename, batch in pending.items():
+            try:
+                storage.append_records(filename, [record for record, _ in batch])
+                self.records += len(batch)
+            except Exception as e:
+                self.failures += 1
+                print(f"⚠️ Buffered write of {len(batch)} records to {filename} failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "pending": sum(len(b) for b in self._pending.values()),
+            "flushes": self.flushes,
+            "records": self.records,
+            "largest_batch": self.largest_batch,
+            "failures": self.failures,
+        }
+
+
+# ──────────────────────────────────────────────
+# Shared instances (one per event loop)
+# ──────────────────────────────────────────────
+_buffers = {}  # event loop → WriteBuffer
+_buffers_lock = threading.Lock()
+
+
+def get_write_buffer() -> WriteBuffer:
+    """The write buffer of the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _buffers_lock:
+        buffer = _buffers.get(loop)
+        if buffer is None:
+            buffer = _buffers[loop] = WriteBuffer()
+        return buffer
+
+
+def flush_pending() -> None:
+    """Write the records still pending in any buffer. Only call it when no
+    event loop is using its buffer (after the loop stopped, or at exit)."""
+    with _buffers_lock:
+        for loop, buffer in list(_buffers.items()):
+            buffer.flush_pending()
+            if loop.is_closed():
+                del _buffers[loop]
+
+
+atexit.register(flush_pending)